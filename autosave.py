@@ -0,0 +1,169 @@
+"""
+Background autosave driven by the event bus.
+
+`AutoSaver` subscribes to `event_bus` and runs a save function on a worker thread of its own
+once changes stop coming in. A burst of changes (a bulk import, a form that writes several
+tables) is debounced into one save: the save runs `delay` seconds after the last change, or at
+the latest `max_delay` seconds after the first unsaved change, so a steady stream of edits still
+gets saved. Saves never run on the thread that made the change, so a GUI event loop is not
+blocked, and at most one save runs at a time. Save functions write their files with
+`fileutil.atomic_open`, so a crash during a save leaves the previous file intact.
+
+Example:
+    from autosave import AutoSaver
+    from snapshot import save_snapshot
+
+    saver = AutoSaver(lambda: save_snapshot('school_data.jsonl'))
+    saver.start()
+    ...
+    saver.stop()
+"""
+
+import threading
+import time
+
+from events import event_bus
+
+AUTOSAVE_DELAY = 2.0
+AUTOSAVE_MAX_DELAY = 30.0
+
+
+class AutoSaver:
+    """
+    Saves in the background after data changes, debouncing bursts of changes into one save.
+
+    Attributes:
+        save (callable): Called with no arguments on the worker thread to save the data.
+        delay (float): Seconds without changes to wait before saving.
+        max_delay (float): The longest time in seconds a change waits to be saved.
+        on_saved (callable): Called on the worker thread after every save as `on_saved(error)`,
+            where `error` is None on success or the exception that stopped the save. GUI code
+            should hand it over to its own thread before touching any widgets.
+    """
+    def __init__(self, save, delay=AUTOSAVE_DELAY, max_delay=AUTOSAVE_MAX_DELAY, on_saved=None, tables=None):
+        """
+        Initialize a stopped autosaver.
+
+        Parameters:
+            save (callable): The save function.
+            delay (float): Seconds without changes to wait before saving.
+            max_delay (float): The longest time in seconds a change waits to be saved.
+            on_saved (callable): Called after every save as `on_saved(error)`.
+            tables (tuple of str): The tables whose changes trigger a save, or None for all.
+        """
+        self.save = save
+        self.delay = delay
+        self.max_delay = max_delay
+        self.on_saved = on_saved
+        self.tables = tables
+        self._condition = threading.Condition()
+        self._first_change = None
+        self._last_change = None
+        self._immediate = False
+        self._stopping = False
+        self._thread = None
+        self._token = None
+
+    def start(self):
+        """
+        Start watching for changes and the worker thread.
+        """
+        if self._thread is not None:
+            return
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='autosave', daemon=True)
+        self._thread.start()
+        self._token = event_bus.subscribe(self._on_events, tables=self.tables)
+
+    def stop(self, flush=True):
+        """
+        Stop watching for changes and wait for the worker thread to finish.
+
+        Parameters:
+            flush (bool): Save any changes that have not been saved yet before stopping.
+        """
+        if self._thread is None:
+            return
+        event_bus.unsubscribe(self._token)
+        with self._condition:
+            self._stopping = True
+            self._immediate = flush and self._first_change is not None
+            self._condition.notify()
+        self._thread.join()
+        self._thread = None
+
+    def save_now(self):
+        """
+        Ask the worker thread to save right away, whether or not anything changed.
+
+        Returns immediately; `on_saved` is called once the save has finished.
+        """
+        with self._condition:
+            if self._first_change is None:
+                self._first_change = self._last_change = time.monotonic()
+            self._immediate = True
+            self._condition.notify()
+
+    @property
+    def pending(self):
+        """
+        bool: Whether there are changes that have not been saved yet.
+        """
+        with self._condition:
+            return self._first_change is not None
+
+    def _on_events(self, events):
+        """
+        Note a change; called by the event bus on the thread that committed it.
+        """
+        now = time.monotonic()
+        with self._condition:
+            if self._first_change is None:
+                self._first_change = now
+            self._last_change = now
+            self._condition.notify()
+
+    def _due(self):
+        """
+        Work out when the next save is due. Must be called with the condition held.
+
+        Returns:
+            float: The `time.monotonic()` time of the save, or None if nothing is waiting to be saved.
+        """
+        if self._immediate:
+            return 0.0
+        if self._first_change is None:
+            return None
+        return min(self._last_change + self.delay, self._first_change + self.max_delay)
+
+    def _run(self):
+        """
+        Wait for changes to settle and save them, until stopped.
+        """
+        while True:
+            with self._condition:
+                while True:
+                    due = self._due()
+                    if self._stopping and not self._immediate:
+                        # Stopped without flushing, or a save on the way out failed
+                        return
+                    if due is not None and due <= time.monotonic():
+                        break
+                    self._condition.wait(None if due is None else due - time.monotonic())
+                # Changes made from here on are saved by the next round
+                self._first_change = self._last_change = None
+                self._immediate = False
+            try:
+                self.save()
+            except Exception as e:
+                print(f"An error occurred while autosaving: {e}")
+                with self._condition:
+                    # Try again once the next delay has passed
+                    now = time.monotonic()
+                    self._first_change = self._first_change or now
+                    self._last_change = self._last_change or now
+                error = e
+            else:
+                error = None
+            if self.on_saved:
+                self.on_saved(error)
@@ -0,0 +1,182 @@
+"""
+Benchmarks for the School Management System data layer.
+
+Each benchmark runs against a throwaway database in a temporary directory, so the real
+`school_management.db` is never touched. Run one with, for example:
+
+    python benchmark.py profiles --rows 2000
+    python benchmark.py serializers --records 10000 100000
+    python benchmark.py import --rows 100000
+"""
+
+import argparse
+import csv
+import os
+import shutil
+import tempfile
+import time
+
+import database
+import importer
+import serializers
+
+
+def fresh_database(profile=None):
+    """
+    Point the database module at a new, empty database file.
+
+    Parameters:
+        profile (str): The performance profile to use. Defaults to the current profile.
+
+    Returns:
+        str: The temporary directory holding the database; remove it when done.
+    """
+    directory = tempfile.mkdtemp()
+    database.configure_pool(os.path.join(directory, 'benchmark.db'), profile=profile)
+    database.create_database()
+    return directory
+
+
+def bench_profiles(args):
+    """
+    Compare write throughput of the performance profiles.
+
+    For every profile, the benchmark adds `args.rows` students one at a time (one commit
+    each, like the GUI forms do) and then the same number again with a single bulk insert.
+
+    Parameters:
+        args (argparse.Namespace): The parsed command line, providing `rows`.
+    """
+    print(f"{'profile':<10} {'single-row inserts/s':>22} {'bulk inserts/s':>16}")
+    for profile in database.PERFORMANCE_PROFILES:
+        directory = fresh_database(profile)
+        try:
+            start = time.perf_counter()
+            for i in range(args.rows):
+                database.db_add_student(f"S{i}", f"Student {i}", 20, f"student{i}@mail.com")
+            single = args.rows / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            database.db_add_students((f"B{i}", f"Student {i}", 20, f"student{i}@mail.com") for i in range(args.rows))
+            bulk = args.rows / (time.perf_counter() - start)
+
+            print(f"{profile:<10} {single:>22,.0f} {bulk:>16,.0f}")
+        finally:
+            database.close_connections()
+            shutil.rmtree(directory)
+
+
+def school_data(records):
+    """
+    Build save data in the normalized format with the given number of students.
+
+    There is one course for every 50 students and one instructor for every 5 courses; every
+    student is registered for two courses.
+
+    Parameters:
+        records (int): The number of students.
+
+    Returns:
+        dict: Data shaped like the output of `school_data_to_dictionary()`.
+    """
+    course_count = max(1, records // 50)
+    instructor_count = max(1, course_count // 5)
+    courses = [{'course_id': f"C{i}", 'course_name': f"Course {i}", 'instructor_id': f"I{i % instructor_count}",
+                'enrolled_students': []} for i in range(course_count)]
+    students = []
+    for i in range(records):
+        registered = [courses[i % course_count], courses[(i + 1) % course_count]]
+        for course in registered:
+            course['enrolled_students'].append(f"S{i}")
+        students.append({'name': f"Student {i}", 'age': 18 + i % 10, 'email': f"student{i}@mail.com", 'student_id': f"S{i}",
+                         'registered_courses': [course['course_id'] for course in registered]})
+    instructors = [{'name': f"Instructor {i}", 'age': 30 + i % 30, 'email': f"instructor{i}@mail.com", 'instructor_id': f"I{i}",
+                    'assigned_courses': [course['course_id'] for course in courses[i::instructor_count]]}
+                   for i in range(instructor_count)]
+    return {'format_version': 2, 'students': students, 'instructors': instructors, 'courses': courses}
+
+
+def bench_serializers(args):
+    """
+    Compare encode time, decode time and output size of the save file formats.
+
+    Parameters:
+        args (argparse.Namespace): The parsed command line, providing `records`, a list of dataset sizes.
+    """
+    print(f"{'records':>9} {'format':<13} {'encode s':>9} {'decode s':>9} {'size MB':>9}")
+    for records in args.records:
+        data = school_data(records)
+        for name, serializer in serializers.SERIALIZERS.items():
+            start = time.perf_counter()
+            payload = serializer.dumps(data)
+            encode = time.perf_counter() - start
+
+            start = time.perf_counter()
+            serializer.loads(payload)
+            decode = time.perf_counter() - start
+
+            print(f"{records:>9,} {name:<13} {encode:>9.3f} {decode:>9.3f} {len(payload) / 1e6:>9.1f}")
+
+
+def bench_import(args):
+    """
+    Measure the throughput of the CSV importer for students.
+
+    A CSV file of `args.rows` students is generated, with one row in every hundred invalid, and
+    imported into an empty database with each of the given numbers of validation processes.
+
+    Parameters:
+        args (argparse.Namespace): The parsed command line, providing `rows` and `workers`, a list
+            of process counts (0 validates in the importing process).
+    """
+    directory = tempfile.mkdtemp()
+    try:
+        path = os.path.join(directory, 'students.csv')
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(['student_id', 'name', 'age', 'email'])
+            for i in range(args.rows):
+                email = f"student{i}@mail.com" if i % 100 else f"student{i}"
+                writer.writerow([f"S{i}", f"Student {i}", 18 + i % 10, email])
+
+        print(f"{'workers':>7} {'rows/s':>10} {'inserted':>9} {'rejected':>9}")
+        for workers in args.workers:
+            database_directory = fresh_database()
+            try:
+                start = time.perf_counter()
+                counts = importer.import_csv(path, 'students', workers=workers)
+                rate = args.rows / (time.perf_counter() - start)
+                print(f"{workers:>7} {rate:>10,.0f} {counts['inserted']:>9,} {counts['rejected']:>9,}")
+            finally:
+                database.close_connections()
+                shutil.rmtree(database_directory)
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    """
+    Parse the command line and run the selected benchmark.
+    """
+    parser = argparse.ArgumentParser(description="School Management System benchmarks")
+    subparsers = parser.add_subparsers(dest='benchmark', required=True)
+
+    profiles = subparsers.add_parser('profiles', help="write throughput of each database performance profile")
+    profiles.add_argument('--rows', type=int, default=2000)
+    profiles.set_defaults(run=bench_profiles)
+
+    formats = subparsers.add_parser('serializers', help="encode/decode time and file size of each save file format")
+    formats.add_argument('--records', type=int, nargs='+', default=[10000, 100000, 1000000])
+    formats.set_defaults(run=bench_serializers)
+
+    imports = subparsers.add_parser('import', help="rows per second of the CSV importer for students")
+    imports.add_argument('--rows', type=int, default=100000)
+    imports.add_argument('--workers', type=int, nargs='+', default=[0, os.cpu_count() or 1])
+    imports.set_defaults(run=bench_import)
+
+    args = parser.parse_args()
+    args.run(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,29 +1,263 @@
 import re
 
+# Compiled once; `fullmatch` anchors the pattern at both ends
+EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}")
+
+
+# Column checks. Each takes every value of one field and returns the cleaned values together with
+# a list of (index, message) pairs for the values that are invalid. Each check first runs over the
+# whole column with builtins such as map() and all(), which loop in C, and only looks at the values
+# one by one to find the culprits when that fast pass fails.
+
+def _strip(values):
+    """
+    Removes surrounding whitespace from a column of strings; other values are kept as they are.
+    """
+    try:
+        return list(map(str.strip, values))
+    except TypeError:
+        return [value.strip() if isinstance(value, str) else value for value in values]
+
+def _find(values, is_valid, message):
+    """
+    Lists an error for every value of a column that `is_valid` rejects.
+    """
+    return [(index, message) for index, value in enumerate(values) if not is_valid(value)]
+
+def _check_identifiers(values, message):
+    """
+    Checks a column of IDs, which must not be empty or blank.
+
+    :param values: The IDs; values that are not strings are converted to strings.
+    :param message: The error message for a missing ID.
+
+    :return: The IDs with surrounding whitespace removed, and the list of errors.
+    """
+    try:
+        cleaned = list(map(str.strip, values))
+    except TypeError:
+        cleaned = ['' if value is None else str(value).strip() for value in values]
+    if all(cleaned):
+        return cleaned, []
+    return cleaned, _find(cleaned, bool, message)
+
+def _check_student_ids(values):
+    return _check_identifiers(values, "Student ID cannot be empty.")
+
+def _check_instructor_ids(values):
+    return _check_identifiers(values, "Instructor ID cannot be empty.")
+
+def _check_course_ids(values):
+    return _check_identifiers(values, "Course ID cannot be empty.")
+
+def _check_optional_instructor_ids(values):
+    """
+    Checks a column of instructor IDs that may be left out; blank IDs become None.
+    """
+    return [str(value).strip() or None if value is not None else None for value in values], []
+
+def _is_name(value):
+    return isinstance(value, str) and len(value) > 1
+
+def _check_names(values):
+    """
+    Checks a column of names, which must be more than one character after trimming.
+    """
+    cleaned = _strip(values)
+    try:
+        if not cleaned or min(map(len, cleaned)) > 1:
+            return cleaned, []
+    except TypeError:
+        pass
+    return cleaned, _find(cleaned, _is_name, "Name must be more than one character.")
+
+def _is_course_name(value):
+    return isinstance(value, str) and value != ''
+
+def _check_course_names(values):
+    """
+    Checks a column of course names, which must not be empty or blank.
+    """
+    cleaned = _strip(values)
+    if all(map(_is_course_name, cleaned)):
+        return cleaned, []
+    return cleaned, _find(cleaned, _is_course_name, "Course name cannot be empty.")
+
+def _to_age(value):
+    """
+    Converts an age to an integer. int() would cut a fraction such as -0.5 down to 0, so numbers
+    that are not whole are refused with a ValueError.
+    """
+    age = int(value)
+    if not isinstance(value, (str, int)) and age != value:
+        raise ValueError(f"{value} is not a whole number.")
+    return age
+
+def _check_ages(values):
+    """
+    Checks a column of ages, which must be non-negative whole numbers; numeric strings are converted.
+    """
+    try:
+        cleaned = list(map(int, values))
+        # Only strings and integers convert exactly; anything else is checked one value at a time
+        exact = set(map(type, values)) <= {str, int}
+    except (TypeError, ValueError):
+        exact = False
+    if not exact:
+        cleaned, errors = [], []
+        for index, value in enumerate(values):
+            try:
+                value = _to_age(value)
+            except (TypeError, ValueError):
+                errors.append((index, "Age must be a whole number."))
+            else:
+                if value < 0:
+                    errors.append((index, "Age must be non-negative."))
+            cleaned.append(value)
+        return cleaned, errors
+    if not cleaned or min(cleaned) >= 0:
+        return cleaned, []
+    return cleaned, _find(cleaned, (0).__le__, "Age must be non-negative.")
+
+def _is_email(value, match=EMAIL_PATTERN.fullmatch):
+    return isinstance(value, str) and match(value) is not None
+
+def _check_emails(values):
+    """
+    Checks a column of email addresses against `EMAIL_PATTERN`.
+    """
+    cleaned = _strip(values)
+    try:
+        if all(map(EMAIL_PATTERN.fullmatch, cleaned)):
+            return cleaned, []
+    except TypeError:
+        pass
+    return cleaned, _find(cleaned, _is_email, "Invalid email format.")
+
+
+def validate_rows(rows, fields):
+    """
+    Validates many rows at once, collecting every error of every row.
+
+    The rows are split into columns and each column is checked as a whole, so the checks run once
+    per field rather than once per value.
+
+    :param rows: The rows to validate (iterable of tuples).
+    :param fields: One (field name, column check) pair per position in a row.
+
+    :return: A tuple (valid, errors). `valid` lists the cleaned rows that passed, in input order.
+        `errors` maps the index of every failing row to a list of (field name, message) pairs; a
+        row of the wrong length is reported once, with the field name None.
+    """
+    rows = list(rows)
+    errors = {}
+    width = len(fields)
+    if rows and set(map(len, rows)) != {width}:
+        for index, row in enumerate(rows):
+            if len(row) != width:
+                errors[index] = [(None, f"Expected {width} fields, found {len(row)}.")]
+    candidates = [index for index in range(len(rows)) if index not in errors] if errors else range(len(rows))
+    columns = list(zip(*(rows[index] for index in candidates))) or [()] * width
+
+    cleaned_columns = []
+    for (field, check), column in zip(fields, columns):
+        cleaned, problems = check(column)
+        cleaned_columns.append(cleaned)
+        for position, message in problems:
+            errors.setdefault(candidates[position], []).append((field, message))
+
+    valid = [row for index, row in zip(candidates, zip(*cleaned_columns)) if index not in errors]
+    return valid, errors
+
+STUDENT_FIELDS = (('student_id', _check_student_ids), ('name', _check_names), ('age', _check_ages),
+                  ('email', _check_emails))
+INSTRUCTOR_FIELDS = (('instructor_id', _check_instructor_ids), ('name', _check_names), ('age', _check_ages),
+                     ('email', _check_emails))
+COURSE_FIELDS = (('course_id', _check_course_ids), ('course_name', _check_course_names),
+                 ('instructor_id', _check_optional_instructor_ids))
+REGISTRATION_FIELDS = (('student_id', _check_student_ids), ('course_id', _check_course_ids))
+
+def validate_students(rows):
+    """
+    Validates many students at once.
+
+    :param rows: The students as tuples (student_id, name, age, email).
+
+    :return: A tuple (valid, errors) as described in `validate_rows`. Valid students have their
+        text trimmed and their age converted to an integer.
+    """
+    return validate_rows(rows, STUDENT_FIELDS)
+
+def validate_instructors(rows):
+    """
+    Validates many instructors at once.
+
+    :param rows: The instructors as tuples (instructor_id, name, age, email).
+
+    :return: A tuple (valid, errors) as described in `validate_rows`. Valid instructors have their
+        text trimmed and their age converted to an integer.
+    """
+    return validate_rows(rows, INSTRUCTOR_FIELDS)
+
+def validate_courses(rows):
+    """
+    Validates many courses at once.
+
+    :param rows: The courses as tuples (course_id, course_name, instructor_id).
+
+    :return: A tuple (valid, errors) as described in `validate_rows`. A blank instructor ID
+        becomes None.
+    """
+    return validate_rows(rows, COURSE_FIELDS)
+
+def validate_registrations(rows):
+    """
+    Validates many registrations at once.
+
+    :param rows: The registrations as tuples (student_id, course_id).
+
+    :return: A tuple (valid, errors) as described in `validate_rows`.
+    """
+    return validate_rows(rows, REGISTRATION_FIELDS)
+
+
+def _validate_value(check, value):
+    """
+    Runs a column check on a single value. Only suits checks that clean a value by trimming it,
+    where the trimmed value is what is checked but the value itself is what is kept.
+
+    :raises ValueError: With the check's message if the value is invalid.
+
+    :return: The value, unchanged.
+    """
+    errors = check([value])[1]
+    if errors:
+        raise ValueError(errors[0][1])
+    return value
+
 def validate_name(name):
     """
     Validates the provided name to ensure it is not empty and has more than one character.
 
     :param name: The name to validate (string).
-    
+
     :raises ValueError: If the name is empty or less than two characters after trimming.
-    
+
     :return: The validated name.
     """
-    if not name or len(name.strip()) <= 1:
-        raise ValueError("Name must be more than one character.")
-    return name
+    return _validate_value(_check_names, name)
 
 def validate_age(age):
     """
     Validates that the provided age is non-negative.
 
     :param age: The age to validate (integer).
-    
+
     :raises ValueError: If the age is negative.
-    
+
     :return: The validated age.
     """
+    # Checked as given: the column check would first convert the age, cutting -0.5 down to 0
     if age < 0:
         raise ValueError("Age must be non-negative.")
     return age
@@ -33,13 +267,13 @@ def validate_email(email):
     Validates that the provided email is in a valid format.
 
     :param email: The email to validate (string).
-    
+
     :raises ValueError: If the email does not match the standard email format.
-    
+
     :return: The validated email.
     """
-    pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-    if not re.match(pattern, email):
+    # Checked as given: the column check would first trim it, letting surrounding spaces through
+    if not _is_email(email):
         raise ValueError("Invalid email format.")
     return email
 
@@ -48,14 +282,12 @@ def validate_student_id(student_id:str):
     Validates that the provided student ID is not empty or blank.
 
     :param student_id: The student ID to validate (string).
-    
+
     :raises ValueError: If the student ID is empty or blank.
-    
+
     :return: The validated student ID.
     """
-    if not student_id or not student_id.strip():
-        raise ValueError("Student ID cannot be empty.")
-    return student_id
+    return _validate_value(_check_student_ids, student_id)
 
 
 def validate_instructor_id(instructor_id: str):
@@ -63,14 +295,12 @@ def validate_instructor_id(instructor_id: str):
     Validates that the provided instructor ID is not empty or blank.
 
     :param instructor_id: The instructor ID to validate (string).
-    
+
     :raises ValueError: If the instructor ID is empty or blank.
-    
+
     :return: The validated instructor ID.
     """
-    if not instructor_id or not instructor_id.strip():
-        raise ValueError("Instructor ID cannot be empty.")
-    return instructor_id
+    return _validate_value(_check_instructor_ids, instructor_id)
 
 
 def validate_course_id(course_id: str):
@@ -78,26 +308,21 @@ def validate_course_id(course_id: str):
     Validates that the provided course ID is not empty or blank.
 
     :param course_id: The course ID to validate (string).
-    
+
     :raises ValueError: If the course ID is empty or blank.
-    
+
     :return: The validated course ID.
     """
-    if not course_id or not course_id.strip():
-        raise ValueError("Course ID cannot be empty.")
-    return course_id
+    return _validate_value(_check_course_ids, course_id)
 
 def validate_course_name(course_name:str):
     """
     Validates that the provided course name is not empty or blank.
 
     :param course_name: The course name to validate (string).
-    
+
     :raises ValueError: If the course name is empty or blank.
-    
+
     :return: The validated course name.
     """
-    if not course_name or not course_name.strip():
-        raise ValueError("Course name cannot be empty.")
-    return course_name
-
+    return _validate_value(_check_course_names, course_name)
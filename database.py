@@ -1,5 +1,509 @@
 #database.py
+import atexit
+import csv
+import functools
+import json
+import os
+import queue
 import sqlite3
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from events import event_bus
+from fileutil import atomic_open
+from instrumentation import InstrumentedConnection
+
+DB_PATH = 'school_management.db'
+POOL_SIZE = 5
+
+# Named PRAGMA settings applied to every connection the module opens. The profile is picked with
+# the SCHOOL_DB_PROFILE environment variable or `configure_pool(profile=...)`.
+PERFORMANCE_PROFILES = {
+    # Every commit is fsynced before it returns
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'cache_size': -2000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 5000,
+    },
+    # Safe against application crashes; a power loss may lose the last few commits
+    'balanced': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -16000,
+        'mmap_size': 64 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # For one-off imports only: an OS crash during the load can corrupt the database
+    'bulk-load': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': -64000,
+        'mmap_size': 256 * 1024 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 10000,
+    },
+}
+DEFAULT_PROFILE = os.environ.get('SCHOOL_DB_PROFILE', 'balanced')
+
+
+class ConnectionPool:
+    """
+    A pool of long-lived SQLite connections shared by every function in this module.
+
+    Opening a connection costs a file open and a schema parse, so instead of connecting and
+    closing on every call the pool keeps a small number of idle connections alive and hands
+    them out again. A thread that asks for a connection while it already holds one gets the
+    same connection back, so nested calls (for example a registration that looks up a student
+    first) share one connection.
+
+    Attributes:
+        db_path (str): The path of the SQLite database file.
+        pool_size (int): The maximum number of idle connections kept open.
+        profile (str): The name of the entry in `PERFORMANCE_PROFILES` applied to each connection.
+    """
+    def __init__(self, db_path=DB_PATH, pool_size=POOL_SIZE, profile=DEFAULT_PROFILE):
+        """
+        Initialize the pool. No connection is opened until one is requested.
+
+        Parameters:
+            db_path (str): The path of the SQLite database file.
+            pool_size (int): The maximum number of idle connections kept open.
+            profile (str): The name of the performance profile applied to each connection.
+
+        Raises:
+            ValueError: If the profile name is not one of `PERFORMANCE_PROFILES`.
+        """
+        if profile not in PERFORMANCE_PROFILES:
+            raise ValueError(f"Unknown database profile: {profile}")
+        self.db_path = db_path
+        self.pool_size = pool_size
+        self.profile = profile
+        self._idle = queue.LifoQueue()
+        self._local = threading.local()
+        self._closed = False
+
+    def _connect(self):
+        """
+        Open a new connection to the database file, apply the pool's performance profile and
+        enforce foreign keys.
+
+        Its statements are reported to `instrumentation.profiler` while that is enabled.
+
+        Returns:
+            sqlite3.Connection: A connection that may be used from any thread.
+        """
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, factory=InstrumentedConnection)
+        for pragma, value in PERFORMANCE_PROFILES[self.profile].items():
+            conn.execute(f'PRAGMA {pragma} = {value}')
+        conn.execute('PRAGMA foreign_keys = ON')
+        return conn
+
+    def acquire(self):
+        """
+        Get a connection for the calling thread.
+
+        Returns:
+            sqlite3.Connection: The connection already held by this thread, an idle pooled
+            connection, or a newly opened one.
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("The connection pool has been closed.")
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            self._local.conn = conn
+            self._local.depth = 0
+        self._local.depth += 1
+        return conn
+
+    def release(self, conn):
+        """
+        Give a connection back to the pool.
+
+        The connection is only returned to the idle pool once the outermost caller in this
+        thread releases it. Any uncommitted work left on it is rolled back first, and it is
+        closed instead of pooled when the pool is full or shut down.
+
+        Parameters:
+            conn (sqlite3.Connection): The connection obtained from `acquire()`.
+        """
+        self._local.depth -= 1
+        if self._local.depth > 0:
+            return
+        self._local.conn = None
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed or self._idle.qsize() >= self.pool_size:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    def close(self):
+        """
+        Shut the pool down and close every idle connection.
+
+        Connections that are still in use are closed when they are released.
+        """
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pool = ConnectionPool()
+
+
+@contextmanager
+def get_connection():
+    """
+    Borrow a pooled connection for the duration of a `with` block.
+
+    Example:
+        with get_connection() as conn:
+            conn.execute('SELECT * FROM students')
+
+    Yields:
+        sqlite3.Connection: A connection to the school database.
+    """
+    conn = _pool.acquire()
+    try:
+        yield conn
+    finally:
+        _pool.release(conn)
+
+
+def _in_transaction():
+    """
+    Check whether the calling thread is inside a `transaction()` block.
+
+    Returns:
+        bool: True if commits should be left to the enclosing transaction.
+    """
+    return getattr(_pool._local, 'transaction_depth', 0) > 0
+
+
+def _commit(conn):
+    """
+    Commit the work done on a connection and deliver its events, unless it belongs to an
+    enclosing `transaction()`, in which case the transaction commits it when the block ends.
+
+    Parameters:
+        conn (sqlite3.Connection): The connection to commit.
+    """
+    if not _in_transaction():
+        try:
+            conn.commit()
+        except sqlite3.Error:
+            event_bus.discard()
+            raise
+        event_bus.flush()
+
+
+def _rollback(conn):
+    """
+    Roll back the work done on a connection, unless it belongs to an enclosing `transaction()`,
+    in which case the transaction decides what to roll back.
+
+    Parameters:
+        conn (sqlite3.Connection): The connection to roll back.
+    """
+    if not _in_transaction():
+        conn.rollback()
+        event_bus.discard()
+
+
+@contextmanager
+def transaction():
+    """
+    Group any number of inserts, updates and deletes into a single commit.
+
+    Every `db_*` and `delete_*` call made inside the block uses the same connection and stops
+    committing on its own. The work is committed once when the block ends, or rolled back if it
+    raises. Blocks may be nested: an inner block is a savepoint, so an error inside it only
+    undoes the inner block's work when the caller handles the exception. Events published by the
+    calls in the block are delivered once, after the final commit.
+
+    In single-writer mode, writes may not be made inside a block opened on any thread other than
+    the writer's, since they would bypass the writer; put them in a function and pass it to
+    `submit_write` instead, which runs it as one transaction on the writer thread. Blocks that
+    only read are fine on any thread.
+
+    Example:
+        with transaction():
+            db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+            db_register_students_to_courses([('S1', 'EECE 435L'), ('S1', 'EECE 430')])
+
+    Yields:
+        sqlite3.Connection: The connection the transaction runs on.
+    """
+    with get_connection() as conn:
+        local = _pool._local
+        depth = getattr(local, 'transaction_depth', 0)
+        savepoint = f'sp_{depth}'
+        if depth == 0:
+            if conn.in_transaction:
+                conn.commit()
+                event_bus.flush()
+            conn.execute('BEGIN')
+        else:
+            conn.execute(f'SAVEPOINT {savepoint}')
+        events_mark = event_bus.mark()
+        local.transaction_depth = depth + 1
+        try:
+            yield conn
+        except BaseException:
+            local.transaction_depth = depth
+            event_bus.discard(events_mark)
+            if depth == 0:
+                conn.rollback()
+            else:
+                conn.execute(f'ROLLBACK TO {savepoint}')
+                conn.execute(f'RELEASE {savepoint}')
+            raise
+        local.transaction_depth = depth
+        if depth == 0:
+            try:
+                conn.commit()
+            except sqlite3.Error:
+                event_bus.discard()
+                raise
+            event_bus.flush()
+        else:
+            conn.execute(f'RELEASE {savepoint}')
+
+
+WRITER_BATCH_SIZE = 100
+
+
+class SingleWriter:
+    """
+    A dedicated thread that performs every database mutation, one batch at a time.
+
+    When several front ends or threads commit at once, SQLite makes all but one of them wait
+    for the write lock and eventually fail with "database is locked". In single-writer mode
+    the mutating functions of this module put their work on a queue instead, and this thread
+    runs the queued writes in order, grouping up to `batch_size` of them into one transaction.
+    Each write runs in its own savepoint, so a failing write does not undo the others in its
+    batch. Reads are not affected and keep using pooled connections.
+
+    Attributes:
+        batch_size (int): The maximum number of queued writes committed together.
+    """
+    def __init__(self, batch_size=WRITER_BATCH_SIZE):
+        """
+        Initialize the writer and start its thread.
+
+        Parameters:
+            batch_size (int): The maximum number of queued writes committed together.
+        """
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='database-writer', daemon=True)
+        self._thread.start()
+
+    def is_current(self):
+        """
+        Check whether the calling code runs on the writer thread.
+
+        Returns:
+            bool: True if called from the writer thread.
+        """
+        return threading.current_thread() is self._thread
+
+    def submit(self, function, *args, **kwargs):
+        """
+        Queue a write to be run on the writer thread.
+
+        Parameters:
+            function (callable): The function performing the write.
+            *args: Positional arguments for the function.
+            **kwargs: Keyword arguments for the function.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the function's return value once the batch holding
+            the write has been committed, or to the exception the write raised.
+        """
+        future = Future()
+        self._queue.put((function, args, kwargs, future))
+        return future
+
+    def stop(self):
+        """
+        Finish the writes already queued, then stop the writer thread.
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        """
+        Take writes off the queue and run them in batches until `stop()` is called.
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._run_batch(batch)
+                    return
+                batch.append(item)
+            self._run_batch(batch)
+
+    def _run_batch(self, batch):
+        """
+        Run a batch of writes in a single transaction and resolve their futures after the commit.
+
+        Parameters:
+            batch (list of tuple): The queued (function, args, kwargs, future) entries.
+        """
+        outcomes = []
+        try:
+            with transaction():
+                for function, args, kwargs, future in batch:
+                    try:
+                        with transaction():
+                            outcomes.append((future, function(*args, **kwargs), None))
+                    except Exception as e:
+                        outcomes.append((future, None, e))
+        except Exception as e:
+            for _, _, _, future in batch:
+                future.set_exception(e)
+            return
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+
+_writer = None
+
+
+def enable_single_writer(batch_size=WRITER_BATCH_SIZE):
+    """
+    Switch to single-writer mode: from now on every mutation in this module runs on one
+    dedicated writer thread.
+
+    Parameters:
+        batch_size (int): The maximum number of queued writes committed together.
+    """
+    global _writer
+    if _writer is None:
+        _writer = SingleWriter(batch_size)
+
+
+def disable_single_writer():
+    """
+    Leave single-writer mode after the writes already queued have been committed.
+    """
+    global _writer
+    writer, _writer = _writer, None
+    if writer is not None:
+        writer.stop()
+
+
+def submit_write(function, *args, **kwargs):
+    """
+    Run a write, or a group of writes wrapped in one function, through the writer thread.
+
+    The function runs as one transaction: either all of its writes are committed or, if it
+    raises, none of them. Without single-writer mode it runs immediately on the calling thread.
+
+    Example:
+        def enroll():
+            db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+            db_register_students_to_courses([('S1', 'EECE 435L')])
+
+        submit_write(enroll).result()
+
+    Parameters:
+        function (callable): The function performing the writes.
+        *args: Positional arguments for the function.
+        **kwargs: Keyword arguments for the function.
+
+    Returns:
+        concurrent.futures.Future: Resolves to the function's return value once it has been committed.
+    """
+    writer = _writer
+    if writer is not None and not writer.is_current():
+        return writer.submit(function, *args, **kwargs)
+    future = Future()
+    try:
+        with transaction():
+            result = function(*args, **kwargs)
+    except Exception as e:
+        future.set_exception(e)
+    else:
+        future.set_result(result)
+    return future
+
+
+def _write(function):
+    """
+    Decorator for the module's mutating functions that sends them through the writer thread
+    in single-writer mode and waits for the result, so callers see the same return values and
+    exceptions as before.
+
+    A call made inside a `transaction()` block on another thread can neither join the block from
+    the writer thread nor bypass the writer, so it raises instead; see `submit_write`.
+    """
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        writer = _writer
+        if writer is None or writer.is_current():
+            return function(*args, **kwargs)
+        if _in_transaction():
+            raise RuntimeError(f"{function.__name__}() was called inside a transaction() block in single-writer "
+                               f"mode; run the block's writes with submit_write() instead.")
+        return writer.submit(function, *args, **kwargs).result()
+    return wrapper
+
+
+def configure_pool(db_path=None, pool_size=None, profile=None):
+    """
+    Replace the module connection pool, for example to point it at another database file
+    or to switch performance profile.
+
+    The previous pool is shut down.
+
+    Parameters:
+        db_path (str): The path of the SQLite database file. Defaults to the current path.
+        pool_size (int): The maximum number of idle connections kept open. Defaults to the current size.
+        profile (str): The name of the performance profile to apply. Defaults to the current profile.
+    """
+    global _pool
+    old_pool = _pool
+    _pool = ConnectionPool(db_path or old_pool.db_path, pool_size or old_pool.pool_size,
+                           profile or old_pool.profile)
+    old_pool.close()
+
+
+def close_connections():
+    """
+    Close every pooled connection, after the single-writer thread (if any) has committed its
+    queued writes. Registered to run automatically when the program exits.
+    """
+    disable_single_writer()
+    _pool.close()
+
+
+atexit.register(close_connections)
+
 
 def create_database():
     """
@@ -12,46 +516,370 @@ def create_database():
       a foreign key relationship with the Instructors table.
     - Registrations: Links students to courses, with foreign keys referencing both the Students and Courses tables.
 
-    If the tables already exist, they will not be recreated.
-    """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-
-    # Create Students table
-    cursor.execute('''CREATE TABLE IF NOT EXISTS students (
-        student_id TEXT PRIMARY KEY,
-        name TEXT NOT NULL,
-        age INTEGER NOT NULL,
-        email TEXT NOT NULL
-    )''')
-
-    # Create Instructors table
-    cursor.execute('''CREATE TABLE IF NOT EXISTS instructors (
-        instructor_id TEXT PRIMARY KEY,
-        name TEXT NOT NULL,
-        age INTEGER NOT NULL,
-        email TEXT NOT NULL
-    )''')
-
-    # Create Courses table
-    cursor.execute('''CREATE TABLE IF NOT EXISTS courses (
-        course_id TEXT PRIMARY KEY,
-        course_name TEXT NOT NULL,
-        instructor_id TEXT NOT NULL,
-        FOREIGN KEY (instructor_id) REFERENCES instructors(instructor_id)
-    )''')
-
-    # Create Registrations table
-    cursor.execute('''CREATE TABLE IF NOT EXISTS registrations (
-        student_id TEXT,
-        course_id TEXT,
-        FOREIGN KEY (student_id) REFERENCES students(student_id),
-        FOREIGN KEY (course_id) REFERENCES courses(course_id),
-        PRIMARY KEY (student_id, course_id)
-    )''')
+    If the tables already exist, they will not be recreated. Pending schema migrations, such as
+    the secondary indexes on names and foreign keys, are then applied, and the full-text search
+    index is rebuilt if it no longer matches the tables (see `rebuild_search_index`).
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        # Create Students table
+        cursor.execute('''CREATE TABLE IF NOT EXISTS students (
+            student_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            email TEXT NOT NULL
+        )''')
+
+        # Create Instructors table
+        cursor.execute('''CREATE TABLE IF NOT EXISTS instructors (
+            instructor_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            age INTEGER NOT NULL,
+            email TEXT NOT NULL
+        )''')
+
+        # Create Courses table
+        cursor.execute('''CREATE TABLE IF NOT EXISTS courses (
+            course_id TEXT PRIMARY KEY,
+            course_name TEXT NOT NULL,
+            instructor_id TEXT NOT NULL,
+            FOREIGN KEY (instructor_id) REFERENCES instructors(instructor_id)
+        )''')
+
+        # Create Registrations table
+        cursor.execute('''CREATE TABLE IF NOT EXISTS registrations (
+            student_id TEXT,
+            course_id TEXT,
+            FOREIGN KEY (student_id) REFERENCES students(student_id),
+            FOREIGN KEY (course_id) REFERENCES courses(course_id),
+            PRIMARY KEY (student_id, course_id)
+        )''')
+
+        _migrate(cursor)
+
+        if not _search_index_in_sync(cursor):
+            cursor.execute('DELETE FROM search_index')
+            for statement in _search_index_fill_statements():
+                cursor.execute(statement)
+
+        conn.commit()
+
+
+# Sources of the full-text search index: (kind, table, code, key column, name column, email column).
+# Each source row is stored in the index under rowid `source rowid * 4 + code`, so the triggers
+# can find it again without scanning the index.
+_SEARCH_SOURCES = [
+    ('student', 'students', 1, 'student_id', 'name', 'email'),
+    ('instructor', 'instructors', 2, 'instructor_id', 'name', 'email'),
+    ('course', 'courses', 3, 'course_id', 'course_name', 'NULL'),
+]
+
+
+def _search_index_statements():
+    """
+    Build the statements that create the full-text search index and the triggers keeping it in sync.
+
+    Returns:
+        list of str: The CREATE statements.
+    """
+    statements = ["""CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+        kind UNINDEXED, key, name, email, prefix='2 3'
+    )"""]
+    for kind, table, code, key, name, email in _SEARCH_SOURCES:
+        new_row = f"new.rowid * 4 + {code}, '{kind}', new.{key}, new.{name}, {'new.' + email if email != 'NULL' else 'NULL'}"
+        insert = f'INSERT INTO search_index (rowid, kind, key, name, email) VALUES ({new_row});'
+        delete = f'DELETE FROM search_index WHERE rowid = old.rowid * 4 + {code};'
+        statements += [
+            f'CREATE TRIGGER IF NOT EXISTS {table}_search_insert AFTER INSERT ON {table} BEGIN {insert} END',
+            f'CREATE TRIGGER IF NOT EXISTS {table}_search_update AFTER UPDATE ON {table} BEGIN {delete} {insert} END',
+            f'CREATE TRIGGER IF NOT EXISTS {table}_search_delete AFTER DELETE ON {table} BEGIN {delete} END',
+        ]
+    return statements
+
+
+def _search_index_fill_statements():
+    """
+    Build the statements that fill the full-text search index from the current table contents.
+
+    Returns:
+        list of str: The INSERT statements.
+    """
+    return [f"INSERT INTO search_index (rowid, kind, key, name, email) "
+            f"SELECT rowid * 4 + {code}, '{kind}', {key}, {name}, {email} FROM {table}"
+            for kind, table, code, key, name, email in _SEARCH_SOURCES]
+
+def _search_index_in_sync(cursor):
+    """
+    Check that the full-text search index holds exactly one entry for every row of its source
+    tables, under the row's current rowid.
+
+    The index falls out of step when rows are renumbered (by VACUUM) or the database file is
+    replaced by a copy made without the triggers, such as a restored backup of an old version.
+
+    Returns:
+        bool: Whether the index matches its source tables.
+    """
+    matched = ' + '.join(f'(SELECT count(*) FROM {table} t JOIN search_index i '
+                         f'ON i.rowid = t.rowid * 4 + {code} AND i.key = t.{key})'
+                         for _, table, code, key, _, _ in _SEARCH_SOURCES)
+    rows = ' + '.join(f'(SELECT count(*) FROM {table})' for _, table, *_ in _SEARCH_SOURCES)
+    cursor.execute(f'SELECT {matched}, {rows}, (SELECT count(*) FROM search_index)')
+    matched, rows, indexed = cursor.fetchone()
+    return matched == rows == indexed
+
+
+# Tables whose changes are recorded in the change log, with their primary key columns.
+_LOGGED_TABLES = [
+    ('students', ('student_id',)),
+    ('instructors', ('instructor_id',)),
+    ('courses', ('course_id',)),
+    ('registrations', ('student_id', 'course_id')),
+]
+
 
+def _change_log_statements():
+    """
+    Build the statements that create the change log, the table version counters and the
+    triggers that append every insert, update and delete to them.
+
+    Returns:
+        list of str: The CREATE and INSERT statements.
+    """
+    statements = [
+        """CREATE TABLE IF NOT EXISTS changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            table_name TEXT NOT NULL,
+            operation TEXT NOT NULL,
+            row_key TEXT NOT NULL,
+            row_key2 TEXT
+        )""",
+        """CREATE TABLE IF NOT EXISTS table_versions (
+            table_name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )""",
+    ]
+    for table, key_columns in _LOGGED_TABLES:
+        statements.append(f"INSERT OR IGNORE INTO table_versions (table_name, version) VALUES ('{table}', 0)")
+
+        def log(operation, row):
+            keys = [f'{row}.{column}' for column in key_columns] + ['NULL'] * (2 - len(key_columns))
+            return (f"INSERT INTO changes (table_name, operation, row_key, row_key2) "
+                    f"VALUES ('{table}', '{operation}', {', '.join(keys)});")
+
+        bump = f"UPDATE table_versions SET version = version + 1 WHERE table_name = '{table}';"
+        same_key = ' AND '.join(f'old.{column} IS new.{column}' for column in key_columns)
+        statements += [
+            f'CREATE TRIGGER IF NOT EXISTS {table}_log_insert AFTER INSERT ON {table} '
+            f"BEGIN {log('insert', 'new')} {bump} END",
+            f'CREATE TRIGGER IF NOT EXISTS {table}_log_update AFTER UPDATE ON {table} WHEN {same_key} '
+            f"BEGIN {log('update', 'new')} {bump} END",
+            # A changed primary key is logged as the old row going away and a new one appearing
+            f'CREATE TRIGGER IF NOT EXISTS {table}_log_rekey AFTER UPDATE ON {table} WHEN NOT ({same_key}) '
+            f"BEGIN {log('delete', 'old')} {log('insert', 'new')} {bump} END",
+            f'CREATE TRIGGER IF NOT EXISTS {table}_log_delete AFTER DELETE ON {table} '
+            f"BEGIN {log('delete', 'old')} {bump} END",
+        ]
+    return statements
+
+
+# CHECK constraints added by migration 6, per table: (constraint name, condition). They hold the
+# main rules of data_validation.py, so rows that are read back can be trusted without validating
+# them again; the email rule is looser than the validator's pattern.
+_CHECK_CONSTRAINTS = {
+    'instructors': [
+        ('instructor_id_not_blank', "trim(instructor_id) <> ''"),
+        ('instructor_name_length', 'length(trim(name)) > 1'),
+        ('instructor_age_range', "typeof(age) = 'integer' AND age >= 0"),
+        ('instructor_email_format', "email LIKE '%_@_%._%'"),
+    ],
+    'students': [
+        ('student_id_not_blank', "trim(student_id) <> ''"),
+        ('student_name_length', 'length(trim(name)) > 1'),
+        ('student_age_range', "typeof(age) = 'integer' AND age >= 0"),
+        ('student_email_format', "email LIKE '%_@_%._%'"),
+    ],
+    'courses': [
+        ('course_id_not_blank', "trim(course_id) <> ''"),
+        ('course_name_not_blank', "trim(course_name) <> ''"),
+    ],
+}
+
+# Column definitions of the tables rebuilt by migration 6, in their current form
+_CHECKED_TABLE_COLUMNS = {
+    'instructors': ['instructor_id TEXT PRIMARY KEY', 'name TEXT NOT NULL', 'age INTEGER NOT NULL', 'email TEXT NOT NULL'],
+    'students': ['student_id TEXT PRIMARY KEY', 'name TEXT NOT NULL', 'age INTEGER NOT NULL', 'email TEXT NOT NULL'],
+    'courses': ['course_id TEXT PRIMARY KEY', 'course_name TEXT NOT NULL', 'instructor_id TEXT',
+                'FOREIGN KEY (instructor_id) REFERENCES instructors(instructor_id) ON DELETE SET NULL'],
+}
+
+
+def _check_constraint_statements():
+    """
+    Build the statements that rebuild students, instructors and courses with CHECK constraints.
+
+    Rows that break a constraint are not dropped: they are moved to a `quarantined_<table>`
+    table to be fixed by hand, logged as deleted, and registrations left without their student
+    or course are moved to `quarantined_registrations`. A course whose instructor was moved
+    keeps no instructor.
+
+    Returns:
+        list of str: The statements.
+    """
+    statements = []
+    for table, checks in _CHECK_CONSTRAINTS.items():
+        key = dict(_LOGGED_TABLES)[table][0]
+        passes = '(' + ' AND '.join(f'({condition})' for _, condition in checks) + ') IS 1'
+        definitions = _CHECKED_TABLE_COLUMNS[table] + [f'CONSTRAINT {name} CHECK ({condition})' for name, condition in checks]
+        columns = ', '.join(definition.split()[0] for definition in _CHECKED_TABLE_COLUMNS[table]
+                            if not definition.startswith('FOREIGN'))
+        source = columns
+        if table == 'courses':
+            source = ('course_id, course_name, '
+                      '(SELECT i.instructor_id FROM instructors_new i WHERE i.instructor_id = courses.instructor_id)')
+            # Courses that lose their instructor are changed rows
+            statements.append(
+                f"INSERT INTO changes (table_name, operation, row_key) SELECT 'courses', 'update', course_id FROM courses "
+                f"WHERE {passes} AND instructor_id NOT IN (SELECT instructor_id FROM instructors_new)")
+        statements += [
+            f'CREATE TABLE {table}_new (\n    ' + ',\n    '.join(definitions) + '\n)',
+            f'CREATE TABLE IF NOT EXISTS quarantined_{table} AS SELECT {columns} FROM {table} WHERE 0',
+            f'INSERT INTO quarantined_{table} SELECT {columns} FROM {table} WHERE NOT ({passes})',
+            f"INSERT INTO changes (table_name, operation, row_key) SELECT '{table}', 'delete', {key} "
+            f"FROM {table} WHERE NOT ({passes})",
+            f'INSERT INTO {table}_new (rowid, {columns}) SELECT rowid, {source} FROM {table} WHERE {passes}',
+        ]
+    orphaned = ('NOT EXISTS (SELECT 1 FROM students_new s WHERE s.student_id = registrations.student_id) '
+                'OR NOT EXISTS (SELECT 1 FROM courses_new c WHERE c.course_id = registrations.course_id)')
+    statements += [
+        'CREATE TABLE IF NOT EXISTS quarantined_registrations AS SELECT student_id, course_id FROM registrations WHERE 0',
+        f'INSERT INTO quarantined_registrations SELECT student_id, course_id FROM registrations WHERE {orphaned}',
+        # Logged by the registrations triggers, which are still in place
+        f'DELETE FROM registrations WHERE {orphaned}',
+    ]
+    for table in _CHECK_CONSTRAINTS:
+        statements.append(f'DROP TABLE {table}')
+    for table in _CHECK_CONSTRAINTS:
+        statements.append(f'ALTER TABLE {table}_new RENAME TO {table}')
+    statements += [
+        'CREATE INDEX IF NOT EXISTS idx_students_name_id ON students(name, student_id)',
+        'CREATE INDEX IF NOT EXISTS idx_instructors_name_id ON instructors(name, instructor_id)',
+        'CREATE INDEX IF NOT EXISTS idx_courses_instructor_id ON courses(instructor_id)',
+        'CREATE INDEX IF NOT EXISTS idx_courses_name_id ON courses(course_name, course_id)',
+        "UPDATE table_versions SET version = version + 1 WHERE table_name IN ('students', 'instructors', 'courses')",
+        # Quarantined rows leave entries behind in the search index, so it is filled again
+        'DELETE FROM search_index',
+    ]
+    return statements + _search_index_fill_statements() + _search_index_statements() + _change_log_statements()
+
+
+# A registration whose student or course is missing, before migration 5 enforced foreign keys
+_ORPHANED_REGISTRATION = ('NOT EXISTS (SELECT 1 FROM students s WHERE s.student_id = registrations.student_id) '
+                          'OR NOT EXISTS (SELECT 1 FROM courses c WHERE c.course_id = registrations.course_id)')
+
+# Schema migrations, applied in order by create_database. PRAGMA user_version records how many
+# of them a database file has already been through, so existing files are upgraded in place.
+_MIGRATIONS = [
+    # 1: Secondary indexes for name lookups and the registration/course joins
+    [
+        'CREATE INDEX IF NOT EXISTS idx_students_name ON students(name)',
+        'CREATE INDEX IF NOT EXISTS idx_instructors_name ON instructors(name)',
+        'CREATE INDEX IF NOT EXISTS idx_registrations_course_id ON registrations(course_id)',
+        'CREATE INDEX IF NOT EXISTS idx_courses_instructor_id ON courses(instructor_id)',
+    ],
+    # 2: Name indexes that also cover the primary key, so keyset pages ordered by name need no sort
+    [
+        'DROP INDEX IF EXISTS idx_students_name',
+        'DROP INDEX IF EXISTS idx_instructors_name',
+        'CREATE INDEX IF NOT EXISTS idx_students_name_id ON students(name, student_id)',
+        'CREATE INDEX IF NOT EXISTS idx_instructors_name_id ON instructors(name, instructor_id)',
+        'CREATE INDEX IF NOT EXISTS idx_courses_name_id ON courses(course_name, course_id)',
+    ],
+    # 3: Full-text search index over people and courses, kept in sync by triggers
+    _search_index_statements() + _search_index_fill_statements(),
+    # 4: Change log and per-table version counters
+    _change_log_statements(),
+    # 5: Enforced foreign keys. SQLite cannot alter a constraint, so courses and registrations are
+    # rebuilt: a course whose instructor is gone (or was stored as "") gets a NULL instructor, and
+    # registrations of missing students or courses are moved to quarantined_registrations, as in
+    # migration 6. Rowids are kept for the search index.
+    [
+        '''CREATE TABLE courses_new (
+            course_id TEXT PRIMARY KEY,
+            course_name TEXT NOT NULL,
+            instructor_id TEXT,
+            FOREIGN KEY (instructor_id) REFERENCES instructors(instructor_id) ON DELETE SET NULL
+        )''',
+        '''INSERT INTO courses_new (rowid, course_id, course_name, instructor_id)
+           SELECT c.rowid, c.course_id, c.course_name, i.instructor_id
+           FROM courses c LEFT JOIN instructors i ON i.instructor_id = c.instructor_id''',
+        '''CREATE TABLE registrations_new (
+            student_id TEXT,
+            course_id TEXT,
+            FOREIGN KEY (student_id) REFERENCES students(student_id) ON DELETE CASCADE,
+            FOREIGN KEY (course_id) REFERENCES courses(course_id) ON DELETE CASCADE,
+            PRIMARY KEY (student_id, course_id)
+        )''',
+        'CREATE TABLE IF NOT EXISTS quarantined_registrations AS SELECT student_id, course_id FROM registrations WHERE 0',
+        f'INSERT INTO quarantined_registrations SELECT student_id, course_id FROM registrations WHERE {_ORPHANED_REGISTRATION}',
+        # Logged by the registrations triggers of migration 4
+        f'DELETE FROM registrations WHERE {_ORPHANED_REGISTRATION}',
+        'INSERT INTO registrations_new (student_id, course_id) SELECT student_id, course_id FROM registrations',
+        'DROP TABLE registrations',
+        'DROP TABLE courses',
+        'ALTER TABLE courses_new RENAME TO courses',
+        'ALTER TABLE registrations_new RENAME TO registrations',
+        'CREATE INDEX IF NOT EXISTS idx_registrations_course_id ON registrations(course_id)',
+        'CREATE INDEX IF NOT EXISTS idx_courses_instructor_id ON courses(instructor_id)',
+        'CREATE INDEX IF NOT EXISTS idx_courses_name_id ON courses(course_name, course_id)',
+        "UPDATE table_versions SET version = version + 1 WHERE table_name IN ('courses', 'registrations')",
+    ] + _search_index_statements() + _change_log_statements(),
+    # 6: CHECK constraints mirroring the validation rules; rows that break them are quarantined
+    _check_constraint_statements(),
+    # 7: A random ID for the database, so files saved from it can tell it apart from other databases
+    [
+        'CREATE TABLE IF NOT EXISTS database_info (name TEXT PRIMARY KEY, value TEXT NOT NULL)',
+        "INSERT OR IGNORE INTO database_info (name, value) VALUES ('id', lower(hex(randomblob(16))))",
+    ],
+]
+
+
+def _migrate(cursor):
+    """
+    Apply every schema migration the database has not been through yet.
+
+    Parameters:
+        cursor (sqlite3.Cursor): A cursor on the database to upgrade.
+    """
+    cursor.execute('PRAGMA user_version')
+    version = cursor.fetchone()[0]
+    if version >= len(_MIGRATIONS):
+        return
+
+    # Dropping a table that other tables reference would run their ON DELETE actions, so foreign
+    # keys are switched off while migrating. That is only possible outside a transaction.
+    conn = cursor.connection
     conn.commit()
-    conn.close()
+    cursor.execute('PRAGMA foreign_keys = OFF')
+    try:
+        # sqlite3 opens no transaction of its own before CREATE or DROP statements, so one is
+        # begun explicitly: every migration and the user_version bump commit or roll back together
+        cursor.execute('BEGIN')
+        for number, statements in enumerate(_MIGRATIONS[version:], start=version + 1):
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute(f'PRAGMA user_version = {number}')
+        cursor.execute('PRAGMA foreign_key_check')
+        if cursor.fetchone() is not None:
+            raise sqlite3.IntegrityError("Foreign key check failed after migrating the database.")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute('PRAGMA foreign_keys = ON')
+
+@_write
 def db_add_student(student_id, name, age, email):
     """
     Add a new student to the Students table.
@@ -62,13 +890,14 @@ def db_add_student(student_id, name, age, email):
         age (int): The age of the student.
         email (str): The email of the student.
     """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-    cursor.execute('INSERT INTO students (student_id, name, age, email) VALUES (?, ?, ?, ?)', 
-                   (student_id, name, age, email))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('INSERT INTO students (student_id, name, age, email) VALUES (?, ?, ?, ?)',
+                       (student_id, name, age, email))
+        event_bus.publish('students', 'added', [student_id])
+        _commit(conn)
 
+@_write
 def db_add_instructor(instructor_id, name, age, email):
     """
     Add a new instructor to the Instructors table.
@@ -79,13 +908,14 @@ def db_add_instructor(instructor_id, name, age, email):
         age (int): The age of the instructor.
         email (str): The email of the instructor.
     """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-    cursor.execute('INSERT INTO instructors (instructor_id, name, age, email) VALUES (?, ?, ?, ?)', 
-                   (instructor_id, name, age, email))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('INSERT INTO instructors (instructor_id, name, age, email) VALUES (?, ?, ?, ?)',
+                       (instructor_id, name, age, email))
+        event_bus.publish('instructors', 'added', [instructor_id])
+        _commit(conn)
 
+@_write
 def db_add_course(course_id, course_name, instructor_id):
     """
     Add a new course to the Courses table.
@@ -93,30 +923,30 @@ def db_add_course(course_id, course_name, instructor_id):
     Parameters:
         course_id (str): The unique identifier for the course.
         course_name (str): The name of the course.
-        instructor_id (str): The ID of the instructor assigned to the course (must exist in the Instructors table).
-    """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-    if not instructor_id:
-        instructor_id=""
-    cursor.execute('INSERT INTO courses (course_id, course_name, instructor_id) VALUES (?, ?, ?)', 
-                   (course_id, course_name, instructor_id))
-    conn.commit()
-    conn.close()
+        instructor_id (str): The ID of the instructor assigned to the course (must exist in the Instructors
+            table), or None if the course has no instructor yet.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        if not instructor_id:
+            instructor_id=None
+        cursor.execute('INSERT INTO courses (course_id, course_name, instructor_id) VALUES (?, ?, ?)',
+                       (course_id, course_name, instructor_id))
+        event_bus.publish('courses', 'added', [course_id])
+        _commit(conn)
 
 def fetch_students():
     """
     Fetch all students from the Students table.
 
     Returns:
-        list of tuple: A list of all students, where each student is represented as a tuple 
+        list of tuple: A list of all students, where each student is represented as a tuple
         (student_id, name, age, email).
     """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM students')
-    students = cursor.fetchall()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM students')
+        students = cursor.fetchall()
     return students
 
 def fetch_instructors():
@@ -124,14 +954,13 @@ def fetch_instructors():
     Fetch all instructors from the Instructors table.
 
     Returns:
-        list of tuple: A list of all instructors, where each instructor is represented as a tuple 
+        list of tuple: A list of all instructors, where each instructor is represented as a tuple
         (instructor_id, name, age, email).
     """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM instructors')
-    instructors = cursor.fetchall()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM instructors')
+        instructors = cursor.fetchall()
     return instructors
 
 def fetch_courses():
@@ -139,16 +968,16 @@ def fetch_courses():
     Fetch all courses from the Courses table.
 
     Returns:
-        list of tuple: A list of all courses, where each course is represented as a tuple 
+        list of tuple: A list of all courses, where each course is represented as a tuple
         (course_id, course_name, instructor_id).
     """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT * FROM courses')
-    courses = cursor.fetchall()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT * FROM courses')
+        courses = cursor.fetchall()
     return courses
 
+@_write
 def db_update_student(student_id, name, age, email):
     """
     Update the details of an existing student in the Students table.
@@ -159,36 +988,39 @@ def db_update_student(student_id, name, age, email):
         age (int): The updated age of the student.
         email (str): The updated email of the student.
     """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-
-    try:
-        # Print statement to verify parameters
-        print(f"Updating student: {student_id}, {name}, {age}, {email}")
+    with get_connection() as conn:
+        cursor = conn.cursor()
 
-        # Update student details in the database
-        cursor.execute('''
-            UPDATE students 
-            SET name = ?, age = ?, email = ?
-            WHERE student_id = ?
-        ''', (name, age, email, student_id))
+        try:
+            # Print statement to verify parameters
+            print(f"Updating student: {student_id}, {name}, {age}, {email}")
 
-        # Ensure that changes are committed to the database
-        conn.commit()
+            # Update student details in the database
+            cursor.execute('''
+                UPDATE students
+                SET name = ?, age = ?, email = ?
+                WHERE student_id = ?
+            ''', (name, age, email, student_id))
+            if cursor.rowcount:
+                event_bus.publish('students', 'updated', [student_id])
 
-        # Check if the update was successful
-        if cursor.rowcount == 0:
-            print(f"No student found with ID: {student_id}")
-        else:
-            print(f"Student {student_id} updated successfully.")
+            # Ensure that changes are committed to the database
+            _commit(conn)
 
-    except sqlite3.Error as e:
-        print(f"An error occurred: {e}")
+            # Check if the update was successful
+            if cursor.rowcount == 0:
+                print(f"No student found with ID: {student_id}")
+            else:
+                print(f"Student {student_id} updated successfully.")
 
-    finally:
-        conn.close()
+        except sqlite3.IntegrityError:
+            # Values the table's constraints refuse are for the caller to report
+            raise
+        except sqlite3.Error as e:
+            print(f"An error occurred: {e}")
 
 
+@_write
 def db_update_instructor(instructor_id, name, age, email):
     """
     Update the details of an existing instructor in the Instructors table.
@@ -203,13 +1035,15 @@ def db_update_instructor(instructor_id, name, age, email):
         - Updates the instructor's name, age, and email in the database for the specified instructor ID.
         - Commits the changes to the database after the update.
     """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-    cursor.execute('UPDATE instructors SET name = ?, age = ?, email = ? WHERE instructor_id = ?', 
-                   (name, age, email, instructor_id))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('UPDATE instructors SET name = ?, age = ?, email = ? WHERE instructor_id = ?',
+                       (name, age, email, instructor_id))
+        if cursor.rowcount:
+            event_bus.publish('instructors', 'updated', [instructor_id])
+        _commit(conn)
 
+@_write
 def db_update_course(course_id, course_name, instructor_id):
     """
     Update the details of an existing course in the Courses table.
@@ -223,12 +1057,14 @@ def db_update_course(course_id, course_name, instructor_id):
         - Updates the course name and instructor ID for the specified course.
         - Commits the changes to the database after the update.
     """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-    cursor.execute('UPDATE courses SET course_name = ?, instructor_id = ? WHERE course_id = ?', 
-                   (course_name, instructor_id, course_id))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('UPDATE courses SET course_name = ?, instructor_id = ? WHERE course_id = ?',
+                       (course_name, instructor_id, course_id))
+        if cursor.rowcount:
+            event_bus.publish('courses', 'updated', [course_id])
+        _commit(conn)
+@_write
 def delete_student(student_id):
     """
     Delete a student from the Students table.
@@ -238,14 +1074,17 @@ def delete_student(student_id):
 
     Actions:
         - Deletes the student from the database based on the student ID.
+        - The student's registrations are deleted with it by the database (ON DELETE CASCADE).
         - Commits the deletion to the database.
     """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM students WHERE student_id = ?', (student_id,))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM students WHERE student_id = ?', (student_id,))
+        if cursor.rowcount:
+            event_bus.publish('students', 'deleted', [student_id])
+        _commit(conn)
 
+@_write
 def delete_instructor(instructor_id):
     """
     Delete an instructor from the Instructors table.
@@ -255,14 +1094,17 @@ def delete_instructor(instructor_id):
 
     Actions:
         - Deletes the instructor from the database based on the instructor ID.
+        - The instructor's courses are kept without an instructor (ON DELETE SET NULL).
         - Commits the deletion to the database.
     """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM instructors WHERE instructor_id = ?', (instructor_id,))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM instructors WHERE instructor_id = ?', (instructor_id,))
+        if cursor.rowcount:
+            event_bus.publish('instructors', 'deleted', [instructor_id])
+        _commit(conn)
 
+@_write
 def delete_course(course_id):
     """
     Delete a course from the Courses table.
@@ -272,116 +1114,1209 @@ def delete_course(course_id):
 
     Actions:
         - Deletes the course from the database based on the course ID.
+        - The course's registrations are deleted with it by the database (ON DELETE CASCADE).
         - Commits the deletion to the database.
     """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM courses WHERE course_id = ?', (course_id,))
-    conn.commit()
-    conn.close()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM courses WHERE course_id = ?', (course_id,))
+        if cursor.rowcount:
+            event_bus.publish('courses', 'deleted', [course_id])
+        _commit(conn)
 
-def fetch_registered_students(course_id):
+def _delete_many(table, key_columns, keys):
     """
-    Fetch all students registered for a specific course by course ID.
+    Delete the rows with the given keys from a table with a single statement.
+
+    The keys are passed as one JSON array parameter, so the statement is the same no matter how
+    many keys there are. Dependent rows are removed or detached by the foreign key actions.
 
     Parameters:
-        course_id (str): The unique identifier of the course.
+        table (str): The name of the table.
+        key_columns (tuple of str): The primary key columns.
+        keys (iterable): The keys of the rows to delete; tuples for a composite key.
 
     Returns:
-        list of tuple: A list of students registered for the course, where each student is represented 
-        as a tuple (student_id, name, email, age).
-
-    Actions:
-        - Queries the database to retrieve all students who are registered for the specified course.
-        - Joins the Students and Registrations tables to obtain the details of registered students.
+        int: The number of rows deleted.
     """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-    
-    query = '''
-    SELECT students.student_id, students.name, students.email, students.age 
-    FROM students
-    JOIN registrations ON students.student_id = registrations.student_id
-    WHERE registrations.course_id = ?
-    '''
-    
-    cursor.execute(query, (course_id,))
-    registered_students = cursor.fetchall()
-    conn.close()
-    
-    return registered_students
+    keys = [list(key) if len(key_columns) > 1 else key for key in keys]
+    if not keys:
+        return 0
+    key_list = ', '.join(key_columns)
+    if len(key_columns) == 1:
+        values = 'value'
+    else:
+        values = ', '.join(f"json_extract(value, '$[{i}]')" for i in range(len(key_columns)))
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'DELETE FROM {table} WHERE ({key_list}) IN (SELECT {values} FROM json_each(?)) '
+                       f'RETURNING {key_list}', (json.dumps(keys),))
+        deleted = [row[0] if len(key_columns) == 1 else row for row in cursor.fetchall()]
+        event_bus.publish(table, 'deleted', deleted)
+        _commit(conn)
+    return len(deleted)
 
-def db_register_student_to_course(student_name, course_id):
+@_write
+def delete_students(student_ids):
     """
-    Registers a student to a course in the database.
-
-    This function fetches the student ID for the given `student_name` by searching 
-    through the students table. If the student is found, it inserts a new record 
-    into the `registrations` table to register the student for the specified course.
+    Delete many students, together with their registrations, in one statement.
 
-    :param student_name: The name of the student to be registered.
-    :param course_id: The ID of the course the student is being registered for.
+    Parameters:
+        student_ids (iterable of str): The IDs of the students to delete.
 
-    :raises sqlite3.Error: If the database insertion fails, the transaction is rolled back.
+    Returns:
+        int: The number of students deleted.
+    """
+    return _delete_many('students', ('student_id',), student_ids)
 
-    :return: None
+@_write
+def delete_instructors(instructor_ids):
     """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-    
-    student_id = None
-    students = fetch_students()
-    for student in students:
-        if student[1] == student_name:
-            student_id = student[0]
-            break
-    
-    if student_id:
-        try:
-            cursor.execute('INSERT INTO registrations (student_id, course_id) VALUES (?, ?)', (student_id, course_id))
-            conn.commit()
-        except sqlite3.Error as e:
-            conn.rollback()
-        finally:
-            conn.close()
-    else:
-        print("Error", f"Student {student_name} not found")
+    Delete many instructors in one statement. Their courses are kept without an instructor.
 
-# Function to assign an instructor to a course
-def db_assign_course_to_instructor(instructor_name, course_id):
+    Parameters:
+        instructor_ids (iterable of str): The IDs of the instructors to delete.
+
+    Returns:
+        int: The number of instructors deleted.
     """
-    Assigns an instructor to a course in the database.
+    return _delete_many('instructors', ('instructor_id',), instructor_ids)
 
-    This function fetches the instructor ID for the given `instructor_name` by searching 
-    through the instructors table. If the instructor is found, it updates the `courses` 
-    table to assign the instructor to the specified course.
+@_write
+def delete_courses(course_ids):
+    """
+    Delete many courses, together with their registrations, in one statement.
 
-    :param instructor_name: The name of the instructor to assign.
-    :param course_id: The ID of the course the instructor is being assigned to.
+    Parameters:
+        course_ids (iterable of str): The IDs of the courses to delete.
 
-    :raises sqlite3.Error: If the database update fails, the transaction is rolled back.
+    Returns:
+        int: The number of courses deleted.
+    """
+    return _delete_many('courses', ('course_id',), course_ids)
 
-    :return: None
+@_write
+def delete_registrations(registrations):
     """
-    conn = sqlite3.connect('school_management.db')
-    cursor = conn.cursor()
-
-    instructor_id = None
-    instructors = fetch_instructors()
-    for instructor in instructors:
-        if instructor[1] == instructor_name:
-            instructor_id = instructor[0]
-            break
-    
-    if instructor_id:
+    Delete many registrations in one statement.
+
+    Parameters:
+        registrations (iterable of tuple): The registrations to delete, each as a tuple (student_id, course_id).
+
+    Returns:
+        int: The number of registrations deleted.
+    """
+    return _delete_many('registrations', ('student_id', 'course_id'), registrations)
+
+def fetch_students_by_ids(student_ids):
+    """
+    Fetch the students with the given IDs.
+
+    Parameters:
+        student_ids (iterable of str): The unique identifiers of the students.
+
+    Returns:
+        list of tuple: The students that exist, each as a tuple (student_id, name, age, email).
+    """
+    student_ids = list(student_ids)
+    students = []
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for start in range(0, len(student_ids), BULK_CHUNK_SIZE):
+            chunk = student_ids[start:start + BULK_CHUNK_SIZE]
+            cursor.execute(f'SELECT student_id, name, age, email FROM students WHERE student_id IN ({", ".join("?" * len(chunk))})',
+                           chunk)
+            students.extend(cursor.fetchall())
+    return students
+
+def fetch_existing_ids(table, ids):
+    """
+    Find which of the given IDs exist in a table, with one query per `BULK_CHUNK_SIZE` IDs.
+
+    Parameters:
+        table (str): 'students', 'instructors' or 'courses'.
+        ids (iterable of str): The IDs to look up.
+
+    Raises:
+        ValueError: If `table` is not one of the tables above.
+
+    Returns:
+        set of str: The IDs that exist.
+    """
+    if table not in ('students', 'instructors', 'courses'):
+        raise ValueError(f"Unknown table: {table}")
+    key = _TABLE_COLUMNS[table][0]
+    ids = list(ids)
+    existing = set()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        for start in range(0, len(ids), BULK_CHUNK_SIZE):
+            chunk = ids[start:start + BULK_CHUNK_SIZE]
+            cursor.execute(f'SELECT {key} FROM {table} WHERE {key} IN ({", ".join("?" * len(chunk))})', chunk)
+            existing.update(row[0] for row in cursor.fetchall())
+    return existing
+
+def fetch_student_id_by_name(name):
+    """
+    Look up the ID of a student by name using the index on `students(name, student_id)`.
+
+    Parameters:
+        name (str): The name of the student.
+
+    Returns:
+        str: The ID of the first student with that name, or None if there is none.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT student_id FROM students WHERE name = ? LIMIT 1', (name,))
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+def fetch_instructor_id_by_name(name):
+    """
+    Look up the ID of an instructor by name using the index on `instructors(name, instructor_id)`.
+
+    Parameters:
+        name (str): The name of the instructor.
+
+    Returns:
+        str: The ID of the first instructor with that name, or None if there is none.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT instructor_id FROM instructors WHERE name = ? LIMIT 1', (name,))
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+def fetch_registered_students(course_id):
+    """
+    Fetch all students registered for a specific course by course ID.
+
+    Parameters:
+        course_id (str): The unique identifier of the course.
+
+    Returns:
+        list of tuple: A list of students registered for the course, where each student is represented
+        as a tuple (student_id, name, email, age).
+
+    Actions:
+        - Queries the database to retrieve all students who are registered for the specified course.
+        - Joins the Students and Registrations tables to obtain the details of registered students.
+    """
+    query = '''
+    SELECT students.student_id, students.name, students.email, students.age
+    FROM students
+    JOIN registrations ON students.student_id = registrations.student_id
+    WHERE registrations.course_id = ?
+    '''
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, (course_id,))
+        registered_students = cursor.fetchall()
+
+    return registered_students
+
+@_write
+def db_register_student_to_course(student_name, course_id):
+    """
+    Registers a student to a course in the database.
+
+    This function looks up the student ID for the given `student_name` through the
+    index on the students table. If the student is found, it inserts a new record
+    into the `registrations` table to register the student for the specified course.
+
+    :param student_name: The name of the student to be registered.
+    :param course_id: The ID of the course the student is being registered for.
+
+    :raises sqlite3.Error: If the database insertion fails, the transaction is rolled back.
+
+    :return: None
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        student_id = fetch_student_id_by_name(student_name)
+
+        if student_id:
+            try:
+                cursor.execute('INSERT INTO registrations (student_id, course_id) VALUES (?, ?)', (student_id, course_id))
+                event_bus.publish('registrations', 'added', [(student_id, course_id)])
+                _commit(conn)
+            except sqlite3.Error as e:
+                _rollback(conn)
+        else:
+            print("Error", f"Student {student_name} not found")
+
+# Function to assign an instructor to a course
+@_write
+def db_assign_course_to_instructor(instructor_name, course_id):
+    """
+    Assigns an instructor to a course in the database.
+
+    This function looks up the instructor ID for the given `instructor_name` through the
+    index on the instructors table. If the instructor is found, it updates the `courses`
+    table to assign the instructor to the specified course.
+
+    :param instructor_name: The name of the instructor to assign.
+    :param course_id: The ID of the course the instructor is being assigned to.
+
+    :raises sqlite3.Error: If the database update fails, the transaction is rolled back.
+
+    :return: None
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+
+        instructor_id = fetch_instructor_id_by_name(instructor_name)
+
+        if instructor_id:
+            try:
+                cursor.execute('UPDATE courses SET instructor_id = ? WHERE course_id = ?', (instructor_id, course_id))
+                if cursor.rowcount:
+                    event_bus.publish('courses', 'updated', [course_id])
+                _commit(conn)
+                print("Success", f"{instructor_name} has been assigned to {course_id}")
+            except sqlite3.Error as e:
+                _rollback(conn)
+                print("Error", str(e))
+        else:
+            print("Error", f"Instructor {instructor_name} not found")
+
+BULK_CHUNK_SIZE = 500
+
+
+def _bulk_insert(table, columns, key_columns, records, chunk_size):
+    """
+    Insert many rows into a table using `executemany`, all inside a single transaction.
+
+    Rows whose primary key already exists in the table, or appears earlier in the same batch,
+    are not inserted and are reported as conflicts instead of aborting the whole batch.
+
+    Parameters:
+        table (str): The name of the table to insert into.
+        columns (tuple of str): The columns given by each record, in order.
+        key_columns (tuple of str): The primary key columns, which must be the first columns of each record.
+        records (iterable of tuple): The rows to insert.
+        chunk_size (int): The number of rows sent to `executemany` at a time.
+
+    Returns:
+        list of tuple: One `(key, status)` pair per record, in input order, where `status` is
+        either 'inserted' or 'conflict'.
+    """
+    key_length = len(key_columns)
+    key_list = ', '.join(key_columns)
+    insert_sql = f'INSERT INTO {table} ({", ".join(columns)}) VALUES ({", ".join("?" * len(columns))})'
+    row_placeholder = '(' + ', '.join('?' * key_length) + ')'
+    report = []
+    seen = set()
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
         try:
-            cursor.execute('UPDATE courses SET instructor_id = ? WHERE course_id = ?', (instructor_id, course_id))
-            conn.commit()
-            print("Success", f"{instructor_name} has been assigned to {course_id}")
-        except sqlite3.Error as e:
-            conn.rollback()
-            print("Error", str(e))
-        finally:
-            conn.close()
+            for chunk in _chunked(records, chunk_size):
+                _insert_chunk(cursor, chunk, insert_sql, table, key_list, row_placeholder, key_length, seen, report)
+            event_bus.publish(table, 'added', [key for key, status in report if status == 'inserted'])
+            _commit(conn)
+        except sqlite3.Error:
+            _rollback(conn)
+            raise
+    return report
+
+
+def _chunked(records, chunk_size):
+    """
+    Split an iterable of records into lists of at most `chunk_size` tuples.
+    """
+    chunk = []
+    for record in records:
+        chunk.append(tuple(record))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def _existing_keys(cursor, table, key_list, row_placeholder, keys):
+    """
+    Find which of the given primary keys are already present in a table.
+
+    Returns:
+        list of tuple: The keys that exist, as tuples of key values.
+    """
+    placeholders = ', '.join([row_placeholder] * len(keys))
+    cursor.execute(f'SELECT {key_list} FROM {table} WHERE ({key_list}) IN (VALUES {placeholders})',
+                   [value for key in keys for value in key])
+    return cursor.fetchall()
+
+def _insert_chunk(cursor, chunk, insert_sql, table, key_list, row_placeholder, key_length, seen, report):
+    """
+    Insert one chunk of rows for `_bulk_insert`, skipping and reporting key conflicts.
+    """
+    keys = [record[:key_length] for record in chunk]
+    seen.update(_existing_keys(cursor, table, key_list, row_placeholder, keys))
+
+    rows = []
+    for key, record in zip(keys, chunk):
+        report_key = key[0] if key_length == 1 else key
+        if key in seen:
+            report.append((report_key, 'conflict'))
+        else:
+            seen.add(key)
+            rows.append(record)
+            report.append((report_key, 'inserted'))
+    cursor.executemany(insert_sql, rows)
+
+
+@_write
+def db_add_students(students, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Add many students to the Students table in a single transaction.
+
+    Parameters:
+        students (iterable of tuple): The students to add, each as a tuple (student_id, name, age, email).
+        chunk_size (int): The number of rows inserted per `executemany` call.
+
+    Returns:
+        list of tuple: One `(student_id, status)` pair per student, where `status` is 'inserted',
+        or 'conflict' when the student ID already exists.
+    """
+    return _bulk_insert('students', ('student_id', 'name', 'age', 'email'), ('student_id',),
+                        students, chunk_size)
+
+@_write
+def db_add_instructors(instructors, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Add many instructors to the Instructors table in a single transaction.
+
+    Parameters:
+        instructors (iterable of tuple): The instructors to add, each as a tuple (instructor_id, name, age, email).
+        chunk_size (int): The number of rows inserted per `executemany` call.
+
+    Returns:
+        list of tuple: One `(instructor_id, status)` pair per instructor, where `status` is 'inserted',
+        or 'conflict' when the instructor ID already exists.
+    """
+    return _bulk_insert('instructors', ('instructor_id', 'name', 'age', 'email'), ('instructor_id',),
+                        instructors, chunk_size)
+
+@_write
+def db_add_courses(courses, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Add many courses to the Courses table in a single transaction.
+
+    Parameters:
+        courses (iterable of tuple): The courses to add, each as a tuple (course_id, course_name, instructor_id).
+        chunk_size (int): The number of rows inserted per `executemany` call.
+
+    Returns:
+        list of tuple: One `(course_id, status)` pair per course, where `status` is 'inserted',
+        or 'conflict' when the course ID already exists.
+    """
+    courses = ((course_id, course_name, instructor_id or None) for course_id, course_name, instructor_id in courses)
+    return _bulk_insert('courses', ('course_id', 'course_name', 'instructor_id'), ('course_id',),
+                        courses, chunk_size)
+
+@_write
+def db_register_students_to_courses(registrations, chunk_size=BULK_CHUNK_SIZE):
+    """
+    Register many students to courses in a single transaction.
+
+    Parameters:
+        registrations (iterable of tuple): The registrations to add, each as a tuple (student_id, course_id).
+        chunk_size (int): The number of rows inserted per `executemany` call.
+
+    Returns:
+        list of tuple: One `((student_id, course_id), status)` pair per registration, where `status` is
+        'inserted', or 'conflict' when the student is already registered for the course.
+    """
+    return _bulk_insert('registrations', ('student_id', 'course_id'), ('student_id', 'course_id'),
+                        registrations, chunk_size)
+
+UPSERT_POLICIES = ('update', 'keep', 'error')
+
+
+def _upsert(table, columns, key_columns, records, policy, chunk_size):
+    """
+    Insert many rows into a table, merging rows whose primary key already exists, in a single transaction.
+
+    Each chunk is written with one `INSERT ... ON CONFLICT` statement, so merging a snapshot into
+    an existing database is one pass over the records with an index lookup per row. With the
+    'update' policy an existing row is only rewritten when one of its columns actually differs,
+    so unchanged rows cost no write and do not appear in the change log. A key given more than
+    once in a chunk is written once, with its last record, as if the records were applied in
+    order; with the 'error' policy such a chunk raises instead.
+
+    Parameters:
+        table (str): The name of the table to write to.
+        columns (tuple of str): The columns given by each record, in order.
+        key_columns (tuple of str): The primary key columns, which must be the first columns of each record.
+        records (iterable of tuple): The rows to merge.
+        policy (str): What to do with a record whose key already exists: 'update' overwrites the
+            stored row, 'keep' leaves it as it is, and 'error' raises and rolls everything back.
+        chunk_size (int): The number of rows written per statement.
+
+    Raises:
+        ValueError: If `policy` is not one of `UPSERT_POLICIES`.
+        sqlite3.IntegrityError: With the 'error' policy, if a key already exists.
+
+    Returns:
+        dict: The number of rows 'inserted', 'updated' and 'unchanged'.
+    """
+    if policy not in UPSERT_POLICIES:
+        raise ValueError(f"Unknown conflict policy: {policy}")
+    key_length = len(key_columns)
+    key_list = ', '.join(key_columns)
+    value_columns = [column for column in columns if column not in key_columns]
+    if policy == 'error':
+        conflict = ''
+    elif policy == 'update' and value_columns:
+        assignments = ', '.join(f'{column} = excluded.{column}' for column in value_columns)
+        stored = ', '.join(f'{table}.{column}' for column in value_columns)
+        incoming = ', '.join(f'excluded.{column}' for column in value_columns)
+        conflict = f'ON CONFLICT ({key_list}) DO UPDATE SET {assignments} WHERE ({stored}) IS NOT ({incoming})'
+    else:
+        conflict = f'ON CONFLICT ({key_list}) DO NOTHING'
+    row_placeholder = '(' + ', '.join('?' * len(columns)) + ')'
+    key_placeholder = '(' + ', '.join('?' * key_length) + ')'
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+    added, updated = [], []
+    seen = set()
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            for chunk in _chunked(records, chunk_size):
+                if policy != 'error':
+                    # One statement cannot write a key twice, so only the last record of each key is kept
+                    chunk = list({record[:key_length]: record for record in chunk}.values())
+                keys = [record[:key_length] for record in chunk]
+                seen.update(_existing_keys(cursor, table, key_list, key_placeholder, keys))
+                fresh = set()
+                for key in keys:
+                    if key not in seen:
+                        seen.add(key)
+                        fresh.add(key)
+                        added.append(key[0] if key_length == 1 else key)
+
+                cursor.execute(f'INSERT INTO {table} ({", ".join(columns)}) '
+                               f'VALUES {", ".join([row_placeholder] * len(chunk))} {conflict} RETURNING {key_list}',
+                               [value for record in chunk for value in record])
+                written = cursor.fetchall()
+                counts['inserted'] += len(fresh)
+                counts['updated'] += len(written) - len(fresh)
+                counts['unchanged'] += len(chunk) - len(written)
+                for key in written:
+                    # The first write of a fresh key is its insert; anything else is an update
+                    if key in fresh:
+                        fresh.discard(key)
+                    else:
+                        updated.append(key[0] if key_length == 1 else key)
+            event_bus.publish(table, 'added', added)
+            event_bus.publish(table, 'updated', updated)
+            _commit(conn)
+        except sqlite3.Error:
+            _rollback(conn)
+            raise
+    return counts
+
+@_write
+def upsert_students(students, policy='update', chunk_size=BULK_CHUNK_SIZE):
+    """
+    Merge many students into the Students table in a single transaction.
+
+    Parameters:
+        students (iterable of tuple): The students to merge, each as a tuple (student_id, name, age, email).
+        policy (str): 'update' to overwrite existing students, 'keep' to leave them unchanged, or
+            'error' to reject the whole batch if any of them exists.
+        chunk_size (int): The number of rows written per statement.
+
+    Returns:
+        dict: The number of students 'inserted', 'updated' and 'unchanged'.
+    """
+    return _upsert('students', ('student_id', 'name', 'age', 'email'), ('student_id',),
+                   students, policy, chunk_size)
+
+@_write
+def upsert_instructors(instructors, policy='update', chunk_size=BULK_CHUNK_SIZE):
+    """
+    Merge many instructors into the Instructors table in a single transaction.
+
+    Parameters:
+        instructors (iterable of tuple): The instructors to merge, each as a tuple (instructor_id, name, age, email).
+        policy (str): 'update' to overwrite existing instructors, 'keep' to leave them unchanged, or
+            'error' to reject the whole batch if any of them exists.
+        chunk_size (int): The number of rows written per statement.
+
+    Returns:
+        dict: The number of instructors 'inserted', 'updated' and 'unchanged'.
+    """
+    return _upsert('instructors', ('instructor_id', 'name', 'age', 'email'), ('instructor_id',),
+                   instructors, policy, chunk_size)
+
+@_write
+def upsert_courses(courses, policy='update', chunk_size=BULK_CHUNK_SIZE):
+    """
+    Merge many courses into the Courses table in a single transaction.
+
+    Parameters:
+        courses (iterable of tuple): The courses to merge, each as a tuple (course_id, course_name, instructor_id).
+        policy (str): 'update' to overwrite existing courses, 'keep' to leave them unchanged, or
+            'error' to reject the whole batch if any of them exists.
+        chunk_size (int): The number of rows written per statement.
+
+    Returns:
+        dict: The number of courses 'inserted', 'updated' and 'unchanged'.
+    """
+    courses = ((course_id, course_name, instructor_id or None) for course_id, course_name, instructor_id in courses)
+    return _upsert('courses', ('course_id', 'course_name', 'instructor_id'), ('course_id',),
+                   courses, policy, chunk_size)
+
+@_write
+def upsert_registrations(registrations, policy='update', chunk_size=BULK_CHUNK_SIZE):
+    """
+    Merge many registrations into the Registrations table in a single transaction.
+
+    A registration has no columns besides its key, so 'update' and 'keep' both leave existing
+    registrations unchanged.
+
+    Parameters:
+        registrations (iterable of tuple): The registrations to merge, each as a tuple (student_id, course_id).
+        policy (str): 'update' or 'keep' to skip existing registrations, or 'error' to reject the
+            whole batch if any of them exists.
+        chunk_size (int): The number of rows written per statement.
+
+    Returns:
+        dict: The number of registrations 'inserted', 'updated' (always 0) and 'unchanged'.
+    """
+    return _upsert('registrations', ('student_id', 'course_id'), ('student_id', 'course_id'),
+                   registrations, policy, chunk_size)
+
+PAGE_SIZE = 100
+
+
+def _fetch_page(table, columns, after, limit, order_by):
+    """
+    Fetch one page of a table using keyset pagination.
+
+    Rows are ordered by `order_by` and then by the primary key (the first column), which keeps
+    the order stable when several rows share the same value. Rows where `order_by` is NULL come
+    first. Instead of an OFFSET, the next page
+    starts right after the last row of the previous one, so every page costs an index seek no
+    matter how deep into the table it is.
+
+    Parameters:
+        table (str): The name of the table.
+        columns (tuple of str): The columns to select; the first one is the primary key.
+        after (tuple): The last row of the previous page, or None for the first page.
+        limit (int): The maximum number of rows to return.
+        order_by (str): The column to order by; must be one of `columns`.
+
+    Raises:
+        ValueError: If `order_by` is not a column of the table.
+
+    Returns:
+        list of tuple: Up to `limit` rows with the given columns.
+    """
+    if order_by not in columns:
+        raise ValueError(f"Cannot order {table} by {order_by}.")
+    key = columns[0]
+    select = f'SELECT {", ".join(columns)} FROM {table}'
+
+    if order_by == key:
+        order = key
+        where, params = (f' WHERE {key} > ?', [after[0]]) if after else ('', [])
     else:
-        print("Error", f"Instructor {instructor_name} not found")
+        # NULLs sort first. A row value comparison with a NULL in it is never true, so rows with
+        # no value are skipped once the page has passed them, and reached by a branch of their own
+        order = f'{order_by} NULLS FIRST, {key}'
+        value = after[columns.index(order_by)] if after else None
+        if not after:
+            where, params = '', []
+        elif value is None:
+            where, params = f' WHERE ({order_by} IS NULL AND {key} > ?) OR {order_by} IS NOT NULL', [after[0]]
+        else:
+            where, params = f' WHERE ({order_by}, {key}) > (?, ?)', [value, after[0]]
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'{select}{where} ORDER BY {order} LIMIT ?', params + [limit])
+        rows = cursor.fetchall()
+    return rows
+
+def _count(table):
+    """
+    Count the rows of a table.
+
+    Parameters:
+        table (str): The name of the table.
+
+    Returns:
+        int: The number of rows.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'SELECT COUNT(*) FROM {table}')
+        count = cursor.fetchone()[0]
+    return count
+
+def fetch_students_page(after=None, limit=PAGE_SIZE, order_by='student_id'):
+    """
+    Fetch one page of students.
+
+    Example:
+        page = fetch_students_page(order_by='name')
+        while page:
+            ...
+            page = fetch_students_page(after=page[-1], order_by='name')
+
+    Parameters:
+        after (tuple): The last student of the previous page, or None for the first page.
+        limit (int): The maximum number of students to return.
+        order_by (str): One of 'student_id', 'name', 'age' or 'email'.
+
+    Returns:
+        list of tuple: Up to `limit` students, each as a tuple (student_id, name, age, email).
+    """
+    return _fetch_page('students', ('student_id', 'name', 'age', 'email'), after, limit, order_by)
+
+def fetch_instructors_page(after=None, limit=PAGE_SIZE, order_by='instructor_id'):
+    """
+    Fetch one page of instructors. See `fetch_students_page` for how to walk through pages.
+
+    Parameters:
+        after (tuple): The last instructor of the previous page, or None for the first page.
+        limit (int): The maximum number of instructors to return.
+        order_by (str): One of 'instructor_id', 'name', 'age' or 'email'.
+
+    Returns:
+        list of tuple: Up to `limit` instructors, each as a tuple (instructor_id, name, age, email).
+    """
+    return _fetch_page('instructors', ('instructor_id', 'name', 'age', 'email'), after, limit, order_by)
+
+def fetch_courses_page(after=None, limit=PAGE_SIZE, order_by='course_id'):
+    """
+    Fetch one page of courses. See `fetch_students_page` for how to walk through pages.
+
+    Parameters:
+        after (tuple): The last course of the previous page, or None for the first page.
+        limit (int): The maximum number of courses to return.
+        order_by (str): One of 'course_id', 'course_name' or 'instructor_id'.
+
+    Returns:
+        list of tuple: Up to `limit` courses, each as a tuple (course_id, course_name, instructor_id).
+    """
+    return _fetch_page('courses', ('course_id', 'course_name', 'instructor_id'), after, limit, order_by)
+
+def count_students():
+    """
+    Count the students in the Students table.
+
+    Returns:
+        int: The total number of students.
+    """
+    return _count('students')
+
+def count_instructors():
+    """
+    Count the instructors in the Instructors table.
+
+    Returns:
+        int: The total number of instructors.
+    """
+    return _count('instructors')
+
+def count_courses():
+    """
+    Count the courses in the Courses table.
+
+    Returns:
+        int: The total number of courses.
+    """
+    return _count('courses')
+
+ITER_BATCH_SIZE = 1000
+EXPORT_BUFFER_SIZE = 1 << 20
+
+
+def _iter_rows(query, params=(), batch_size=ITER_BATCH_SIZE):
+    """
+    Stream the rows of a query, fetching `batch_size` rows from SQLite at a time.
+
+    The pooled connection is held while the generator is alive and is released when it is
+    exhausted, closed, or garbage collected after being abandoned early. The generator must be
+    consumed in the thread that created it.
+
+    Parameters:
+        query (str): The SELECT statement to run.
+        params (tuple): The parameters of the query.
+        batch_size (int): The number of rows fetched with each `fetchmany` call.
+
+    Yields:
+        tuple: One row of the result at a time.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+def iter_students(batch_size=ITER_BATCH_SIZE):
+    """
+    Iterate over all students without loading the whole table into memory.
+
+    Parameters:
+        batch_size (int): The number of rows fetched from the database at a time.
+
+    Yields:
+        tuple: Each student as a tuple (student_id, name, age, email).
+    """
+    return _iter_rows('SELECT student_id, name, age, email FROM students', batch_size=batch_size)
+
+def iter_instructors(batch_size=ITER_BATCH_SIZE):
+    """
+    Iterate over all instructors without loading the whole table into memory.
+
+    Parameters:
+        batch_size (int): The number of rows fetched from the database at a time.
+
+    Yields:
+        tuple: Each instructor as a tuple (instructor_id, name, age, email).
+    """
+    return _iter_rows('SELECT instructor_id, name, age, email FROM instructors', batch_size=batch_size)
+
+def iter_courses(batch_size=ITER_BATCH_SIZE):
+    """
+    Iterate over all courses without loading the whole table into memory.
+
+    Parameters:
+        batch_size (int): The number of rows fetched from the database at a time.
+
+    Yields:
+        tuple: Each course as a tuple (course_id, course_name, instructor_id).
+    """
+    return _iter_rows('SELECT course_id, course_name, instructor_id FROM courses', batch_size=batch_size)
+
+def iter_registered_students(course_id, batch_size=ITER_BATCH_SIZE):
+    """
+    Iterate over the students registered for a course without loading them all into memory.
+
+    Parameters:
+        course_id (str): The unique identifier of the course.
+        batch_size (int): The number of rows fetched from the database at a time.
+
+    Yields:
+        tuple: Each registered student as a tuple (student_id, name, email, age), like
+        `fetch_registered_students`.
+    """
+    query = '''
+    SELECT students.student_id, students.name, students.email, students.age
+    FROM students
+    JOIN registrations ON students.student_id = registrations.student_id
+    WHERE registrations.course_id = ?
+    '''
+    return _iter_rows(query, (course_id,), batch_size)
+
+def iter_registrations(batch_size=ITER_BATCH_SIZE):
+    """
+    Iterate over all registrations without loading them all into memory.
+
+    Parameters:
+        batch_size (int): The number of rows fetched from the database at a time.
+
+    Yields:
+        tuple: Each registration as a tuple (student_id, course_id).
+    """
+    return _iter_rows('SELECT student_id, course_id FROM registrations', batch_size=batch_size)
+
+def _run_in_background(name, on_done, function, *args):
+    """
+    Run a function on a daemon thread of its own and report when it has finished.
+
+    Parameters:
+        name (str): The name of the thread.
+        on_done (callable): Called on the thread once the function has finished as `on_done(error)`,
+            where `error` is None on success or the exception the function raised. May be None.
+        function (callable): The function to run.
+        *args: Positional arguments for the function.
+
+    Returns:
+        threading.Thread: The started thread.
+    """
+    def run():
+        try:
+            function(*args)
+        except Exception as e:
+            error = e
+        else:
+            error = None
+        if on_done:
+            on_done(error)
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    return thread
+
+BACKUP_PAGES = 256
+
+
+def db_backup(target_path, pages=BACKUP_PAGES, progress=None):
+    """
+    Copy the database to another file with the SQLite online backup API.
+
+    The copy is taken inside a read transaction, so it is a consistent snapshot that includes
+    everything committed to the write-ahead log. Pages are copied `pages` at a time, and because
+    the database runs in WAL mode, writers can keep committing while the backup is in progress.
+    The copy is given a new `database_id`.
+
+    Parameters:
+        target_path (str): The path of the backup file to create or overwrite.
+        pages (int): The number of pages copied per step.
+        progress (callable): Called after every step as `progress(status, remaining, total)`,
+            where `remaining` and `total` are page counts.
+    """
+    # A connection of its own, so the snapshot never includes the caller's uncommitted work
+    conn = _pool._connect()
+    target = sqlite3.connect(target_path)
+    try:
+        # Pin a read snapshot for the whole copy
+        conn.execute('BEGIN')
+        conn.execute('SELECT COUNT(*) FROM sqlite_master').fetchone()
+        conn.backup(target, pages=pages, progress=progress)
+        # The copy's change log goes its own way from here, so it gets an ID of its own
+        target.execute("UPDATE database_info SET value = lower(hex(randomblob(16))) WHERE name = 'id'")
+        target.commit()
+    finally:
+        conn.rollback()
+        conn.close()
+        target.close()
+
+
+def db_backup_in_background(target_path, pages=BACKUP_PAGES, progress=None, on_done=None):
+    """
+    Run `db_backup` on a background thread so the caller (for example a GUI event loop) is not blocked.
+
+    The callbacks are called from the background thread; GUI code should hand their values over
+    to its own thread before touching any widgets.
+
+    Parameters:
+        target_path (str): The path of the backup file to create or overwrite.
+        pages (int): The number of pages copied per step.
+        progress (callable): Called after every step as `progress(status, remaining, total)`.
+        on_done (callable): Called once the backup has finished as `on_done(error)`, where `error`
+            is None on success or the exception that stopped the backup.
+
+    Returns:
+        threading.Thread: The started background thread.
+    """
+    return _run_in_background('database-backup', on_done, db_backup, target_path, pages, progress)
+
+
+# CSV export sections: (title, column headers, query counting the rows, query selecting them)
+EXPORT_SECTIONS = [
+    ('Students', ['Student ID', 'Name', 'Email', 'Age'],
+     'SELECT COUNT(*) FROM students',
+     'SELECT student_id, name, email, age FROM students ORDER BY student_id'),
+    ('Instructors', ['Instructor ID', 'Name', 'Email', 'Age'],
+     'SELECT COUNT(*) FROM instructors',
+     'SELECT instructor_id, name, email, age FROM instructors ORDER BY instructor_id'),
+    ('Courses', ['Course ID', 'Course Name', 'Instructor ID', 'Instructor Name', 'Registered Students'],
+     'SELECT COUNT(*) FROM courses',
+     '''SELECT c.course_id, c.course_name, c.instructor_id, i.name,
+               (SELECT COUNT(*) FROM registrations r WHERE r.course_id = c.course_id)
+        FROM courses c LEFT JOIN instructors i ON i.instructor_id = c.instructor_id
+        ORDER BY c.course_id'''),
+    ('Course Rosters', ['Course ID', 'Student ID', 'Student Name', 'Email'],
+     'SELECT COUNT(*) FROM registrations',
+     '''SELECT r.course_id, s.student_id, s.name, s.email
+        FROM registrations r JOIN students s ON s.student_id = r.student_id
+        ORDER BY r.course_id, r.student_id'''),
+]
+
+
+class _ExportCancelled(Exception):
+    """
+    Raised inside `db_export_csv` to abandon the file being written.
+    """
+
+
+def db_export_csv(target_path, progress=None, cancelled=None, batch_size=ITER_BATCH_SIZE):
+    """
+    Export students, instructors, courses and course rosters to a CSV file, streamed from the database.
+
+    Each section is a title row, a header row, the data rows and an empty row. Rows go straight
+    from the cursor to a buffered `csv.writer` `batch_size` at a time, so memory use does not grow
+    with the size of the database. Everything is read inside one transaction, so the export is
+    consistent even while other connections write. The file is replaced only once the export
+    has finished (see `fileutil.atomic_open`); a cancelled or failed export leaves any previous
+    file untouched.
+
+    Parameters:
+        target_path (str): The CSV file to create or overwrite.
+        progress (callable): Called after every batch as `progress(done, total)`, counted in data rows.
+        cancelled (callable): Called before every batch; the export stops when it returns True.
+        batch_size (int): The number of rows fetched from the database at a time.
+
+    Returns:
+        bool: True if the export finished, False if it was cancelled.
+    """
+    try:
+        with transaction() as conn, atomic_open(target_path, 'w', newline='', buffering=EXPORT_BUFFER_SIZE) as file:
+            cursor = conn.cursor()
+            total = 0
+            for _, _, count_query, _ in EXPORT_SECTIONS:
+                cursor.execute(count_query)
+                total += cursor.fetchone()[0]
+
+            writer = csv.writer(file)
+            done = 0
+            for title, headers, _, query in EXPORT_SECTIONS:
+                writer.writerow([title])
+                writer.writerow(headers)
+                cursor.execute(query)
+                while True:
+                    if cancelled and cancelled():
+                        raise _ExportCancelled()
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    writer.writerows(rows)
+                    done += len(rows)
+                    if progress:
+                        progress(done, total)
+                writer.writerow([])
+    except _ExportCancelled:
+        return False
+    return True
+
+def db_export_csv_in_background(target_path, progress=None, cancelled=None, on_done=None, batch_size=ITER_BATCH_SIZE):
+    """
+    Run `db_export_csv` on a background thread so the caller (for example a GUI event loop) is not blocked.
+
+    The callbacks are called from the background thread; GUI code should hand their values over
+    to its own thread before touching any widgets.
+
+    Parameters:
+        target_path (str): The CSV file to create or overwrite.
+        progress (callable): Called after every batch as `progress(done, total)`.
+        cancelled (callable): Called before every batch; the export stops when it returns True.
+        on_done (callable): Called once the export has stopped as `on_done(error)`, where `error`
+            is None if it finished or was cancelled, or the exception that stopped it.
+        batch_size (int): The number of rows fetched from the database at a time.
+
+    Returns:
+        threading.Thread: The started background thread.
+    """
+    return _run_in_background('database-export', on_done, db_export_csv, target_path, progress, cancelled, batch_size)
+
+
+SEARCH_KINDS = ('student', 'instructor', 'course')
+
+
+def rebuild_search_index():
+    """
+    Rebuild the full-text search index from scratch.
+
+    The triggers keep the index up to date on their own; this is only needed after an operation
+    that renumbers table rows, such as VACUUM. `create_database` does it on its own when it finds
+    the index out of step, so reopening the database after such an operation is enough too.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM search_index')
+        for statement in _search_index_fill_statements():
+            cursor.execute(statement)
+        _commit(conn)
+
+def search(query, kinds=SEARCH_KINDS, limit=20):
+    """
+    Search students and instructors by ID, name and email, and courses by ID and name.
+
+    Every word of the query must match the start of a word in the record, so "ali gm" finds
+    "Prof. Ali <ali@gmail.com>". Results come from the full-text index and are ranked by
+    relevance, best match first.
+
+    Parameters:
+        query (str): The words to search for.
+        kinds (tuple of str): Which of 'student', 'instructor' and 'course' to search.
+        limit (int): The maximum number of results.
+
+    Returns:
+        list of tuple: Up to `limit` matches, each as a tuple (kind, key, name, email), where
+        `key` is the record's ID and `email` is None for courses.
+    """
+    words = query.split()
+    if not words or not kinds:
+        return []
+    match = ' '.join('"' + word.replace('"', '""') + '"*' for word in words)
+    kind_placeholders = ', '.join('?' * len(kinds))
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT kind, key, name, email FROM search_index
+            WHERE search_index MATCH ? AND kind IN ({kind_placeholders})
+            ORDER BY rank LIMIT ?
+        ''', [match, *kinds, limit])
+        results = cursor.fetchall()
+    return results
+
+
+def changes_since(seq=0, limit=None):
+    """
+    Read the changes made to students, instructors, courses and registrations after a point
+    in the change log.
+
+    A client remembers the sequence number of the last change it has seen and asks only for
+    what happened since, instead of re-reading whole tables.
+
+    Parameters:
+        seq (int): The sequence number of the last change already seen; 0 for everything.
+        limit (int): The maximum number of changes to return, or None for all of them.
+
+    Returns:
+        list of tuple: The changes in order, each as a tuple (seq, table_name, operation, key), where
+        `operation` is 'insert', 'update' or 'delete' and `key` is the row's ID, or a tuple
+        (student_id, course_id) for registrations.
+    """
+    query = 'SELECT seq, table_name, operation, row_key, row_key2 FROM changes WHERE seq > ? ORDER BY seq'
+    params = [seq]
+    if limit is not None:
+        query += ' LIMIT ?'
+        params.append(limit)
+
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+    return [(seq, table, operation, key if key2 is None else (key, key2))
+            for seq, table, operation, key, key2 in rows]
+
+def latest_change_seq():
+    """
+    Get the sequence number of the most recent change.
+
+    The number comes from SQLite's AUTOINCREMENT counter, so it stays correct after old
+    entries have been removed with `prune_changes`.
+
+    Returns:
+        int: The latest sequence number, or 0 if nothing has changed yet.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM sqlite_sequence WHERE name = 'changes'")
+        seq = cursor.fetchone()[0]
+    return seq
+
+def database_id():
+    """
+    Get the random ID the database was given when it was created.
+
+    Files saved from the database record it, so that they are not mistaken for saves of another
+    database file, such as a backup copy, which has an ID of its own.
+
+    Returns:
+        str: The ID, 32 hexadecimal digits.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT value FROM database_info WHERE name = 'id'")
+        value = cursor.fetchone()[0]
+    return value
+
+def fetch_table_versions():
+    """
+    Get the version counter of every logged table.
+
+    Each counter goes up with every row inserted, updated or deleted in its table, so a cache
+    built from a table stays valid for as long as the table's version is unchanged.
+
+    Returns:
+        dict: Maps 'students', 'instructors', 'courses' and 'registrations' to their version.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('SELECT table_name, version FROM table_versions')
+        versions = dict(cursor.fetchall())
+    return versions
+
+@_write
+def prune_changes(before_seq):
+    """
+    Delete old entries from the change log to keep it compact. Table version counters are not affected.
+
+    Entries may be pruned once every client that reads the log has saved or seen everything up to
+    them. `snapshot.compact_snapshot(path, prune=True)` does this for the snapshot it folds, once
+    the new snapshot is safely on disk. A client that finds its position pruned has to start over from a full
+    copy, as `snapshot.save_snapshot` does.
+
+    Parameters:
+        before_seq (int): Entries with a sequence number up to and including this one are deleted.
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM changes WHERE seq <= ?', (before_seq,))
+        _commit(conn)
+
+# The columns of each logged table, in the order used by the iter_* functions
+_TABLE_COLUMNS = {
+    'students': ('student_id', 'name', 'age', 'email'),
+    'instructors': ('instructor_id', 'name', 'age', 'email'),
+    'courses': ('course_id', 'course_name', 'instructor_id'),
+    'registrations': ('student_id', 'course_id'),
+}
+
+
+def fetch_changed_rows(since_seq):
+    """
+    Get the current state of every row changed after a point in the change log.
+
+    This is what an incremental save needs: the work is proportional to the number of changes,
+    not to the size of the tables. All tables are read in one transaction, so the result is
+    consistent.
+
+    Parameters:
+        since_seq (int): The sequence number of the last change already saved.
+
+    Raises:
+        ValueError: If changes after `since_seq` have been removed by `prune_changes`, so a
+        complete list can no longer be given.
+
+    Returns:
+        tuple: `(seq, rows, deleted)`, where `seq` is the sequence number of the latest change
+        included, `rows` maps each table to its changed rows that still exist (with the columns of
+        the matching iter_* function), and `deleted` maps each table to the keys of changed rows
+        that no longer exist; registration keys are (student_id, course_id) tuples.
+    """
+    rows, deleted = {}, {}
+    with transaction(), get_connection() as conn:
+        cursor = conn.cursor()
+        latest = latest_change_seq()
+        cursor.execute('SELECT MIN(seq) FROM changes WHERE seq > ?', (since_seq,))
+        oldest = cursor.fetchone()[0]
+        if latest > since_seq and oldest != since_seq + 1:
+            raise ValueError(f"The change log no longer holds every change after {since_seq}.")
+
+        for table, key_columns in _LOGGED_TABLES:
+            columns = _TABLE_COLUMNS[table]
+            keys = ['row_key', 'row_key2'][:len(key_columns)]
+            join = ' AND '.join(f't.{column} = c.{key}' for column, key in zip(key_columns, keys))
+            cursor.execute(f'''
+                SELECT {', '.join(f'c.{key}' for key in keys)}, {', '.join(f't.{column}' for column in columns)}
+                FROM (SELECT DISTINCT {', '.join(keys)} FROM changes WHERE seq > ? AND seq <= ? AND table_name = ?) c
+                LEFT JOIN {table} t ON {join}
+            ''', (since_seq, latest, table))
+            rows[table], deleted[table] = [], []
+            for row in cursor.fetchall():
+                key, current = row[:len(keys)], row[len(keys):]
+                if current[0] is None:
+                    deleted[table].append(key[0] if len(keys) == 1 else key)
+                else:
+                    rows[table].append(current)
+    return latest, rows, deleted
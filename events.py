@@ -0,0 +1,153 @@
+"""
+In-process publish/subscribe event bus for changes made through the data layer.
+
+Every mutating function in `database.py` publishes a `DataEvent` naming the table, the kind of
+change and the keys of the affected rows. Events are held back until the change is committed
+(and dropped if it is rolled back), merged, and then handed to subscribers in one batch, so a
+view can update just the rows that changed instead of re-reading whole tables.
+
+Example:
+    from events import event_bus
+
+    def on_students_changed(events):
+        for event in events:
+            print(event.action, event.keys)
+
+    event_bus.subscribe(on_students_changed, tables=('students',))
+"""
+
+import threading
+from collections import namedtuple
+
+DataEvent = namedtuple('DataEvent', ['table', 'action', 'keys'])
+DataEvent.__doc__ = """
+A committed change to one of the data tables.
+
+Attributes:
+    table (str): 'students', 'instructors', 'courses' or 'registrations'.
+    action (str): 'added', 'updated' or 'deleted'.
+    keys (tuple): The IDs of the affected rows; (student_id, course_id) pairs for registrations.
+
+Rows changed by the database's own foreign key actions are not published separately: deleting a
+student or course also deletes its registrations, and deleting an instructor leaves their courses
+without an instructor.
+"""
+
+
+class EventBus:
+    """
+    Collects data events per thread until their transaction commits, then delivers them to subscribers.
+
+    Subscribers are called on the thread that committed the change. GUI code should hand the
+    events over to its own thread if writes can come from other threads.
+    """
+    def __init__(self):
+        """
+        Initialize the bus with no subscribers.
+        """
+        self._subscribers = {}
+        self._next_token = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def subscribe(self, callback, tables=None, actions=None):
+        """
+        Register a callback for committed events.
+
+        Parameters:
+            callback (callable): Called as `callback(events)` with a list of `DataEvent`s after each commit.
+            tables (tuple of str): Only deliver events for these tables; None for all tables.
+            actions (tuple of str): Only deliver these actions; None for all actions.
+
+        Returns:
+            int: A token that can be passed to `unsubscribe()`.
+        """
+        with self._lock:
+            token = self._next_token
+            self._next_token += 1
+            self._subscribers[token] = (callback, tables, actions)
+        return token
+
+    def unsubscribe(self, token):
+        """
+        Remove a subscription.
+
+        Parameters:
+            token (int): The token returned by `subscribe()`.
+        """
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def _pending(self):
+        """
+        Get the calling thread's list of events waiting for a commit.
+
+        Returns:
+            list of DataEvent: The uncommitted events.
+        """
+        if not hasattr(self._local, 'pending'):
+            self._local.pending = []
+        return self._local.pending
+
+    def publish(self, table, action, keys):
+        """
+        Record a change made by the calling thread. It is delivered when the thread next calls `flush()`.
+
+        Parameters:
+            table (str): The table that changed.
+            action (str): 'added', 'updated' or 'deleted'.
+            keys (iterable): The keys of the affected rows.
+        """
+        keys = tuple(keys)
+        if keys:
+            self._pending().append(DataEvent(table, action, keys))
+
+    def mark(self):
+        """
+        Get a position in the calling thread's pending events, for a later partial `discard()`.
+
+        Returns:
+            int: The number of events currently pending.
+        """
+        return len(self._pending())
+
+    def discard(self, mark=0):
+        """
+        Drop pending events after a rollback.
+
+        Parameters:
+            mark (int): Keep the events published before this `mark()`; 0 drops them all.
+        """
+        del self._pending()[mark:]
+
+    def flush(self):
+        """
+        Deliver the calling thread's pending events after a commit.
+
+        Events for the same table and action are merged into one event whose keys are listed
+        once each, in the order they were first published.
+        """
+        pending = self._pending()
+        if not pending:
+            return
+        merged = {}
+        for event in pending:
+            keys = merged.setdefault((event.table, event.action), {})
+            keys.update(dict.fromkeys(event.keys))
+        pending.clear()
+        events = [DataEvent(table, action, tuple(keys)) for (table, action), keys in merged.items()]
+
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+        for callback, tables, actions in subscribers:
+            selected = [event for event in events
+                        if (tables is None or event.table in tables) and (actions is None or event.action in actions)]
+            if selected:
+                try:
+                    callback(selected)
+                except Exception as e:
+                    # The change is already committed; one failing subscriber must not hide it from the others
+                    print(f"An error occurred in an event subscriber: {e}")
+
+
+event_bus = EventBus()
@@ -0,0 +1,143 @@
+"""
+Crash-safe file writes and advisory file locks, shared by the modules that save files.
+
+`atomic_open` writes a file under a temporary name, flushes it to disk and only then moves it
+into place, so a crash during a save leaves the previous file intact. Every write gets a
+temporary file of its own, so two programs saving the same file cannot clobber each other's.
+`file_lock` takes an advisory lock that such programs can hold while they read and write a group
+of files together, as the snapshot and its delta file are.
+
+Example:
+    from fileutil import atomic_open, file_lock
+
+    with file_lock('school_data.jsonl'), atomic_open('school_data.jsonl', 'w', encoding='utf-8') as f:
+        f.write(...)
+"""
+
+import contextlib
+import os
+import tempfile
+import threading
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+LOCK_SUFFIX = '.lock'
+
+# Files are created with the permissions open() would give them; mkstemp() makes them private
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+# The paths locked by `file_lock` in each thread, so that a thread can take a lock it already holds
+_held_locks = threading.local()
+
+
+def _fsync_directory(path):
+    """
+    Flush the directory entry of a file to disk, so that a rename into it survives a crash.
+
+    Directories cannot be opened for syncing on Windows, where this does nothing.
+    """
+    if os.name == 'nt':
+        return
+    fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+@contextlib.contextmanager
+def atomic_open(path, mode='w', encoding=None, newline=None, buffering=-1):
+    """
+    Open a file for writing so that it is replaced all at once, or not at all.
+
+    The data goes to a new temporary file next to `path`, named after it. When the block
+    finishes, the temporary file is synced to disk and renamed over `path`; if the block raises,
+    the temporary file is removed and `path` is left untouched. The file keeps the permissions
+    of the file it replaces.
+
+    Parameters:
+        path (str): The file to replace.
+        mode (str): 'w' for text or 'wb' for bytes.
+        encoding (str): The text encoding, for text mode.
+        newline (str): How line endings are translated, for text mode; '' for CSV files.
+        buffering (int): The buffer size in bytes, as for `open()`.
+
+    Yields:
+        file: The temporary file to write to.
+    """
+    fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix=os.path.basename(path) + '.',
+                                     suffix='.tmp')
+    try:
+        os.chmod(temporary, os.stat(path).st_mode if os.path.exists(path) else 0o666 & ~_UMASK)
+        f = os.fdopen(fd, mode, buffering=buffering, encoding=encoding, newline=newline)
+    except BaseException:
+        os.close(fd)
+        os.remove(temporary)
+        raise
+    try:
+        yield f
+        f.flush()
+        os.fsync(f.fileno())
+    except BaseException:
+        f.close()
+        os.remove(temporary)
+        raise
+    f.close()
+    os.replace(temporary, path)
+    _fsync_directory(path)
+
+def _lock(f):
+    """
+    Wait for an exclusive lock on an open file.
+    """
+    if os.name != 'nt':
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            # Gives up with an OSError after trying for about ten seconds
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:
+            continue
+
+def _unlock(f):
+    """
+    Release the lock taken by `_lock`.
+    """
+    if os.name == 'nt':
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+@contextlib.contextmanager
+def file_lock(path):
+    """
+    Hold an advisory lock on a file for the duration of a `with` block.
+
+    The lock is taken on `path + LOCK_SUFFIX`, so `path` itself may be replaced while it is held.
+    Other processes and threads that ask for the same lock wait until it is released. A thread
+    that already holds the lock gets it again at once, so functions that lock a file may call each
+    other. The lock is advisory: it only keeps out code that takes it too.
+
+    Parameters:
+        path (str): The file to lock.
+    """
+    held = _held_locks.__dict__.setdefault('paths', set())
+    key = os.path.abspath(path)
+    if key in held:
+        yield
+        return
+    with open(path + LOCK_SUFFIX, 'a+b') as f:
+        _lock(f)
+        held.add(key)
+        try:
+            yield
+        finally:
+            held.discard(key)
+            _unlock(f)
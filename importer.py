@@ -0,0 +1,251 @@
+"""
+Bulk import of students, instructors, courses and registrations from CSV files.
+
+The file is read in chunks of `IMPORT_CHUNK_SIZE` rows. Each chunk is validated with the
+`data_validation` rules in a pool of worker processes while the main process writes the chunks
+validated before it, so checking and writing overlap. Valid rows are merged with the `upsert_*`
+functions, one transaction per chunk, so memory use stays flat and an interrupted import keeps
+every chunk written so far. Rows that fail validation, or refer to a student, instructor or
+course that does not exist, are written to a rejected-rows file together with the reason.
+
+The first row of the file names the columns. Names are matched without regard to case, spaces
+or underscores, and extra columns are ignored:
+
+    student_id,name,age,email
+    S1,Alice,20,alice@mail.com
+
+Example:
+    from importer import import_csv
+
+    counts = import_csv('students.csv', 'students')
+    print(counts['inserted'], counts['rejected'])
+"""
+
+import csv
+import itertools
+import os
+import sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+
+from data_validation import validate_courses, validate_instructors, validate_registrations, validate_students
+from database import fetch_existing_ids, upsert_courses, upsert_instructors, upsert_registrations, upsert_students
+
+IMPORT_CHUNK_SIZE = 10000
+
+# Columns of each kind of record, in the order the upsert function takes them
+IMPORT_COLUMNS = {
+    'students': ('student_id', 'name', 'age', 'email'),
+    'instructors': ('instructor_id', 'name', 'age', 'email'),
+    'courses': ('course_id', 'course_name', 'instructor_id'),
+    'registrations': ('student_id', 'course_id'),
+}
+
+_UPSERTS = {'students': upsert_students, 'instructors': upsert_instructors, 'courses': upsert_courses,
+            'registrations': upsert_registrations}
+_VALIDATORS = {'students': validate_students, 'instructors': validate_instructors, 'courses': validate_courses,
+               'registrations': validate_registrations}
+
+# The references each kind of record makes: (position in the record, table referred to, what it is)
+_REFERENCES = {
+    'courses': [(2, 'instructors', 'instructor')],
+    'registrations': [(0, 'students', 'student'), (1, 'courses', 'course')],
+}
+
+
+def _column_name(name):
+    """
+    Normalize a column name from a header row, so that "Student ID" matches "student_id".
+    """
+    return name.strip().lower().replace(' ', '').replace('_', '')
+
+def _validate_chunk(kind, indices, width, first_row, rows):
+    """
+    Validate one chunk of CSV rows; runs in a worker process.
+
+    Parameters:
+        kind (str): The kind of record, a key of `IMPORT_COLUMNS`.
+        indices (tuple of int): The position in each row of every column in `IMPORT_COLUMNS[kind]`.
+        width (int): The number of fields in the header row.
+        first_row (int): The row number of the first row in the chunk, counting the header as row 1.
+        rows (list of list): The rows as read by `csv.reader`.
+
+    Returns:
+        tuple: `(valid, sources, rejected)`, where `valid` is a list of record tuples ready for
+        the upsert function, `sources` holds the row number of each of them, and `rejected` is a
+        list of `(row_number, reason)` tuples, the reason naming every invalid field.
+    """
+    rejected = []
+    pick = itemgetter(*indices)
+    if set(map(len, rows)) == {width}:
+        records = list(map(pick, rows))
+        numbers = range(first_row, first_row + len(rows))
+    else:
+        records, numbers = [], []
+        for row_number, row in enumerate(rows, first_row):
+            if len(row) != width:
+                rejected.append((row_number, f"Expected {width} fields, found {len(row)}."))
+            else:
+                records.append(pick(row))
+                numbers.append(row_number)
+    valid, errors = _VALIDATORS[kind](records)
+    for position, problems in errors.items():
+        rejected.append((numbers[position], ' '.join(f"{field}: {message}" for field, message in problems)))
+    sources = [number for position, number in enumerate(numbers) if position not in errors] if errors else list(numbers)
+    return valid, sources, rejected
+
+def _missing_references(kind, records):
+    """
+    Find the records that refer to a student, instructor or course that does not exist, with one
+    lookup per referenced table rather than one per record.
+
+    Returns:
+        dict: Maps the position in `records` of each such record to the reason it is refused.
+    """
+    missing = {}
+    for position, table, name in _REFERENCES.get(kind, ()):
+        ids = {record[position] for record in records if record[position] is not None}
+        absent = ids - fetch_existing_ids(table, ids)
+        if not absent:
+            continue
+        for index, record in enumerate(records):
+            if record[position] in absent:
+                reason = f"There is no {name} with ID {record[position]}."
+                missing[index] = f"{missing[index]} {reason}" if index in missing else reason
+    return missing
+
+def _upsert_halves(upsert, records, first_index, policy, written, refused):
+    """
+    Merge records in one transaction, or if the database refuses them, split them in half and
+    merge each half the same way, so only the offending records are lost.
+    """
+    try:
+        written.append(upsert(records, policy))
+    except sqlite3.IntegrityError as e:
+        if len(records) == 1:
+            refused.append((first_index, f"Rejected by the database: {e}."))
+            return
+        middle = len(records) // 2
+        _upsert_halves(upsert, records[:middle], first_index, policy, written, refused)
+        _upsert_halves(upsert, records[middle:], first_index + middle, policy, written, refused)
+
+def _write_chunk(kind, records, policy, counts):
+    """
+    Merge validated records into the database in one transaction.
+
+    Records that refer to a student, instructor or course that does not exist are picked out
+    beforehand with one lookup per referenced table. Should the database still refuse the chunk
+    (say a referenced record was deleted in the meantime), it is split in half until the offending
+    records are found, so the rest of the chunk is still written a few transactions at a time.
+
+    Returns:
+        list of tuple: `(index, reason)` for every record refused, where `index` is its position
+        in `records`.
+    """
+    missing = _missing_references(kind, records)
+    kept = [index for index in range(len(records)) if index not in missing]
+    written, failed = [], []
+    if kept:
+        _upsert_halves(_UPSERTS[kind], [records[index] for index in kept], 0, policy, written, failed)
+    refused = sorted(missing.items()) + [(kept[index], reason) for index, reason in failed]
+    for result in written:
+        for key, count in result.items():
+            counts[key] += count
+    return refused
+
+def import_csv(path, kind, rejected_path=None, policy='update', chunk_size=IMPORT_CHUNK_SIZE, workers=None,
+               progress=None):
+    """
+    Import records of one kind from a CSV file into the database.
+
+    Parameters:
+        path (str): The CSV file to read. Its first row names the columns.
+        kind (str): 'students', 'instructors', 'courses' or 'registrations'.
+        rejected_path (str): Where to write the rejected rows, as CSV with the original fields
+            followed by the row number and the reason. Defaults to the input file name with
+            '_rejected' added. The file is only created if a row is rejected.
+        policy (str): What to do with records that already exist; see `database.upsert_students`.
+        chunk_size (int): The number of rows validated and written at a time.
+        workers (int): The number of validation processes; None for one per CPU, or 0 to
+            validate in the calling process.
+        progress (callable): Called after every chunk as `progress(rows)`, the number of rows
+            read so far.
+
+    Raises:
+        ValueError: If `kind` is unknown or the header row lacks one of the required columns.
+
+    Returns:
+        dict: The number of records 'inserted', 'updated', 'unchanged' and 'rejected'.
+    """
+    if kind not in IMPORT_COLUMNS:
+        raise ValueError(f"Unknown record kind: {kind}")
+    if rejected_path is None:
+        base, extension = os.path.splitext(path)
+        rejected_path = f"{base}_rejected{extension or '.csv'}"
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'rejected': 0}
+    rows_read = 0
+    rejected_file = rejected_writer = None
+
+    def reject(row_number, row, reason):
+        nonlocal rejected_file, rejected_writer
+        if rejected_writer is None:
+            rejected_file = open(rejected_path, 'w', newline='', encoding='utf-8')
+            rejected_writer = csv.writer(rejected_file)
+            rejected_writer.writerow(header + ['row', 'reason'])
+        rejected_writer.writerow(list(row) + [row_number, reason])
+        counts['rejected'] += 1
+
+    with open(path, newline='', encoding='utf-8-sig') as file:
+        reader = csv.reader(file)
+        header = next(reader, [])
+        positions = {_column_name(name): index for index, name in enumerate(header)}
+        missing = [column for column in IMPORT_COLUMNS[kind] if _column_name(column) not in positions]
+        if missing:
+            raise ValueError(f"{path} has no column for: {', '.join(missing)}")
+        indices = tuple(positions[_column_name(column)] for column in IMPORT_COLUMNS[kind])
+
+        def chunks():
+            row_number = 2
+            while True:
+                rows = list(itertools.islice(reader, chunk_size))
+                if not rows:
+                    return
+                yield row_number, rows
+                row_number += len(rows)
+
+        def write(first_row, rows, result):
+            nonlocal rows_read
+            valid, sources, rejected = result
+            if valid:
+                rejected += [(sources[index], reason) for index, reason in _write_chunk(kind, valid, policy, counts)]
+            for row_number, reason in sorted(rejected):
+                reject(row_number, rows[row_number - first_row], reason)
+            rows_read += len(rows)
+            if progress:
+                progress(rows_read)
+
+        try:
+            if workers == 0:
+                for first_row, rows in chunks():
+                    write(first_row, rows, _validate_chunk(kind, indices, len(header), first_row, rows))
+            else:
+                workers = workers or os.cpu_count() or 1
+                with ProcessPoolExecutor(workers) as executor:
+                    # Keep a few chunks in flight, so validation runs ahead of the writes without
+                    # reading the whole file into memory
+                    pending = deque()
+                    limit = 2 * workers
+                    for first_row, rows in chunks():
+                        pending.append((first_row, rows, executor.submit(
+                            _validate_chunk, kind, indices, len(header), first_row, rows)))
+                        if len(pending) >= limit:
+                            first, chunk, future = pending.popleft()
+                            write(first, chunk, future.result())
+                    while pending:
+                        first, chunk, future = pending.popleft()
+                        write(first, chunk, future.result())
+        finally:
+            if rejected_file is not None:
+                rejected_file.close()
+    return counts
@@ -0,0 +1,399 @@
+"""
+Opt-in statement instrumentation for the database layer.
+
+Every connection handed out by `database.py` uses `InstrumentedConnection`, whose cursors
+report each statement to the module-level `profiler`. While the profiler is disabled (the
+default) the cursors pass straight through to SQLite. Once enabled, it records for every
+statement its wall time (including fetching the rows), the number of rows returned or changed
+and the function that ran it. Statements slower than a threshold are logged together with
+their `EXPLAIN QUERY PLAN` output, and full table scans in the plan are flagged. Latencies are
+kept per query shape (the SQL with literals and placeholder lists normalized), so that p50, p95
+and p99 can be reported for each kind of query.
+
+Instrumentation can also be switched on from the environment, before the application starts:
+
+    SCHOOL_DB_SLOW_MS=50 python main.py
+
+Example:
+    from instrumentation import profiler
+
+    profiler.enable(slow_ms=50)
+    ...
+    for shape, stats in profiler.stats().items():
+        print(stats['p95_ms'], shape)
+    profiler.dump('query_stats.json')
+"""
+
+import itertools
+import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from collections import Counter, deque
+
+SLOW_MS = 100.0
+LATENCY_WINDOW = 1000
+SLOW_LOG_SIZE = 100
+
+# Frames in these files are passed over when naming the caller of a statement: this module,
+# contextlib, and the data layer modules, whose functions run statements on behalf of their callers
+_SKIPPED_FILES = tuple(os.path.normcase(path) for path in [__file__, sys.modules['contextlib'].__file__] + [
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), name) for name in ('database.py', 'snapshot.py', 'reporting.py')])
+
+
+def query_shape(sql):
+    """
+    Reduce a statement to its shape, so that statements differing only in their values are grouped together.
+
+    Whitespace is collapsed, string and number literals become `?`, and lists of placeholders of
+    any length (such as `IN (?, ?, ?)` or `VALUES (?, ?), (?, ?)`) become a single `?+` or `(?+)+`.
+
+    Parameters:
+        sql (str): The statement.
+
+    Returns:
+        str: The normalized statement.
+    """
+    shape = ' '.join(sql.split())
+    shape = re.sub(r"'(?:[^']|'')*'", '?', shape)
+    shape = re.sub(r'\b\d+(?:\.\d+)?\b', '?', shape)
+    shape = re.sub(r'\?(?:\s*,\s*\?)+', '?+', shape)
+    shape = re.sub(r'\((\?\+?)\)(?:\s*,\s*\(\1\))+', r'(\1)+', shape)
+    return shape
+
+def _caller():
+    """
+    Name the function that issued the current statement.
+
+    Returns:
+        str: The first function on the stack outside this module, `contextlib` and the data layer
+        modules (`database`, `snapshot` and `reporting`), as `file:function:line`.
+    """
+    frame = sys._getframe(2)
+    while frame is not None and os.path.normcase(frame.f_code.co_filename) in _SKIPPED_FILES:
+        frame = frame.f_back
+    if frame is None:
+        return '?'
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}:{frame.f_lineno}"
+
+def _percentile(ordered, fraction):
+    """
+    Pick a percentile from sorted samples using the nearest-rank method.
+
+    Parameters:
+        ordered (list of float): The samples, sorted in ascending order.
+        fraction (float): The percentile as a fraction, e.g. 0.95.
+
+    Returns:
+        float: The sample at that rank.
+    """
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class _Statement:
+    """
+    The measurements of one statement, collected while its rows are being fetched.
+    """
+    __slots__ = ('sql', 'params', 'caller', 'elapsed', 'rows')
+
+    def __init__(self, sql, params, caller):
+        self.sql = sql
+        self.params = params
+        self.caller = caller
+        self.elapsed = 0.0
+        self.rows = 0
+
+
+class QueryProfiler:
+    """
+    Collects latency statistics per query shape and a log of slow statements.
+
+    Attributes:
+        enabled (bool): Whether statements are being recorded.
+        slow_ms (float): Statements taking at least this many milliseconds are logged as slow.
+    """
+    def __init__(self):
+        """
+        Initialize a disabled profiler with no recorded statements.
+        """
+        self.enabled = False
+        self.slow_ms = SLOW_MS
+        self._lock = threading.Lock()
+        self._shapes = {}
+        self._slow = deque(maxlen=SLOW_LOG_SIZE)
+
+    def enable(self, slow_ms=SLOW_MS):
+        """
+        Start recording statements.
+
+        Parameters:
+            slow_ms (float): Statements taking at least this many milliseconds are logged as slow.
+        """
+        self.slow_ms = slow_ms
+        self.enabled = True
+
+    def disable(self):
+        """
+        Stop recording statements. The statistics collected so far are kept.
+        """
+        self.enabled = False
+
+    def reset(self):
+        """
+        Forget all recorded statistics and slow statements.
+        """
+        with self._lock:
+            self._shapes.clear()
+            self._slow.clear()
+
+    def record(self, statement, connection):
+        """
+        Add a finished statement to the statistics, and to the slow log if it took too long.
+
+        Parameters:
+            statement (_Statement): The measurements of the statement.
+            connection (sqlite3.Connection): The connection it ran on, used to explain slow statements.
+        """
+        elapsed_ms = statement.elapsed * 1000
+        shape = query_shape(statement.sql)
+        with self._lock:
+            entry = self._shapes.get(shape)
+            if entry is None:
+                entry = self._shapes[shape] = {
+                    'count': 0, 'rows': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'latencies': deque(maxlen=LATENCY_WINDOW), 'callers': Counter(),
+                }
+            entry['count'] += 1
+            entry['rows'] += statement.rows
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['latencies'].append(elapsed_ms)
+            entry['callers'][statement.caller] += 1
+
+        if elapsed_ms < self.slow_ms:
+            return
+        plan = self._explain(statement, connection)
+        scans = [detail for detail in plan if _is_full_scan(detail)]
+        with self._lock:
+            self._slow.append({
+                'time': time.time(), 'sql': ' '.join(statement.sql.split()), 'elapsed_ms': elapsed_ms,
+                'rows': statement.rows, 'caller': statement.caller, 'plan': plan, 'full_scans': scans,
+            })
+        print(f"Slow query ({elapsed_ms:.1f} ms, {statement.rows} rows) from {statement.caller}: {shape}")
+        for detail in plan:
+            print(f"    {'FULL SCAN -> ' if detail in scans else ''}{detail}")
+
+    def _explain(self, statement, connection):
+        """
+        Get the query plan of a statement.
+
+        Returns:
+            list of str: The plan steps, or an empty list if SQLite cannot explain the statement.
+        """
+        try:
+            cursor = sqlite3.Cursor(connection)
+            try:
+                sqlite3.Cursor.execute(cursor, f'EXPLAIN QUERY PLAN {statement.sql}', statement.params)
+                return [row[3] for row in cursor.fetchall()]
+            finally:
+                cursor.close()
+        except sqlite3.Error:
+            return []
+
+    def stats(self):
+        """
+        Summarize the recorded statements per query shape.
+
+        Percentiles are computed over the most recent `LATENCY_WINDOW` executions of each shape;
+        the counts and totals cover every execution since the last `reset()`.
+
+        Returns:
+            dict: Maps each query shape to a dict with 'count', 'rows', 'total_ms', 'max_ms',
+            'p50_ms', 'p95_ms', 'p99_ms' and 'callers' (a dict of caller to count).
+        """
+        with self._lock:
+            shapes = {shape: (dict(entry), sorted(entry['latencies']), dict(entry['callers']))
+                      for shape, entry in self._shapes.items()}
+        summary = {}
+        for shape, (entry, ordered, callers) in shapes.items():
+            summary[shape] = {
+                'count': entry['count'],
+                'rows': entry['rows'],
+                'total_ms': entry['total_ms'],
+                'max_ms': entry['max_ms'],
+                'p50_ms': _percentile(ordered, 0.50),
+                'p95_ms': _percentile(ordered, 0.95),
+                'p99_ms': _percentile(ordered, 0.99),
+                'callers': callers,
+            }
+        return summary
+
+    def slow_queries(self):
+        """
+        Get the most recent slow statements, oldest first.
+
+        Returns:
+            list of dict: Up to `SLOW_LOG_SIZE` entries with 'time', 'sql', 'elapsed_ms', 'rows',
+            'caller', 'plan' and 'full_scans'.
+        """
+        with self._lock:
+            return list(self._slow)
+
+    def dump(self, path):
+        """
+        Write the per-shape statistics and the slow log to a JSON file.
+
+        Parameters:
+            path (str): The file to write.
+        """
+        with open(path, 'w') as file:
+            json.dump({'stats': self.stats(), 'slow_queries': self.slow_queries()}, file, indent=4)
+
+
+def _is_full_scan(detail):
+    """
+    Tell whether a query plan step reads a whole table rather than using an index.
+
+    Parameters:
+        detail (str): One step of an `EXPLAIN QUERY PLAN` result, such as "SCAN students".
+
+    Returns:
+        bool: True for a table scan without an index.
+    """
+    return detail.startswith('SCAN ') and ' USING ' not in detail
+
+
+profiler = QueryProfiler()
+if os.environ.get('SCHOOL_DB_SLOW_MS'):
+    profiler.enable(float(os.environ['SCHOOL_DB_SLOW_MS']))
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """
+    A cursor that reports its statements to `profiler` while it is enabled.
+
+    A statement that returns rows is finished, and recorded, once its rows have been fetched, when
+    the cursor runs another statement, or when the cursor is closed.
+    """
+    _statement = None
+
+    def execute(self, sql, parameters=()):
+        """
+        Execute a statement, timing it if the profiler is enabled.
+        """
+        if self._statement is not None:
+            self._finish()
+        if not profiler.enabled:
+            return super().execute(sql, parameters)
+        statement = _Statement(sql, parameters, _caller())
+        start = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        finally:
+            statement.elapsed += time.perf_counter() - start
+        self._statement = statement
+        if self.description is None:
+            statement.rows = max(self.rowcount, 0)
+            self._finish()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        """
+        Execute a statement once per parameter set, timing the whole batch if the profiler is enabled.
+
+        The first parameter set is kept with the statement, so that a slow batch can be explained.
+        """
+        if self._statement is not None:
+            self._finish()
+        if not profiler.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        parameters = iter(seq_of_parameters)
+        first = next(parameters, None)
+        if first is not None:
+            parameters = itertools.chain((first,), parameters)
+        statement = _Statement(sql, () if first is None else first, _caller())
+        start = time.perf_counter()
+        try:
+            super().executemany(sql, parameters)
+        finally:
+            statement.elapsed += time.perf_counter() - start
+        statement.rows = max(self.rowcount, 0)
+        self._statement = statement
+        self._finish()
+        return self
+
+    def fetchone(self):
+        statement = self._statement
+        if statement is None:
+            return super().fetchone()
+        start = time.perf_counter()
+        row = super().fetchone()
+        statement.elapsed += time.perf_counter() - start
+        if row is None:
+            self._finish()
+        else:
+            statement.rows += 1
+        return row
+
+    def fetchmany(self, size=None):
+        statement = self._statement
+        if statement is None:
+            return super().fetchmany(self.arraysize if size is None else size)
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        statement.elapsed += time.perf_counter() - start
+        statement.rows += len(rows)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        statement = self._statement
+        if statement is None:
+            return super().fetchall()
+        start = time.perf_counter()
+        rows = super().fetchall()
+        statement.elapsed += time.perf_counter() - start
+        statement.rows += len(rows)
+        self._finish()
+        return rows
+
+    def close(self):
+        if self._statement is not None:
+            self._finish()
+        super().close()
+
+    def __del__(self):
+        # A caller that reads a single row with fetchone() usually drops the cursor without
+        # exhausting it; record the statement when the cursor goes away
+        if self._statement is not None:
+            try:
+                self._finish()
+            except sqlite3.Error:
+                pass
+
+    def _finish(self):
+        """
+        Hand the current statement over to the profiler.
+        """
+        statement, self._statement = self._statement, None
+        profiler.record(statement, self.connection)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """
+    A connection whose cursors, including those behind `execute()`, are `InstrumentedCursor`s.
+    """
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
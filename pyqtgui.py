@@ -1,13 +1,23 @@
+import os
 import sys
 import json
-import csv
 import sqlite3
+import threading
 from PyQt5.QtWidgets import QApplication, QMainWindow, QLabel, QLineEdit, QPushButton, QTableWidget, QTableWidgetItem, \
-    QVBoxLayout, QHBoxLayout, QWidget, QTabWidget, QComboBox, QMessageBox, QHeaderView, QDialog, QFileDialog
-from PyQt5.QtCore import Qt
+    QVBoxLayout, QHBoxLayout, QWidget, QTabWidget, QComboBox, QMessageBox, QHeaderView, QDialog, QFileDialog, QProgressDialog
+from PyQt5.QtCore import Qt, pyqtSignal
 from database import create_database, db_add_student, db_add_instructor, db_add_course, fetch_students, fetch_instructors, fetch_courses, \
-    db_update_student, db_update_instructor, db_update_course, delete_student, delete_instructor, delete_course, fetch_registered_students
+    db_update_student, db_update_instructor, db_update_course, delete_student, delete_instructor, delete_course, fetch_registered_students, fetch_students_by_ids, \
+    db_register_students_to_courses, upsert_students, upsert_instructors, upsert_courses, upsert_registrations, \
+    fetch_student_id_by_name, fetch_instructor_id_by_name, submit_write, search, db_export_csv_in_background
 from models import Student, Instructor, Course
+from data_validation import validate_students, validate_instructors, validate_courses
+from events import event_bus
+from autosave import AutoSaver
+from snapshot import read_snapshot, save_snapshot
+
+SEARCH_LIMIT = 200
+SNAPSHOT_FILE = "school_data.jsonl"
 
 """
 School Management System Application using PyQt5.
@@ -35,6 +45,14 @@ class SchoolManagementSystemApp(QMainWindow):
         instructors (list): List of instructors currently loaded from the database.
         courses (list): List of courses currently loaded from the database.
     """
+    # Carries student events from whichever thread committed them to the GUI thread
+    student_events = pyqtSignal(list)
+    # Carries the outcome of a save from the autosave thread to the GUI thread
+    saved = pyqtSignal(object)
+    # Carry the progress and outcome of a CSV export from its thread to the GUI thread
+    export_progress = pyqtSignal(int, int)
+    export_done = pyqtSignal(object)
+
     def __init__(self):
         """
         Initialize the SchoolManagementSystemApp window and its attributes.
@@ -57,6 +75,18 @@ class SchoolManagementSystemApp(QMainWindow):
         self.setup_ui()
         self.load_data()
 
+        # Update student rows as students change, instead of reloading every table
+        self.student_events.connect(self.on_student_events)
+        self.events_token = event_bus.subscribe(self.student_events.emit, tables=('students',))
+
+        # Save changes to the snapshot in the background a moment after they stop coming in
+        self.save_requested = False
+        self.saved.connect(self.on_saved)
+        self.export_progress.connect(self.on_export_progress)
+        self.export_done.connect(self.on_export_done)
+        self.autosaver = AutoSaver(lambda: save_snapshot(SNAPSHOT_FILE), on_saved=self.saved.emit)
+        self.autosaver.start()
+
     def setup_ui(self):
         """
         Set up the user interface with tabs for managing students, instructors, courses, and registrations.
@@ -187,53 +217,59 @@ class SchoolManagementSystemApp(QMainWindow):
 
     def export_to_csv(self):
         """
-    Export the current students, instructors, and courses data to a CSV file.
+    Export the students, instructors, courses and course rosters to a CSV file.
 
-    The user is prompted to choose a location and filename to save the CSV file.
-    The data is exported in three sections: Students, Instructors, and Courses, each with its own
-    set of column headers and data rows.
+    The user is prompted to choose a location and filename to save the CSV file. The rows are
+    streamed from the database on a background thread (see `database.db_export_csv`), so the
+    window stays responsive however large the data is. A progress dialog shows how far the export
+    has got and lets the user cancel it.
 
     - Students: Includes student ID, name, email, and age.
     - Instructors: Includes instructor ID, name, email, and age.
-    - Courses: Includes course ID, course name, instructor name, and a list of registered student IDs.
+    - Courses: Includes course ID, course name, instructor ID and name, and the number of registered students.
+    - Course Rosters: One row per registration, with the course ID and the student's ID, name and email.
 
     If the export is successful, a message box is displayed to confirm the export.
-
-    Raises:
-        None
     """
         # Prompt the user to choose a location and filename for the CSV file
         options = QFileDialog.Options()
         file_path, _ = QFileDialog.getSaveFileName(self, "Save CSV", "", "CSV Files (*.csv)", options=options)
-        
-        if file_path:
-            with open(file_path, 'w', newline='') as file:
-                writer = csv.writer(file)
 
-                # Export Students
-                writer.writerow(["Students"])  # Section header
-                writer.writerow(["Student ID", "Name", "Email", "Age"])  # Column headers
-                for student in self.students:
-                    writer.writerow([student.student_id, student.name, student._email, student.age])
-
-                writer.writerow([])  # Empty row for separation
-
-                # Export Instructors
-                writer.writerow(["Instructors"])  # Section header
-                writer.writerow(["Instructor ID", "Name", "Email", "Age"])  # Column headers
-                for instructor in self.instructors:
-                    writer.writerow([instructor.instructor_id, instructor.name, instructor._email, instructor.age])
+        if file_path:
+            self.export_dialog = QProgressDialog("Exporting records...", "Cancel", 0, 100, self)
+            self.export_dialog.setWindowTitle("Export to CSV")
+            self.export_dialog.setWindowModality(Qt.WindowModal)
+            self.export_cancelled = threading.Event()
+            self.export_dialog.canceled.connect(self.export_cancelled.set)
+            self.export_path = file_path
+            db_export_csv_in_background(file_path, progress=self.export_progress.emit,
+                                        cancelled=self.export_cancelled.is_set, on_done=self.export_done.emit)
+
+    def on_export_progress(self, done, total):
+        """
+    Move the export progress dialog on.
 
-                writer.writerow([])  # Empty row for separation
+    Parameters:
+        done (int): The number of data rows written so far.
+        total (int): The number of data rows to write.
+    """
+        if not self.export_cancelled.is_set():
+            self.export_dialog.setValue(100 * done // total if total else 100)
 
-                # Export Courses
-                writer.writerow(["Courses"])  # Section header
-                writer.writerow(["Course ID", "Course Name", "Instructor Name", "Registered Students (IDs)"])  # Column headers
-                for course in self.courses:
-                    student_ids = ", ".join([student.student_id for student in course.students])  # List student IDs
-                    writer.writerow([course.course_id, course.course_name, course.instructor.name, student_ids])
+    def on_export_done(self, error):
+        """
+    Close the export progress dialog and report how the export ended.
 
-            QMessageBox.information(self, "Export Successful", f"Data successfully exported to {file_path}")
+    Parameters:
+        error (Exception): None if the export finished or was cancelled, otherwise the exception that stopped it.
+    """
+        cancelled = self.export_cancelled.is_set()
+        self.export_cancelled.set()
+        self.export_dialog.close()
+        if error is not None:
+            QMessageBox.critical(self, "Error", f"Failed to export records to CSV: {error}")
+        elif not cancelled:
+            QMessageBox.information(self, "Export Successful", f"Data successfully exported to {self.export_path}")
 
     def show_instructors(self):
         """
@@ -493,7 +529,8 @@ class SchoolManagementSystemApp(QMainWindow):
         """
     Search for instructors in the system based on a search query.
 
-    Filters the list of instructors by checking if the search query matches the instructor's ID or name.
+    Looks the query up in the full-text search index, matching the start of words in the instructor's
+    ID, name or email, and lists the best matches first.
     Updates the provided table widget with the filtered results.
 
     Parameters:
@@ -502,20 +539,26 @@ class SchoolManagementSystemApp(QMainWindow):
     """
         table_widget.setRowCount(0)  # Clear the table
 
-        for instructor in self.instructors:
-            if search_query.lower() in instructor[1].lower() or search_query.lower() in instructor[0].lower():
-                row_position = table_widget.rowCount()
-                table_widget.insertRow(row_position)
-                table_widget.setItem(row_position, 0, QTableWidgetItem(instructor[0]))  # instructor_id
-                table_widget.setItem(row_position, 1, QTableWidgetItem(instructor[1]))  # name
-                table_widget.setItem(row_position, 2, QTableWidgetItem(instructor[2]))  # email
-                table_widget.setItem(row_position, 3, QTableWidgetItem(str(instructor[3])))  # age
+        instructors_by_id = {instructor[0]: instructor for instructor in self.instructors}
+        if search_query.strip():
+            matches = search(search_query, kinds=('instructor',), limit=SEARCH_LIMIT)
+        else:
+            matches = [('instructor', i[0], i[1], i[3]) for i in self.instructors]
+        for _, instructor_id, name, email in matches:
+            row_position = table_widget.rowCount()
+            table_widget.insertRow(row_position)
+            table_widget.setItem(row_position, 0, QTableWidgetItem(instructor_id))  # instructor_id
+            table_widget.setItem(row_position, 1, QTableWidgetItem(name))  # name
+            table_widget.setItem(row_position, 2, QTableWidgetItem(email))  # email
+            if instructor_id in instructors_by_id:
+                table_widget.setItem(row_position, 3, QTableWidgetItem(str(instructors_by_id[instructor_id][2])))  # age
 
     def search_courses(self, table_widget, search_query):
         """
     Search for courses in the system based on a search query.
 
-    Filters the list of courses by checking if the search query matches the course's ID or name.
+    Looks the query up in the full-text search index, matching the start of words in the course's
+    ID or name, and lists the best matches first.
     Updates the provided table widget with the filtered results.
 
     Parameters:
@@ -524,14 +567,18 @@ class SchoolManagementSystemApp(QMainWindow):
     """
         table_widget.setRowCount(0)  # Clear the table
 
-        for course in self.courses:
-            # Access the tuple elements by index
-            if search_query.lower() in course[1].lower() or search_query.lower() in course[0].lower():
-                row_position = table_widget.rowCount()
-                table_widget.insertRow(row_position)
-                table_widget.setItem(row_position, 0, QTableWidgetItem(course[0]))  # course_id
-                table_widget.setItem(row_position, 1, QTableWidgetItem(course[1]))  # course_name
-                table_widget.setItem(row_position, 2, QTableWidgetItem(course[2]))  # instructor name
+        courses_by_id = {course[0]: course for course in self.courses}
+        if search_query.strip():
+            matches = search(search_query, kinds=('course',), limit=SEARCH_LIMIT)
+        else:
+            matches = [('course', c[0], c[1], None) for c in self.courses]
+        for _, course_id, course_name, _ in matches:
+            row_position = table_widget.rowCount()
+            table_widget.insertRow(row_position)
+            table_widget.setItem(row_position, 0, QTableWidgetItem(course_id))  # course_id
+            table_widget.setItem(row_position, 1, QTableWidgetItem(course_name))  # course_name
+            if course_id in courses_by_id:
+                table_widget.setItem(row_position, 2, QTableWidgetItem(courses_by_id[course_id][2]))  # instructor name
 
     def show_registered_students(self):
         """
@@ -638,10 +685,14 @@ class SchoolManagementSystemApp(QMainWindow):
         email = self.student_email.text()
         student_id = self.student_id.text()
 
+        # The database refuses invalid students too; checking first gives a message naming every problem
+        valid, errors = validate_students([(student_id, name, age, email)])
+        if errors:
+            QMessageBox.critical(self, "Error", "\n".join(message for _, message in errors[0]))
+            return
         try:
-            db_add_student(student_id, name, int(age), email)
+            db_add_student(*valid[0])
             QMessageBox.information(self, "Success", "Student added successfully!")
-            self.load_data()
         except sqlite3.IntegrityError:
             QMessageBox.critical(self, "Error", "Student ID already exists.")
     
@@ -661,8 +712,12 @@ class SchoolManagementSystemApp(QMainWindow):
         email = self.instructor_email.text()
         instructor_id = self.instructor_id.text()
 
+        valid, errors = validate_instructors([(instructor_id, name, age, email)])
+        if errors:
+            QMessageBox.critical(self, "Error", "\n".join(message for _, message in errors[0]))
+            return
         try:
-            db_add_instructor(instructor_id, name, int(age), email)
+            db_add_instructor(*valid[0])
             QMessageBox.information(self, "Success", "Instructor added successfully!")
             self.load_data()
         except sqlite3.IntegrityError:
@@ -677,20 +732,29 @@ class SchoolManagementSystemApp(QMainWindow):
     using the `add_course` function. If the instructor is not found, an error message is shown.
 
     Raises:
-        QMessageBox.critical: If the instructor is not found in the system.
+        QMessageBox.critical: If the instructor is not found in the system, or the course is invalid
+        or its ID already exists.
     """
         course_name = self.course_name.text()
         course_id = self.course_id.text()
         instructor_name = self.course_instructor.currentText()
 
         # Fetch the instructor's ID
-        instructor = next((i for i in fetch_instructors() if i[1] == instructor_name), None)
-        if instructor:
-            db_add_course(course_id, course_name, instructor[0])
-            QMessageBox.information(self, "Success", "Course added successfully!")
-            self.load_data()
-        else:
+        instructor_id = fetch_instructor_id_by_name(instructor_name)
+        if not instructor_id:
             QMessageBox.critical(self, "Error", "Instructor not found.")
+            return
+        valid, errors = validate_courses([(course_id, course_name, instructor_id)])
+        if errors:
+            QMessageBox.critical(self, "Error", "\n".join(message for _, message in errors[0]))
+            return
+        try:
+            db_add_course(*valid[0])
+        except sqlite3.IntegrityError as e:
+            QMessageBox.critical(self, "Error", f"Failed to add the course: {e}")
+            return
+        QMessageBox.information(self, "Success", "Course added successfully!")
+        self.load_data()
 
     def register_student(self):
         """
@@ -702,25 +766,21 @@ class SchoolManagementSystemApp(QMainWindow):
     the course, an error message is shown.
 
     Raises:
-        sqlite3.IntegrityError: If the student is already registered for the course.
-        QMessageBox.critical: If an invalid student or course is selected.
+        QMessageBox.critical: If the student is already registered for the course, or if an invalid
+        student or course is selected.
     """
         student_name = self.registration_student.currentText()
         course_name = self.registration_course.currentText()
 
-        student = next((s for s in fetch_students() if s[1] == student_name), None)
-        course = next((c for c in fetch_courses() if c[1] == course_name), None)
+        student_id = fetch_student_id_by_name(student_name)
+        course = next((c for c in self.courses if c[1] == course_name), None)
 
-        if student and course:
-            conn = sqlite3.connect('school_management.db')
-            cursor = conn.cursor()
-            try:
-                cursor.execute('INSERT INTO registrations (student_id, course_id) VALUES (?, ?)', (student[0], course[0]))
-                conn.commit()
+        if student_id and course:
+            [(_, status)] = db_register_students_to_courses([(student_id, course[0])])
+            if status == 'inserted':
                 QMessageBox.information(self, "Success", f"Student {student_name} registered for {course_name}")
-            except sqlite3.IntegrityError:
+            else:
                 QMessageBox.critical(self, "Error", "Student is already registered for this course.")
-            conn.close()
         else:
             QMessageBox.critical(self, "Error", "Invalid student or course.")
 
@@ -754,104 +814,112 @@ class SchoolManagementSystemApp(QMainWindow):
     Search and filter student records based on user input.
 
     This method retrieves the search query entered by the user, clears the current table,
-    and populates the table with student records whose ID or name matches the search query.
+    and populates the table with the student records whose ID, name or email match the query
+    in the full-text search index, best matches first.
 
     Raises:
         None
     """
-        search_query = self.search_entry.text().lower()
+        search_query = self.search_entry.text()
         self.table.setRowCount(0)  # Clear the table before populating
 
-        for student in self.students:
-            # Access tuple values by index: student[0] for student_id, student[1] for name
-            if search_query in student[1].lower() or search_query in student[0].lower():
-                row_position = self.table.rowCount()
-                self.table.insertRow(row_position)
-                self.table.setItem(row_position, 0, QTableWidgetItem(student[0]))  # student_id
-                self.table.setItem(row_position, 1, QTableWidgetItem(student[1]))  # name
-                self.table.setItem(row_position, 2, QTableWidgetItem(student[2]))  # email
-                self.table.setItem(row_position, 3, QTableWidgetItem(str(student[3])))  # age
+        students_by_id = {student[0]: student for student in self.students}
+        if search_query.strip():
+            matches = search(search_query, kinds=('student',), limit=SEARCH_LIMIT)
+        else:
+            matches = [('student', s[0], s[1], s[3]) for s in self.students]
+        for _, student_id, name, email in matches:
+            row_position = self.table.rowCount()
+            self.table.insertRow(row_position)
+            self.table.setItem(row_position, 0, QTableWidgetItem(student_id))  # student_id
+            self.table.setItem(row_position, 1, QTableWidgetItem(name))  # name
+            self.table.setItem(row_position, 2, QTableWidgetItem(email))  # email
+            if student_id in students_by_id:
+                self.table.setItem(row_position, 3, QTableWidgetItem(str(students_by_id[student_id][2])))  # age
 
     def save_data(self):
         """
-        Save the current student, instructor, and course data to a JSON file.
+        Save the current student, instructor, course and registration data to a snapshot file.
 
-        The data includes the students, instructors, and courses, and is written
-        to a JSON file called 'school_data.json' with the following format:
-        - students: List of student records (student_id, name, email, age).
-        - instructors: List of instructor records (instructor_id, name, email, age).
-        - courses: List of course records, including course details and registered students.
-        """
-        data = {
-            # Access tuple elements by index: student[1] for name, student[3] for email, etc.
-            "students": [(s[1], s[2], s[3], s[0]) for s in self.students],  # Assuming tuple (student_id, name, age, email)
-            "instructors": [(i[1], i[2], i[3], i[0]) for i in self.instructors],  # Assuming tuple (instructor_id, name, age, email)
-            "courses": [
-                {
-                    "course_id": c[0],  # Assuming tuple (course_id, course_name, instructor_name)
-                    "course_name": c[1],
-                    "instructor": c[2],
-                    "students": [student[0] for student in c[3]] if len(c) > 3 else []  # If course tuple contains student list
-                }
-                for c in self.courses
-            ]
-        }
-        with open("school_data.json", "w") as f:
-            json.dump(data, f, indent=4)
-
-        QMessageBox.information(self, "Data Saved", "Data has been saved successfully.")
+        The data is streamed from the database into 'school_data.jsonl', one record per line
+        after a header record (see the `snapshot` module), so saving does not build the whole
+        dataset in memory. Once the snapshot exists, only the rows changed since the last save are
+        appended to 'school_data.jsonl.delta'.
 
-    def refresh_data(self):
+        The save runs on the autosave thread, so the window stays responsive; a message is shown
+        by `on_saved` once it has finished.
         """
-    Load the saved data from a JSON file and refresh the application tables and comboboxes.
+        self.save_requested = True
+        self.autosaver.save_now()
 
-    This method reads data from 'school_data.json' and populates the application with saved students,
-    instructors, and courses. It updates the table and comboboxes accordingly. If no saved data is found,
-    a warning message is displayed.
-    
-    Raises:
-        FileNotFoundError: If the 'school_data.json' file is not found.
-    """
-        try:
-            with open("school_data.json", "r") as f:
-                data = json.load(f)
-        except FileNotFoundError:
-            QMessageBox.warning(self, "Error", "No saved data found.")
-            return
-
-        for student_data in data.get("students", []):
-            if not any(s.student_id == student_data[3] for s in self.students):  
-                student = Student(*student_data)
-                self.students.append(student)
-                self.update_table(student.student_id, student.name, "Student")
-
-        for instructor_data in data.get("instructors", []):
-            if not any(i.instructor_id == instructor_data[3] for i in self.instructors):  
-                instructor = Instructor(*instructor_data)
-                self.instructors.append(instructor)
-                self.update_table(instructor.instructor_id, instructor.name, "Instructor")
-                self.update_comboboxes()
+    def on_saved(self, error):
+        """
+    Report the outcome of a save made by the autosave thread.
 
-        for course_data in data.get("courses", []):
-            course_id = course_data.get('course_id')
-            course_name = course_data.get('course_name')
-            instructor_name = course_data.get('instructor')
-            student_ids = course_data.get('students', [])
+    Saves asked for with the Save button are confirmed with a message box; autosaves only show a
+    note in the status bar.
 
-            instructor = next((i for i in self.instructors if i.name == instructor_name), None)
+    Parameters:
+        error (Exception): None if the save succeeded, otherwise the exception that stopped it.
+    """
+        requested, self.save_requested = self.save_requested, False
+        if error is not None:
+            QMessageBox.critical(self, "Error", f"Failed to save data: {error}")
+        elif requested:
+            QMessageBox.information(self, "Data Saved", "Data has been saved successfully.")
+        else:
+            self.statusBar().showMessage("All changes saved.", 5000)
 
-            if instructor and not any(c.course_id == course_id for c in self.courses):  
-                course = Course(course_id, course_name, instructor)
+    def closeEvent(self, event):
+        """
+    Save any changes that have not been autosaved yet before the window closes.
+    """
+        self.autosaver.stop()
+        event_bus.unsubscribe(self.events_token)
+        super().closeEvent(event)
 
-                for student_id in student_ids:
-                    student = next((s for s in self.students if s.student_id == student_id), None)
-                    if student:
-                        course.add_student(student)
+    def refresh_data(self):
+        """
+    Load the saved data and refresh the application tables and comboboxes.
 
-                self.courses.append(course)
-                self.update_table(course.course_id, course.course_name, "Course")
+    This method merges the snapshot in 'school_data.jsonl' into the database a chunk at a time. Data
+    saved by earlier versions in 'school_data.json' is still read if there is no snapshot. Records that
+    already exist take the saved values. The table and comboboxes are then reloaded. If no saved data
+    is found, a warning message is displayed; if it cannot be read or the database refuses a record,
+    an error message is displayed.
+    """
+        try:
+            if os.path.exists(SNAPSHOT_FILE):
+                counts = list(read_snapshot(SNAPSHOT_FILE).values())
+            else:
+                try:
+                    with open("school_data.json", "r") as f:
+                        data = json.load(f)
+                except FileNotFoundError:
+                    QMessageBox.warning(self, "Error", "No saved data found.")
+                    return
+
+                # Saved people are (name, age, email, id); records that already exist take the saved values
+                def merge():
+                    return [
+                        upsert_instructors((i[3], i[0], i[1], i[2]) for i in data.get("instructors", [])),
+                        upsert_students((s[3], s[0], s[1], s[2]) for s in data.get("students", [])),
+                        upsert_courses((c.get('course_id'), c.get('course_name'), c.get('instructor')) for c in data.get("courses", [])),
+                        upsert_registrations((student_id, c.get('course_id'))
+                                             for c in data.get("courses", []) for student_id in c.get('students', [])),
+                    ]
+
+                counts = submit_write(merge).result()
+        except (ValueError, sqlite3.Error) as e:
+            # A snapshot is merged a chunk at a time, so the chunks before the failing one are kept
+            self.load_data()
+            QMessageBox.critical(self, "Error", f"Failed to load the saved data: {e}")
+            return
+        added = sum(count['inserted'] for count in counts)
+        updated = sum(count['updated'] for count in counts)
 
-        QMessageBox.information(self, "Refresh Complete", "New data has been loaded.")
+        self.load_data()
+        QMessageBox.information(self, "Refresh Complete", f"Saved data has been merged ({added} new, {updated} updated records).")
 
     def update_comboboxes(self):
         """
@@ -913,13 +981,7 @@ class SchoolManagementSystemApp(QMainWindow):
 
         # Insert students into the table
         for student in self.students:
-            row_position = self.table.rowCount()
-            self.table.insertRow(row_position)
-            self.table.setItem(row_position, 0, QTableWidgetItem(student[0]))
-            self.table.setItem(row_position, 1, QTableWidgetItem(student[1]))
-            self.table.setItem(row_position, 2, QTableWidgetItem(student[3]))
-            self.table.setItem(row_position, 3, QTableWidgetItem(str(student[2])))
-            self.table.setItem(row_position, 4, QTableWidgetItem("Student"))
+            self.insert_student_row(student)
 
         # Insert instructors into the combobox
         self.course_instructor.clear()
@@ -934,6 +996,47 @@ class SchoolManagementSystemApp(QMainWindow):
         for course in self.courses:
             self.registration_course.addItem(course[1])
 
+    def insert_student_row(self, student):
+        """
+    Append a student to the main table.
+
+    Parameters:
+        student (tuple): The student record (student_id, name, age, email).
+    """
+        row_position = self.table.rowCount()
+        self.table.insertRow(row_position)
+        self.table.setItem(row_position, 0, QTableWidgetItem(student[0]))
+        self.table.setItem(row_position, 1, QTableWidgetItem(student[1]))
+        self.table.setItem(row_position, 2, QTableWidgetItem(student[3]))
+        self.table.setItem(row_position, 3, QTableWidgetItem(str(student[2])))
+        self.table.setItem(row_position, 4, QTableWidgetItem("Student"))
+
+    def on_student_events(self, events):
+        """
+    Update the table for students added, updated or deleted anywhere in this process.
+
+    Only the rows of the students named in the events are removed, re-read from the database
+    and inserted again, and the registration combobox is refilled from the in-memory list.
+
+    Parameters:
+        events (list of DataEvent): The committed student events from the event bus.
+    """
+        for event in events:
+            keys = set(event.keys)
+            self.students = [s for s in self.students if s[0] not in keys]
+            for row in reversed(range(self.table.rowCount())):
+                item = self.table.item(row, 0)
+                if item is not None and item.text() in keys:
+                    self.table.removeRow(row)
+            if event.action != 'deleted':
+                for student in fetch_students_by_ids(event.keys):
+                    self.students.append(student)
+                    self.insert_student_row(student)
+
+        self.registration_student.clear()
+        for student in self.students:
+            self.registration_student.addItem(student[1])
+
     def delete_record(self):
         """
     Delete the selected record (student, instructor, or course) from the database.
@@ -959,13 +1062,14 @@ class SchoolManagementSystemApp(QMainWindow):
         course = next((c for c in fetch_courses() if c[0] == id_value), None)
 
         if student:
+            # The student's row is removed by on_student_events
             delete_student(id_value)
         elif instructor:
             delete_instructor(id_value)
+            self.load_data()
         elif course:
             delete_course(id_value)
-
-        self.load_data()
+            self.load_data()
 
     def edit_record(self):
         """
@@ -1030,20 +1134,25 @@ class SchoolManagementSystemApp(QMainWindow):
     the student record in the database. The "Update Student" button is reset to "Add Student" 
     after the update is saved.
 
+    If the new details are invalid, an error message is shown and the form stays in update mode.
+
     Parameters:
         student (tuple): The student record being updated.
     """
-        db_update_student(
-            self.student_id.text(),
-            self.student_name.text(),
-            int(self.student_age.text()),
-            self.student_email.text()
-        )
+        valid, errors = validate_students([(self.student_id.text(), self.student_name.text(),
+                                            self.student_age.text(), self.student_email.text())])
+        if errors:
+            QMessageBox.critical(self, "Error", "\n".join(message for _, message in errors[0]))
+            return
+        try:
+            db_update_student(*valid[0])
+        except sqlite3.IntegrityError as e:
+            QMessageBox.critical(self, "Error", f"Failed to update the student: {e}")
+            return
         self.student_id.setReadOnly(False)
         self.add_student_button.setText("Add Student")
         self.add_student_button.clicked.disconnect()
         self.add_student_button.clicked.connect(self.add_student)
-        self.load_data()
 
     def edit_instructor(self, instructor):
         """
@@ -1079,13 +1188,19 @@ class SchoolManagementSystemApp(QMainWindow):
         - Updates the instructor in the database.
         - Resets the form for adding a new instructor.
         - Reloads the updated data into the UI.
+
+    If the new details are invalid, an error message is shown and the form stays in update mode.
     """
-        db_update_instructor(
-            self.instructor_id.text(),
-            self.instructor_name.text(),
-            int(self.instructor_age.text()),
-            self.instructor_email.text()
-        )
+        valid, errors = validate_instructors([(self.instructor_id.text(), self.instructor_name.text(),
+                                               self.instructor_age.text(), self.instructor_email.text())])
+        if errors:
+            QMessageBox.critical(self, "Error", "\n".join(message for _, message in errors[0]))
+            return
+        try:
+            db_update_instructor(*valid[0])
+        except sqlite3.IntegrityError as e:
+            QMessageBox.critical(self, "Error", f"Failed to update the instructor: {e}")
+            return
         self.add_instructor_button.setText("Add Instructor")
         self.add_instructor_button.clicked.disconnect()
         self.add_instructor_button.clicked.connect(self.add_instructor)
@@ -1127,13 +1242,19 @@ class SchoolManagementSystemApp(QMainWindow):
         - Updates the course in the database.
         - Resets the form for adding a new course.
         - Reloads the updated data into the UI.
+
+    If the new details are invalid, an error message is shown and the form stays in update mode.
     """
-        instructor = next((i for i in fetch_instructors() if i[1] == self.course_instructor.currentText()), None)
-        db_update_course(
-            self.course_id.text(),
-            self.course_name.text(),
-            instructor[0] if instructor else None
-        )
+        instructor_id = fetch_instructor_id_by_name(self.course_instructor.currentText())
+        valid, errors = validate_courses([(self.course_id.text(), self.course_name.text(), instructor_id)])
+        if errors:
+            QMessageBox.critical(self, "Error", "\n".join(message for _, message in errors[0]))
+            return
+        try:
+            db_update_course(*valid[0])
+        except sqlite3.IntegrityError as e:
+            QMessageBox.critical(self, "Error", f"Failed to update the course: {e}")
+            return
         self.add_course_button.setText("Add Course")
         self.add_course_button.clicked.disconnect()
         self.add_course_button.clicked.connect(self.add_course)
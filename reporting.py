@@ -0,0 +1,143 @@
+"""
+Aggregate reports over the school database, computed in SQL.
+
+Every report is a single grouped query, so the counting happens inside SQLite instead of
+pulling whole tables into Python. Results are cached and tagged with the version counters of
+the tables they were built from (see `database.fetch_table_versions`); a cached report is
+reused for as long as none of those tables has changed.
+
+Example:
+    import reporting
+
+    for course_id, course_name, enrolled in reporting.enrollment_by_course():
+        print(course_name, enrolled)
+"""
+
+import functools
+import threading
+
+from database import get_connection
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def _cached(*tables):
+    """
+    Cache a report function until one of the given tables changes.
+
+    The cache key is the function and its arguments; the cached value is only used if the
+    version counters of `tables` match the ones it was built from. Reports run inside an
+    uncommitted transaction are not cached, since the changes they see may still be rolled back.
+
+    Parameters:
+        tables (str): The tables the report reads from.
+
+    Returns:
+        callable: The decorator.
+    """
+    placeholders = ', '.join('?' * len(tables))
+
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            key = (function.__name__, args, tuple(sorted(kwargs.items())))
+            with get_connection() as conn:
+                cursor = conn.cursor()
+                if conn.in_transaction:
+                    return function(cursor, *args, **kwargs)
+                cursor.execute(f'SELECT table_name, version FROM table_versions WHERE table_name IN ({placeholders})',
+                               tables)
+                versions = dict(cursor.fetchall())
+                with _cache_lock:
+                    entry = _cache.get(key)
+                if entry is not None and entry[0] == versions:
+                    return entry[1]
+                result = function(cursor, *args, **kwargs)
+            with _cache_lock:
+                _cache[key] = (versions, result)
+            return result
+        return wrapper
+    return decorator
+
+def clear_cache():
+    """
+    Drop every cached report.
+    """
+    with _cache_lock:
+        _cache.clear()
+
+
+@_cached('courses', 'registrations')
+def enrollment_by_course(cursor):
+    """
+    Count the students registered for each course.
+
+    Returns:
+        list of tuple: One tuple (course_id, course_name, enrolled) per course, including courses
+        nobody is registered for, ordered by course ID.
+    """
+    cursor.execute('''
+        SELECT c.course_id, c.course_name, COUNT(r.course_id)
+        FROM courses c LEFT JOIN registrations r ON r.course_id = c.course_id
+        GROUP BY c.course_id
+        ORDER BY c.course_id
+    ''')
+    return cursor.fetchall()
+
+@_cached('instructors', 'courses', 'registrations')
+def course_load_by_instructor(cursor):
+    """
+    Count the courses each instructor teaches and the students registered for them.
+
+    Returns:
+        list of tuple: One tuple (instructor_id, name, courses, students) per instructor, including
+        instructors without courses, ordered by instructor ID.
+    """
+    cursor.execute('''
+        SELECT i.instructor_id, i.name, COUNT(c.course_id), COALESCE(SUM(
+            (SELECT COUNT(*) FROM registrations r WHERE r.course_id = c.course_id)
+        ), 0)
+        FROM instructors i LEFT JOIN courses c ON c.instructor_id = i.instructor_id
+        GROUP BY i.instructor_id
+        ORDER BY i.instructor_id
+    ''')
+    return cursor.fetchall()
+
+@_cached('students', 'registrations')
+def students_without_registrations(cursor):
+    """
+    Find the students who are not registered for any course.
+
+    Returns:
+        list of tuple: The students as tuples (student_id, name, email), ordered by student ID.
+    """
+    cursor.execute('''
+        SELECT s.student_id, s.name, s.email FROM students s
+        WHERE NOT EXISTS (SELECT 1 FROM registrations r WHERE r.student_id = s.student_id)
+        ORDER BY s.student_id
+    ''')
+    return cursor.fetchall()
+
+@_cached('courses', 'registrations')
+def course_fill_distribution(cursor, bucket_size=10):
+    """
+    Group the courses by how many students are registered for them.
+
+    Parameters:
+        bucket_size (int): The width of each enrollment range.
+
+    Returns:
+        list of tuple: One tuple (low, high, courses) per non-empty range, ordered by `low`, where
+        `courses` is the number of courses with between `low` and `high` students, inclusive.
+    """
+    cursor.execute('''
+        SELECT enrolled / :size * :size AS low, enrolled / :size * :size + :size - 1, COUNT(*)
+        FROM (
+            SELECT (SELECT COUNT(*) FROM registrations r WHERE r.course_id = c.course_id) AS enrolled
+            FROM courses c
+        )
+        GROUP BY low
+        ORDER BY low
+    ''', {'size': bucket_size})
+    return cursor.fetchall()
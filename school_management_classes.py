@@ -1,4 +1,4 @@
-import json
+import serializers
 from data_validation import validate_age,validate_course_id,validate_course_name,validate_email,validate_instructor_id,validate_name,validate_student_id
 
 # Person Class
@@ -11,6 +11,13 @@ class Person:
         self.age = age
         self.__email = email  
 
+    # for rows read back from the database, which its CHECK constraints have already validated;
+    # sets the fields without running the validators again
+    def _set_trusted(self, name, age, email):
+        self.name = name
+        self.age = age
+        self.__email = email
+
     def introduce(self):
         print(f"Hello, my name is {self.name} and I am {self.age} years old.")
 
@@ -29,6 +36,16 @@ class Student(Person):
         self.student_id = student_id
         self.registered_courses = registered_courses
 
+    # trusted fast path for a (student_id, name, age, email) row of the students table; skips validation
+    @classmethod
+    def from_row(cls, row):
+        student_id, name, age, email = row
+        student = cls.__new__(cls)
+        student._set_trusted(name, age, email)
+        student.student_id = student_id
+        student.registered_courses = []
+        return student
+
     def register_course(self, course):
         #part of data validation
         if isinstance(course, Course):
@@ -41,7 +58,7 @@ class Student(Person):
         data = super().change_to_dictionary()
         data.update({
             'student_id': self.student_id,
-            'registered_courses': self.registered_courses
+            'registered_courses': [course.course_id for course in self.registered_courses]
         })
         return data
 
@@ -53,6 +70,16 @@ class Instructor(Person):
         self.instructor_id = instructor_id
         self.assigned_courses = assigned_courses  
 
+    # trusted fast path for an (instructor_id, name, age, email) row of the instructors table; skips validation
+    @classmethod
+    def from_row(cls, row):
+        instructor_id, name, age, email = row
+        instructor = cls.__new__(cls)
+        instructor._set_trusted(name, age, email)
+        instructor.instructor_id = instructor_id
+        instructor.assigned_courses = []
+        return instructor
+
     def assign_course(self, course):
         #part of data validation 
         if isinstance(course, Course):
@@ -65,7 +92,7 @@ class Instructor(Person):
         data = super().change_to_dictionary()
         data.update({
             'instructor_id': self.instructor_id,
-            'assigned_courses': self.assigned_courses
+            'assigned_courses': [course.course_id for course in self.assigned_courses]
         })
         return data
     
@@ -81,6 +108,18 @@ class Course:
         self.instructor = instructor
         self.enrolled_students = enrolled_students
 
+    # trusted fast path for a (course_id, course_name, instructor_id) row of the courses table; skips
+    # validation. The instructor is looked up in `instructors`, a dictionary keyed by instructor ID
+    @classmethod
+    def from_row(cls, row, instructors=None):
+        course_id, course_name, instructor_id = row
+        course = cls.__new__(cls)
+        course.course_id = course_id
+        course.course_name = course_name
+        course.instructor = instructors.get(instructor_id) if instructors and instructor_id is not None else None
+        course.enrolled_students = []
+        return course
+
     def add_student(self, student: Student):
         #part of data validation 
         if isinstance(student, Student):
@@ -88,22 +127,106 @@ class Course:
         else:
             raise ValueError("Enrolled student must be an instance of Student.")
     
-    #for serialization
+    #for serialization; the instructor and students are referenced by ID
     def change_to_dictionary(self):
         return {
             'course_id': self.course_id,
             'course_name': self.course_name,
-            'instructor': self.instructor.change_to_dictionary(),
-            'enrolled_students': [student.change_to_dictionary() for student in self.enrolled_students]
+            'instructor_id': self.instructor.instructor_id if self.instructor else None,
+            'enrolled_students': [student.student_id for student in self.enrolled_students]
         }
     
 
-#serialize
-def save_to_json(data, filename):
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=4)
+# Version of the normalized save format written by school_data_to_dictionary. Each student,
+# instructor and course is stored once and relations are stored as lists of IDs. Files without
+# a format_version are in the old format, where courses embed their instructor and students.
+SAVE_FORMAT_VERSION = 2
+
+#serialize the whole school (lists of students, instructors and courses) in the normalized format
+def school_data_to_dictionary(students, instructors, courses):
+    return {
+        'format_version': SAVE_FORMAT_VERSION,
+        'students': [student.change_to_dictionary() for student in students],
+        'instructors': [instructor.change_to_dictionary() for instructor in instructors],
+        'courses': [course.change_to_dictionary() for course in courses],
+    }
+
+#deserialize data written by school_data_to_dictionary, or in the old embedded format;
+#returns (students, instructors, courses) as dictionaries keyed by ID
+def school_data_from_dictionary(data):
+    old_format = data.get('format_version', 1) < 2
+    if old_format:
+        # Dictionaries keyed by name or course ID, with courses embedding full records
+        student_records = list(data.get('students', {}).values())
+        instructor_records = list(data.get('instructors', {}).values())
+        course_records = [
+            {'course_id': c['course_id'], 'course_name': c['course_name'],
+             'instructor_id': c['instructor']['instructor_id'] if c.get('instructor') else None,
+             'enrolled_students': [s['student_id'] for s in c.get('enrolled_students', [])]}
+            for c in data.get('courses', {}).values()
+        ]
+    else:
+        student_records = data.get('students', [])
+        instructor_records = data.get('instructors', [])
+        course_records = data.get('courses', [])
+
+    # Create every object first, then resolve the ID references through the ID-keyed indexes
+    students = {r['student_id']: Student(r['name'], r['age'], r['email'], r['student_id'], [])
+                for r in student_records}
+    instructors = {r['instructor_id']: Instructor(r['name'], r['age'], r['email'], r['instructor_id'], [])
+                   for r in instructor_records}
+    courses = {r['course_id']: Course(r['course_id'], r['course_name'], instructors.get(r['instructor_id']), [])
+               for r in course_records}
+
+    for r in course_records:
+        course = courses[r['course_id']]
+        course.enrolled_students = [students[sid] for sid in r['enrolled_students'] if sid in students]
+        if old_format:
+            # The old format only kept the relations on the course side
+            for student in course.enrolled_students:
+                student.registered_courses.append(course)
+            if course.instructor:
+                course.instructor.assigned_courses.append(course)
+    if not old_format:
+        for r in student_records:
+            students[r['student_id']].registered_courses = [courses[cid] for cid in r['registered_courses'] if cid in courses]
+        for r in instructor_records:
+            instructors[r['instructor_id']].assigned_courses = [courses[cid] for cid in r['assigned_courses'] if cid in courses]
+    return students, instructors, courses
+
+#rebuild objects from database rows, e.g. rows_to_students(cursor) after selecting
+#(student_id, name, age, email) or rows_to_students(iter_students()); rows from our own database
+#were validated when they were written, so they take the trusted from_row path. Each returns a
+#dictionary keyed by ID, like school_data_from_dictionary
+def rows_to_students(rows):
+    from_row = Student.from_row
+    return {row[0]: from_row(row) for row in rows}
+
+def rows_to_instructors(rows):
+    from_row = Instructor.from_row
+    return {row[0]: from_row(row) for row in rows}
+
+def rows_to_courses(rows, instructors=None):
+    courses = {row[0]: Course.from_row(row, instructors) for row in rows}
+    for course in courses.values():
+        if course.instructor is not None:
+            course.instructor.assigned_courses.append(course)
+    return courses
+
+#link registrations, given as (student_id, course_id) rows, between the objects built above
+def link_registrations(rows, students, courses):
+    for student_id, course_id in rows:
+        student = students.get(student_id)
+        course = courses.get(course_id)
+        if student is not None and course is not None:
+            student.registered_courses.append(course)
+            course.enrolled_students.append(student)
+
+#serialize; the file format is chosen by `format` or by the file extension (see serializers.py),
+#and is indented JSON by default
+def save_to_json(data, filename, format=None):
+    serializers.save(data, filename, format)
 
 #deserialize 
-def load_from_json(filename):
-    with open(filename, 'r') as f:
-        return json.load(f)
\ No newline at end of file
+def load_from_json(filename, format=None):
+    return serializers.load(filename, format)
\ No newline at end of file
@@ -0,0 +1,217 @@
+"""
+Interchangeable file formats for saving and loading the school data.
+
+Every backend turns the plain data written by `school_data_to_dictionary()` (dicts, lists,
+strings and numbers) into bytes and back. The backend is chosen by name, or else by the file
+extension:
+
+    ============  ===============  =====================================================
+    Name          Extensions       Format
+    ============  ===============  =====================================================
+    json          .json            JSON indented by 4 spaces (the original format)
+    json-compact  .cjson           JSON without whitespace; uses orjson when installed
+    msgpack       .msgpack         MessagePack; only available when msgpack is installed
+    marshal       .bin             Python's marshal format; fast, but tied to Python
+    ============  ===============  =====================================================
+
+Example:
+    from serializers import save, load
+
+    save(data, 'school.cjson')
+    data = load('school.cjson')
+"""
+
+import abc
+import json
+import marshal
+import os
+
+from fileutil import atomic_open
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class Serializer(abc.ABC):
+    """
+    A file format for the saved data.
+
+    Attributes:
+        name (str): The name used to select the backend.
+        extensions (tuple of str): The file extensions that select the backend, with the dot.
+        description (str): A label for file dialogs.
+    """
+    name = None
+    extensions = ()
+    description = None
+
+    @abc.abstractmethod
+    def dumps(self, data):
+        """
+        Encode data.
+
+        Parameters:
+            data: The data to encode, made of dicts, lists, strings, numbers and None.
+
+        Returns:
+            bytes: The encoded data.
+        """
+
+    @abc.abstractmethod
+    def loads(self, payload):
+        """
+        Decode data encoded by `dumps()`.
+
+        Parameters:
+            payload (bytes): The encoded data.
+
+        Returns:
+            The decoded data.
+        """
+
+
+class JsonSerializer(Serializer):
+    """
+    Human-readable JSON indented by 4 spaces, written with the standard library.
+    """
+    name = 'json'
+    extensions = ('.json',)
+    description = 'JSON Files'
+
+    def dumps(self, data):
+        return json.dumps(data, indent=4).encode('utf-8')
+
+    def loads(self, payload):
+        return json.loads(payload)
+
+
+class CompactJsonSerializer(Serializer):
+    """
+    JSON without indentation or spaces. Uses orjson when it is installed, which is several times
+    faster than the standard library and produces the same kind of output.
+    """
+    name = 'json-compact'
+    extensions = ('.cjson',)
+    description = 'Compact JSON Files'
+
+    def dumps(self, data):
+        if orjson is not None:
+            return orjson.dumps(data)
+        return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, payload):
+        if orjson is not None:
+            return orjson.loads(payload)
+        return json.loads(payload)
+
+
+class MsgpackSerializer(Serializer):
+    """
+    The MessagePack binary format, readable from other languages.
+    """
+    name = 'msgpack'
+    extensions = ('.msgpack',)
+    description = 'MessagePack Files'
+
+    def dumps(self, data):
+        return msgpack.packb(data)
+
+    def loads(self, payload):
+        return msgpack.unpackb(payload, raw=False)
+
+
+class MarshalSerializer(Serializer):
+    """
+    Python's own marshal format. Very fast to write and read, but only readable by Python, so it
+    suits local caches and autosaves rather than files to share.
+    """
+    name = 'marshal'
+    extensions = ('.bin',)
+    description = 'Marshal Files'
+
+    def dumps(self, data):
+        return marshal.dumps(data)
+
+    def loads(self, payload):
+        return marshal.loads(payload)
+
+
+SERIALIZERS = {}
+
+
+def register_serializer(serializer):
+    """
+    Make a backend available by its name and extensions.
+
+    Parameters:
+        serializer (Serializer): The backend to register.
+    """
+    SERIALIZERS[serializer.name] = serializer
+
+for _serializer in (JsonSerializer(), CompactJsonSerializer(), MarshalSerializer()):
+    register_serializer(_serializer)
+if msgpack is not None:
+    register_serializer(MsgpackSerializer())
+
+
+def get_serializer(format=None, path=None):
+    """
+    Pick a backend by name, or else by the extension of a file name.
+
+    Parameters:
+        format (str): The name of the backend, or None to choose by extension.
+        path (str): The file name used to choose the backend when `format` is None.
+
+    Raises:
+        ValueError: If there is no backend with the given name.
+
+    Returns:
+        Serializer: The backend; the 'json' backend if the extension is not recognized.
+    """
+    if format is not None:
+        if format not in SERIALIZERS:
+            raise ValueError(f"Unknown save format: {format}")
+        return SERIALIZERS[format]
+    extension = os.path.splitext(path or '')[1].lower()
+    for serializer in SERIALIZERS.values():
+        if extension in serializer.extensions:
+            return serializer
+    return SERIALIZERS['json']
+
+def save(data, path, format=None):
+    """
+    Write data to a file with the backend chosen by `format` or by the file extension.
+
+    The file is replaced all at once (see `fileutil.atomic_open`), so a failed save leaves the
+    previous file intact.
+
+    Parameters:
+        data: The data to save.
+        path (str): The file to write.
+        format (str): The name of the backend, or None to choose by extension.
+    """
+    payload = get_serializer(format, path).dumps(data)
+    with atomic_open(path, 'wb') as f:
+        f.write(payload)
+
+def load(path, format=None):
+    """
+    Read data from a file with the backend chosen by `format` or by the file extension.
+
+    Parameters:
+        path (str): The file to read.
+        format (str): The name of the backend, or None to choose by extension.
+
+    Returns:
+        The loaded data.
+    """
+    with open(path, 'rb') as f:
+        payload = f.read()
+    return get_serializer(format, path).loads(payload)
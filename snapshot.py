@@ -0,0 +1,456 @@
+"""
+Streaming snapshots of the school database in a JSON Lines format.
+
+A snapshot file starts with a header record, followed by one record per instructor, student,
+course and registration, in that order, so every record only refers to records before it:
+
+    {"type": "header", "format": "school-snapshot", "version": 1, "created": "2024-05-01T12:00:00", "pretty": false, "seq": 120, "database": "9f3c..."}
+    {"type": "instructor", "instructor_id": "I1", "name": "Ann", "age": 40, "email": "ann@mail.com"}
+    {"type": "student", "student_id": "S1", "name": "Bob", "age": 20, "email": "bob@mail.com"}
+    {"type": "course", "course_id": "C1", "course_name": "Math", "instructor_id": "I1"}
+    {"type": "registration", "student_id": "S1", "course_id": "C1"}
+
+The writer streams rows straight from database cursors and the reader merges records into the
+database a chunk at a time, so neither ever holds the whole dataset in memory. With `pretty=True`
+each record is indented over several lines, ending with a `}` line of its own; the reader
+accepts both layouts.
+
+The header's `seq` is the position in the database change log that the snapshot reflects, and
+`database` is the `database_id` of the database it was taken from. Later saves can then append just the rows changed since then to a delta file next to the
+snapshot (`school_data.jsonl.delta`), in blocks that each end with a commit record:
+
+    {"type": "student", "student_id": "S1", "name": "Bob", "age": 21, "email": "bob@mail.com"}
+    {"type": "deleted", "record": "registration", "key": ["S2", "C1"]}
+    {"type": "commit", "seq": 131, "created": "2024-05-01T12:05:00"}
+
+Programs that save to the same snapshot take turns: the functions here that read or write a
+snapshot and its delta file hold `fileutil.file_lock` on the snapshot while they run.
+
+`compact_snapshot` folds the delta file back into the snapshot. `save_snapshot` chooses between
+a full snapshot, a delta and a compaction on its own. A delta is only appended for the database
+the snapshot was taken from, and only if its change log has not fallen behind the snapshot (as
+it does when the database file is replaced or restored from a backup); otherwise the snapshot
+is written in full again.
+"""
+
+import functools
+import json
+import os
+import time
+
+from database import BULK_CHUNK_SIZE, ITER_BATCH_SIZE, delete_courses, delete_instructors, delete_registrations, \
+    delete_students, database_id, fetch_changed_rows, iter_courses, iter_instructors, iter_registrations, iter_students, \
+    latest_change_seq, prune_changes, transaction, upsert_courses, upsert_instructors, upsert_registrations, upsert_students
+from fileutil import atomic_open, file_lock
+
+SNAPSHOT_FORMAT = 'school-snapshot'
+SNAPSHOT_VERSION = 1
+DELTA_SUFFIX = '.delta'
+COMPACT_RATIO = 0.5
+
+# Record types in file order: (type, table, fields, key length, iterator over the table, upsert function)
+_SECTIONS = [
+    ('instructor', 'instructors', ('instructor_id', 'name', 'age', 'email'), 1, iter_instructors, upsert_instructors),
+    ('student', 'students', ('student_id', 'name', 'age', 'email'), 1, iter_students, upsert_students),
+    ('course', 'courses', ('course_id', 'course_name', 'instructor_id'), 1, iter_courses, upsert_courses),
+    ('registration', 'registrations', ('student_id', 'course_id'), 2, iter_registrations, upsert_registrations),
+]
+_ORDER = {record_type: index for index, (record_type, *_) in enumerate(_SECTIONS)}
+
+# Functions deleting rows by key
+_DELETES = {'instructor': delete_instructors, 'student': delete_students, 'course': delete_courses,
+            'registration': delete_registrations}
+
+
+def _locked(function):
+    """
+    Decorator for the functions that take a snapshot path first, which holds `file_lock` on the
+    snapshot while they run.
+    """
+    @functools.wraps(function)
+    def wrapper(path, *args, **kwargs):
+        with file_lock(path):
+            return function(path, *args, **kwargs)
+    return wrapper
+
+def _timestamp():
+    """
+    Get the current local time in the format used by the header and commit records.
+    """
+    return time.strftime('%Y-%m-%dT%H:%M:%S')
+
+def _record_key(record):
+    """
+    Identify the row a data record describes.
+
+    Returns:
+        tuple: The record type followed by its key values.
+    """
+    _, _, fields, key_length, _, _ = _SECTIONS[_ORDER[record['type']]]
+    return (record['type'],) + tuple(record[field] for field in fields[:key_length])
+
+@_locked
+def write_snapshot(path, pretty=False, batch_size=ITER_BATCH_SIZE):
+    """
+    Write the whole database to a snapshot file, replacing any delta file next to it.
+
+    All tables are read inside one transaction, so the snapshot is consistent even if other
+    connections write to the database at the same time. The file is written under a temporary
+    name and then moved into place (see `fileutil.atomic_open`), so an interrupted save never
+    leaves a half-written snapshot.
+
+    Parameters:
+        path (str): The file to write.
+        pretty (bool): Indent each record over several lines instead of writing one record per line.
+        batch_size (int): The number of rows fetched from the database at a time.
+
+    Returns:
+        dict: The number of records written per table.
+    """
+    indent = 4 if pretty else None
+    counts = {}
+    with atomic_open(path, 'w', encoding='utf-8') as f, transaction():
+        header = {'type': 'header', 'format': SNAPSHOT_FORMAT, 'version': SNAPSHOT_VERSION,
+                  'created': _timestamp(), 'pretty': pretty, 'seq': latest_change_seq(), 'database': database_id()}
+        f.write(json.dumps(header, indent=indent) + '\n')
+        for record_type, table, fields, _, iterate, _ in _SECTIONS:
+            count = 0
+            for row in iterate(batch_size):
+                record = {'type': record_type}
+                record.update(zip(fields, row))
+                f.write(json.dumps(record, indent=indent) + '\n')
+                count += 1
+            counts[table] = count
+    # Every delta block is older than the new snapshot, so the delta file is no longer needed
+    if os.path.exists(path + DELTA_SUFFIX):
+        os.remove(path + DELTA_SUFFIX)
+    return counts
+
+def read_header(path):
+    """
+    Read the header record of a snapshot file.
+
+    Parameters:
+        path (str): The snapshot file.
+
+    Raises:
+        ValueError: If the file does not start with a snapshot header of a supported version.
+
+    Returns:
+        dict: The header record.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return _read_header(_iter_records(f), path)
+
+def _read_header(records, path):
+    """
+    Take the header record from the records of a snapshot file and check it.
+    """
+    header = next(records, None)
+    if not header or header.get('type') != 'header' or header.get('format') != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path} is not a school snapshot file.")
+    if header.get('version', 0) > SNAPSHOT_VERSION:
+        raise ValueError(f"{path} was written by a newer version (snapshot version {header['version']}).")
+    return header
+
+def iter_snapshot(path):
+    """
+    Read the records of a snapshot file one at a time. Delta files are not included.
+
+    Parameters:
+        path (str): The snapshot file.
+
+    Raises:
+        ValueError: If the file does not start with a snapshot header of a supported version.
+
+    Yields:
+        dict: Each record after the header, in file order.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        records = _iter_records(f)
+        _read_header(records, path)
+        yield from records
+
+def _iter_records(f):
+    """
+    Parse the JSON records of an open snapshot file, in either the one-line or the pretty layout.
+    """
+    lines = []
+    for line in f:
+        stripped = line.rstrip()
+        if not lines:
+            if not stripped:
+                continue
+            if stripped != '{':
+                yield json.loads(line)
+                continue
+        # A pretty record starts with a "{" line and ends with an unindented "}" line
+        lines.append(line)
+        if stripped == '}':
+            yield json.loads(''.join(lines))
+            lines = []
+    if lines:
+        raise ValueError("The snapshot file ends in the middle of a record.")
+
+def _iter_delta_blocks(path, after_seq):
+    """
+    Read the committed blocks of a delta file.
+
+    Records after the last commit record belong to a save that was interrupted and are ignored,
+    as are blocks already contained in a snapshot taken at `after_seq`.
+
+    Yields:
+        tuple: `(seq, records)` for each block, in file order.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        block = []
+        for record in _iter_records(f):
+            if record.get('type') != 'commit':
+                block.append(record)
+                continue
+            if record['seq'] > after_seq:
+                yield record['seq'], block
+            block = []
+
+def _last_commit(path):
+    """
+    Find the last commit record of a delta file, reading from the end.
+
+    Returns:
+        tuple: `(seq, offset)`, the sequence number of the commit record and the file offset just
+        after it, or `(None, 0)` if the file does not exist or has no commit record.
+    """
+    if not os.path.exists(path):
+        return None, 0
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        size = end = f.tell()
+        partial = b''
+        while end > 0:
+            start = max(0, end - 65536)
+            f.seek(start)
+            data = f.read(end - start) + partial
+            lines = data.split(b'\n')
+            # Unless the start of the file was reached, the first line may be cut off
+            partial = lines.pop(0) if start > 0 else b''
+            # The offset of the line being looked at, counting back from the end of the data
+            offset = start + len(data) + 1
+            for line in reversed(lines):
+                offset -= len(line) + 1
+                if b'"commit"' in line:
+                    record = json.loads(line)
+                    if record.get('type') == 'commit':
+                        return record['seq'], min(offset + len(line) + 1, size)
+            end = start
+    return None, 0
+
+@_locked
+def write_delta(path):
+    """
+    Append the rows changed since the last save to the delta file next to a snapshot.
+
+    Only the change log and the changed rows are read, so the cost is proportional to the number
+    of changes rather than to the size of the database.
+
+    Parameters:
+        path (str): The snapshot file; the delta is appended to `path + DELTA_SUFFIX`.
+
+    Raises:
+        ValueError: If the snapshot has no change log position, was taken from another database,
+        or does not match the database's change log: the delta file is older than the snapshot,
+        the last save is ahead of the change log, or the log has been pruned past it. A full
+        `write_snapshot` is needed then.
+
+    Returns:
+        int: The number of records appended; 0 if nothing changed.
+    """
+    header = read_header(path)
+    base_seq = header.get('seq')
+    if base_seq is None:
+        raise ValueError(f"{path} does not record its change log position.")
+    if header.get('database') != database_id():
+        raise ValueError(f"{path} was taken from another database.")
+    delta_path = path + DELTA_SUFFIX
+    last_seq, committed_end = _last_commit(delta_path)
+    if last_seq is not None and last_seq < base_seq:
+        raise ValueError(f"{delta_path} is older than {path}.")
+    since = max(base_seq, last_seq or 0)
+    if since > latest_change_seq():
+        raise ValueError(f"{path} was saved at change {since}, ahead of the database's change log.")
+    seq, rows, deleted = fetch_changed_rows(since)
+    if seq == since:
+        return 0
+
+    count = 0
+    with open(delta_path, 'a', encoding='utf-8') as f:
+        # Drop the records of an interrupted save, so they do not end up in this block
+        f.truncate(committed_end)
+        for record_type, table, fields, _, _, _ in _SECTIONS:
+            for row in rows[table]:
+                record = {'type': record_type}
+                record.update(zip(fields, row))
+                f.write(json.dumps(record) + '\n')
+                count += 1
+        # Deletions go from dependent records to the records they depend on
+        for record_type, table, _, _, _, _ in reversed(_SECTIONS):
+            for key in deleted[table]:
+                f.write(json.dumps({'type': 'deleted', 'record': record_type, 'key': key}) + '\n')
+                count += 1
+        f.write(json.dumps({'type': 'commit', 'seq': seq, 'created': _timestamp()}) + '\n')
+        f.flush()
+        os.fsync(f.fileno())
+    return count
+
+@_locked
+def compact_snapshot(path, prune=False):
+    """
+    Fold the delta file next to a snapshot back into the snapshot and remove it.
+
+    The deltas are collected in memory (their size is proportional to the changes they hold),
+    then the snapshot is streamed into a new file with changed records replaced, deleted records
+    left out and new records added at the end of their section.
+
+    The change log is shared by every snapshot and every other client of the database, so it is
+    only pruned when asked to. Pass `prune=True` only if this snapshot is the sole reader of the
+    log; a snapshot saved at an older position would otherwise have to be rewritten in full.
+
+    Parameters:
+        path (str): The snapshot file.
+        prune (bool): Once the new snapshot is on disk, prune the change log entries it contains.
+    """
+    delta_path = path + DELTA_SUFFIX
+    header = read_header(path)
+    changed, deleted = {}, set()
+    seq = header.get('seq', 0)
+    for seq, records in _iter_delta_blocks(delta_path, seq):
+        for record in records:
+            if record['type'] == 'deleted':
+                key = (record['record'],) + (tuple(record['key']) if isinstance(record['key'], list) else (record['key'],))
+                changed.pop(key, None)
+                deleted.add(key)
+            else:
+                key = _record_key(record)
+                changed[key] = record
+                deleted.discard(key)
+
+    indent = 4 if header.get('pretty') else None
+    header.update(created=_timestamp(), seq=seq)
+    with atomic_open(path, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(header, indent=indent) + '\n')
+        written = 0
+
+        def add_new_records(until):
+            # Records that are not in the snapshot yet go at the end of their section
+            nonlocal written
+            while written < until:
+                record_type = _SECTIONS[written][0]
+                for key in [key for key in changed if key[0] == record_type]:
+                    f.write(json.dumps(changed.pop(key), indent=indent) + '\n')
+                written += 1
+
+        for record in iter_snapshot(path):
+            add_new_records(_ORDER[record['type']])
+            key = _record_key(record)
+            if key in deleted:
+                continue
+            f.write(json.dumps(changed.pop(key, record), indent=indent) + '\n')
+        add_new_records(len(_SECTIONS))
+    if os.path.exists(delta_path):
+        os.remove(delta_path)
+    if prune:
+        # atomic_open has synced the new snapshot to disk, so the entries it covers are no longer needed
+        prune_changes(seq)
+
+@_locked
+def save_snapshot(path, pretty=False, prune=False):
+    """
+    Save the database to a snapshot file as cheaply as possible.
+
+    A full snapshot is written the first time, or when no delta can be made. Otherwise only the
+    changes since the last save are appended to the delta file, and the delta file is folded into
+    the snapshot once it grows past `COMPACT_RATIO` times the size of the snapshot.
+
+    Parameters:
+        path (str): The snapshot file.
+        pretty (bool): Indent the records of a full snapshot.
+        prune (bool): Prune the change log after a compaction (see `compact_snapshot`).
+
+    Returns:
+        str: What was done: 'full', 'delta' or 'compacted'.
+    """
+    if not os.path.exists(path):
+        write_snapshot(path, pretty)
+        return 'full'
+    try:
+        write_delta(path)
+    except ValueError:
+        write_snapshot(path, pretty)
+        return 'full'
+    delta_path = path + DELTA_SUFFIX
+    if os.path.exists(delta_path) and os.path.getsize(delta_path) > COMPACT_RATIO * os.path.getsize(path):
+        compact_snapshot(path, prune)
+        return 'compacted'
+    return 'delta'
+
+@_locked
+def read_snapshot(path, policy='update', chunk_size=BULK_CHUNK_SIZE):
+    """
+    Merge a snapshot file, and then the delta file next to it if there is one, into the database.
+
+    Records are collected into chunks of `chunk_size` and merged with the `upsert_*` and
+    `delete_*` functions, one transaction per chunk, so memory use does not grow with the size
+    of the file. If loading stops part way, the chunks merged so far are kept; loading the same
+    file again completes it.
+
+    Parameters:
+        path (str): The snapshot file.
+        policy (str): The conflict policy for records that already exist: 'update', 'keep' or 'error'.
+        chunk_size (int): The number of records merged per transaction.
+
+    Raises:
+        ValueError: If the file is not a snapshot or contains a record of an unknown type.
+
+    Returns:
+        dict: Maps each table to the number of rows 'inserted', 'updated', 'unchanged' and 'deleted'.
+    """
+    counts = {table: {'inserted': 0, 'updated': 0, 'unchanged': 0, 'deleted': 0} for _, table, *_ in _SECTIONS}
+    _merge(iter_snapshot(path), policy, chunk_size, counts)
+    for _, records in _iter_delta_blocks(path + DELTA_SUFFIX, read_header(path).get('seq', 0)):
+        _merge(records, 'update', chunk_size, counts)
+    return counts
+
+def _merge(records, policy, chunk_size, counts):
+    """
+    Merge data and deletion records into the database in chunks, adding to `counts`.
+    """
+    sections = {record_type: (table, fields, upsert) for record_type, table, fields, _, _, upsert in _SECTIONS}
+    current, chunk = None, []
+
+    def flush():
+        record_type, deleting = current
+        table, _, upsert = sections[record_type]
+        if deleting:
+            counts[table]['deleted'] += _DELETES[record_type](chunk)
+        else:
+            for key, value in upsert(chunk, policy=policy, chunk_size=chunk_size).items():
+                counts[table][key] += value
+        chunk.clear()
+
+    for record in records:
+        deleting = record.get('type') == 'deleted'
+        record_type = record.get('record') if deleting else record.get('type')
+        if record_type not in sections:
+            raise ValueError(f"Unknown snapshot record type: {record_type}")
+        # Records refer to earlier sections, so a section is written out before the next one starts
+        if (record_type, deleting) != current or len(chunk) >= chunk_size:
+            if chunk:
+                flush()
+            current = (record_type, deleting)
+        if deleting:
+            chunk.append(record['key'])
+        else:
+            chunk.append(tuple(record.get(field) for field in sections[record_type][1]))
+    if chunk:
+        flush()
@@ -0,0 +1,29 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import database
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """
+    Point the database module at an empty database file of its own for one test.
+    """
+    path = str(tmp_path / 'school.db')
+    database.configure_pool(db_path=path)
+    yield path
+    database.disable_single_writer()
+    database.configure_pool(db_path=database.DB_PATH)
+
+
+@pytest.fixture
+def db(db_path):
+    """
+    A fresh database with every table and migration in place.
+    """
+    database.create_database()
+    return db_path
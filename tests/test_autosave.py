@@ -0,0 +1,129 @@
+import threading
+import time
+
+import pytest
+
+import database
+import snapshot
+from autosave import AutoSaver
+from events import event_bus
+
+
+def _change(table='students'):
+    event_bus.publish(table, 'added', ['S1'])
+    event_bus.flush()
+
+
+class _Saves:
+    """
+    Collects the `on_saved` reports of an AutoSaver, so a test can wait for its saves.
+    """
+    def __init__(self):
+        self.errors = []
+        self._done = threading.Semaphore(0)
+
+    def on_saved(self, error):
+        self.errors.append(error)
+        self._done.release()
+
+    def wait(self):
+        return self._done.acquire(timeout=5)
+
+
+@pytest.fixture
+def saves():
+    return _Saves()
+
+
+def test_burst_of_changes_is_saved_once(saves):
+    calls = []
+    saver = AutoSaver(lambda: calls.append(time.monotonic()), delay=0.1, max_delay=5, on_saved=saves.on_saved)
+    saver.start()
+    try:
+        for _ in range(5):
+            _change()
+        assert saver.pending
+        assert saves.wait()
+        time.sleep(0.3)
+        assert len(calls) == 1 and saves.errors == [None]
+        assert not saver.pending
+    finally:
+        saver.stop()
+
+
+def test_steady_changes_are_saved_by_the_max_delay(saves):
+    calls = []
+    saver = AutoSaver(lambda: calls.append(1), delay=0.2, max_delay=0.3, on_saved=saves.on_saved)
+    saver.start()
+    try:
+        end = time.monotonic() + 1.0
+        while time.monotonic() < end:
+            _change()
+            time.sleep(0.05)
+        assert len(calls) >= 2
+    finally:
+        saver.stop(flush=False)
+
+
+def test_stop_flushes_and_filters_tables(saves):
+    calls = []
+    saver = AutoSaver(lambda: calls.append(1), delay=60, tables=('courses',), on_saved=saves.on_saved)
+    saver.start()
+    _change('students')
+    assert not saver.pending
+    _change('courses')
+    saver.stop()
+    assert calls == [1]
+
+    saver = AutoSaver(lambda: calls.append(2), delay=60)
+    saver.start()
+    _change()
+    saver.stop(flush=False)
+    assert calls == [1]
+
+
+def test_save_now_and_failed_saves(saves, capsys):
+    failures = [OSError('disk full')]
+
+    def save():
+        if failures:
+            raise failures.pop()
+
+    saver = AutoSaver(save, delay=0.05, on_saved=saves.on_saved)
+    saver.start()
+    try:
+        saver.save_now()
+        assert saves.wait()
+        assert isinstance(saves.errors[0], OSError) and saver.pending
+        # The failed save is tried again after the delay
+        assert saves.wait()
+        assert saves.errors[1] is None and not saver.pending
+    finally:
+        saver.stop()
+    assert 'disk full' in capsys.readouterr().out
+
+
+def test_concurrent_snapshot_saves(db, tmp_path):
+    path = str(tmp_path / 'school.jsonl')
+    errors = []
+
+    def save(start):
+        try:
+            for i in range(start, start + 40):
+                database.db_add_student(f'S{i}', f'Student {i}', 20, f's{i}@mail.com')
+                snapshot.save_snapshot(path)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save, args=(start,)) for start in (0, 1000)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    expected = set(database.fetch_students())
+
+    database.configure_pool(db_path=str(tmp_path / 'check.db'))
+    database.create_database()
+    snapshot.read_snapshot(path)
+    assert set(database.fetch_students()) == expected
@@ -0,0 +1,43 @@
+import sqlite3
+import threading
+
+import database
+
+
+def _students(path):
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT student_id, name, age, email FROM students ORDER BY student_id').fetchall()
+    finally:
+        conn.close()
+
+
+def test_backup_copies_committed_rows_only(db, tmp_path):
+    backup_path = str(tmp_path / 'backup.db')
+    database.db_add_students([(f'S{i}', f'Student {i}', 20, f's{i}@mail.com') for i in range(300)])
+    steps = []
+
+    with database.transaction():
+        database.db_add_student('S999', 'Late Student', 20, 'late@mail.com')
+        database.db_backup(backup_path, pages=2, progress=lambda status, remaining, total: steps.append(remaining))
+    assert _students(backup_path) == sorted(row for row in database.fetch_students() if row[0] != 'S999')
+    assert len(steps) > 1 and steps[-1] == 0
+
+
+def test_backup_in_background_reports_completion(db, tmp_path):
+    backup_path = str(tmp_path / 'backup.db')
+    database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+    done = threading.Event()
+    errors = []
+
+    def on_done(error):
+        errors.append(error)
+        done.set()
+
+    database.db_backup_in_background(backup_path, on_done=on_done).join(5)
+    assert done.is_set() and errors == [None]
+    assert _students(backup_path) == [('S1', 'Alice', 20, 'alice@mail.com')]
+
+    done.clear()
+    database.db_backup_in_background(str(tmp_path / 'no such dir' / 'backup.db'), on_done=on_done).join(5)
+    assert isinstance(errors[-1], sqlite3.Error)
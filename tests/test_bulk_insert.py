@@ -0,0 +1,25 @@
+import database
+
+
+def test_bulk_insert_reports_conflicts_per_row(db):
+    database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+
+    report = database.db_add_students([('S1', 'Alice', 21, 'alice@mail.com'), ('S2', 'Bob', 22, 'bob@mail.com'),
+                                       ('S2', 'Bobby', 23, 'bobby@mail.com'), ('S3', 'Carl', 24, 'carl@mail.com')],
+                                      chunk_size=2)
+    assert report == [('S1', 'conflict'), ('S2', 'inserted'), ('S2', 'conflict'), ('S3', 'inserted')]
+    assert database.fetch_students() == [('S1', 'Alice', 20, 'alice@mail.com'), ('S2', 'Bob', 22, 'bob@mail.com'),
+                                         ('S3', 'Carl', 24, 'carl@mail.com')]
+
+
+def test_bulk_insert_of_every_kind(db):
+    database.db_add_instructors([('I1', 'Ann', 40, 'ann@mail.com')])
+    database.db_add_students((f'S{i}', f'Student {i}', 20, f's{i}@mail.com') for i in range(1200))
+    database.db_add_courses([('C1', 'Math', 'I1'), ('C2', 'Art', 'I1')])
+
+    report = database.db_register_students_to_courses([('S1', 'C1'), ('S2', 'C1'), ('S1', 'C1')])
+    assert report == [(('S1', 'C1'), 'inserted'), (('S2', 'C1'), 'inserted'), (('S1', 'C1'), 'conflict')]
+    assert len(database.fetch_students()) == 1200
+    assert database.fetch_courses() == [('C1', 'Math', 'I1'), ('C2', 'Art', 'I1')]
+    assert sorted(database.fetch_registered_students('C1')) == [('S1', 'Student 1', 's1@mail.com', 20),
+                                                                ('S2', 'Student 2', 's2@mail.com', 20)]
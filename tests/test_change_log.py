@@ -0,0 +1,43 @@
+import database
+
+
+def test_every_write_is_logged_in_order(db):
+    start = database.latest_change_seq()
+    database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+    database.db_update_student('S1', 'Alice Smith', 20, 'alice@mail.com')
+    database.db_add_course('C1', 'Math', None)
+    database.db_register_students_to_courses([('S1', 'C1')])
+
+    changes = database.changes_since(start)
+    assert [change[1:] for change in changes[:4]] == [('students', 'insert', 'S1'), ('students', 'update', 'S1'),
+                                                      ('courses', 'insert', 'C1'),
+                                                      ('registrations', 'insert', ('S1', 'C1'))]
+    assert [change[0] for change in changes] == sorted(change[0] for change in changes)
+    assert database.latest_change_seq() == changes[-1][0]
+    assert database.changes_since(start, limit=1) == changes[:1]
+    assert database.changes_since(changes[1][0]) == changes[2:]
+
+
+def test_key_change_is_a_delete_and_an_insert(db):
+    database.db_add_instructor('I1', 'Ann', 40, 'ann@mail.com')
+    seq = database.latest_change_seq()
+    with database.get_connection() as conn:
+        conn.execute("UPDATE instructors SET instructor_id = 'I2' WHERE instructor_id = 'I1'")
+        conn.commit()
+    assert [change[1:] for change in database.changes_since(seq)] == [('instructors', 'delete', 'I1'),
+                                                                      ('instructors', 'insert', 'I2')]
+
+
+def test_table_versions_and_pruning(db):
+    before = database.fetch_table_versions()
+    database.db_add_students([('S1', 'Alice', 20, 'alice@mail.com'), ('S2', 'Bob', 21, 'bob@mail.com')])
+    database.delete_student('S2')
+    after = database.fetch_table_versions()
+    assert after['students'] == before['students'] + 3
+    assert after['courses'] == before['courses']
+
+    seq = database.latest_change_seq()
+    database.db_add_student('S3', 'Carl', 22, 'carl@mail.com')
+    database.prune_changes(seq)
+    assert [change[1:] for change in database.changes_since(0)] == [('students', 'insert', 'S3')]
+    assert database.fetch_table_versions()['students'] == after['students'] + 1
@@ -0,0 +1,86 @@
+import sqlite3
+
+import pytest
+
+import database
+from school_management_classes import Course, Instructor, Student, link_registrations, rows_to_courses, \
+    rows_to_instructors, rows_to_students
+
+
+@pytest.mark.parametrize('student', [(' ', 'Alice', 20, 'alice@mail.com'), ('S1', 'A', 20, 'alice@mail.com'),
+                                     ('S1', 'Alice', -1, 'alice@mail.com'), ('S1', 'Alice', 20.5, 'alice@mail.com'),
+                                     ('S1', 'Alice', 20, 'alice.mail.com')])
+def test_every_write_path_is_checked(db, student):
+    with pytest.raises(sqlite3.IntegrityError):
+        database.db_add_student(*student)
+    with pytest.raises(sqlite3.IntegrityError):
+        database.db_add_students([student])
+    with pytest.raises(sqlite3.IntegrityError):
+        database.upsert_students([student])
+    assert database.fetch_students() == []
+
+
+def test_upgrade_quarantines_rows_that_break_the_rules(db_path, monkeypatch):
+    migrations = database._MIGRATIONS
+    monkeypatch.setattr(database, '_MIGRATIONS', migrations[:5])
+    database.create_database()
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        INSERT INTO instructors VALUES ('I1', 'Ann', 40, 'ann@mail.com'), ('I2', 'B', 50, 'ben@mail.com');
+        INSERT INTO students VALUES ('S1', 'Alice', 20, 'alice@mail.com'), ('S2', 'Bob', 21, 'no email');
+        INSERT INTO courses VALUES ('C1', 'Math', 'I1'), ('C2', 'Art', 'I2'), ('C3', ' ', 'I1');
+        INSERT INTO registrations VALUES ('S1', 'C1'), ('S2', 'C1'), ('S1', 'C3');
+    ''')
+    conn.close()
+    seq = database.latest_change_seq()
+
+    monkeypatch.setattr(database, '_MIGRATIONS', migrations)
+    database.create_database()
+    assert database.fetch_students() == [('S1', 'Alice', 20, 'alice@mail.com')]
+    assert database.fetch_instructors() == [('I1', 'Ann', 40, 'ann@mail.com')]
+    assert database.fetch_courses() == [('C1', 'Math', 'I1'), ('C2', 'Art', None)]
+    assert sorted(database.iter_registrations()) == [('S1', 'C1')]
+    with database.get_connection() as conn:
+        assert conn.execute('SELECT * FROM quarantined_students').fetchall() == [('S2', 'Bob', 21, 'no email')]
+        assert conn.execute('SELECT * FROM quarantined_courses').fetchall() == [('C3', ' ', 'I1')]
+        assert sorted(conn.execute('SELECT * FROM quarantined_registrations')) == [('S1', 'C3'), ('S2', 'C1')]
+    deleted = {change[1:] for change in database.changes_since(seq) if change[2] == 'delete'}
+    assert {('students', 'delete', 'S2'), ('instructors', 'delete', 'I2'), ('courses', 'delete', 'C3'),
+            ('registrations', 'delete', ('S2', 'C1'))} <= deleted
+    assert database.search('bob') == []
+
+
+def test_objects_built_from_rows(db):
+    database.db_add_instructors([('I1', 'Ann', 40, 'ann@mail.com')])
+    database.db_add_students([('S1', 'Alice', 20, 'alice@mail.com'), ('S2', 'Bob', 21, 'bob@mail.com')])
+    database.db_add_courses([('C1', 'Math', 'I1'), ('C2', 'Art', None)])
+    database.db_register_students_to_courses([('S1', 'C1'), ('S2', 'C1'), ('S2', 'C2')])
+
+    instructors = rows_to_instructors(database.iter_instructors())
+    students = rows_to_students(database.iter_students())
+    courses = rows_to_courses(database.iter_courses(), instructors)
+    link_registrations(database.iter_registrations(), students, courses)
+    assert isinstance(students['S1'], Student) and isinstance(instructors['I1'], Instructor)
+    assert isinstance(courses['C1'], Course)
+    assert students['S2'].get_email() == 'bob@mail.com'
+    assert courses['C1'].instructor is instructors['I1'] and courses['C2'].instructor is None
+    assert instructors['I1'].assigned_courses == [courses['C1']]
+    assert [student.student_id for student in courses['C1'].enrolled_students] == ['S1', 'S2']
+    assert students['S2'].registered_courses == [courses['C1'], courses['C2']]
+
+
+def test_updates_refused_by_check_constraints_raise(db):
+    database.db_add_instructor('I1', 'Ann', 40, 'ann@mail.com')
+    database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+    database.db_add_course('C1', 'Math', 'I1')
+
+    with pytest.raises(sqlite3.IntegrityError):
+        database.db_update_student('S1', 'A', 20, 'alice@mail.com')
+    with pytest.raises(sqlite3.IntegrityError):
+        database.db_update_instructor('I1', 'Ann', 40, 'not an email')
+    with pytest.raises(sqlite3.IntegrityError):
+        database.db_update_course('C1', ' ', 'I1')
+
+    assert database.fetch_students() == [('S1', 'Alice', 20, 'alice@mail.com')]
+    assert database.fetch_instructors() == [('I1', 'Ann', 40, 'ann@mail.com')]
+    assert database.fetch_courses() == [('C1', 'Math', 'I1')]
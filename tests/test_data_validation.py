@@ -0,0 +1,61 @@
+import pytest
+
+from data_validation import validate_age, validate_courses, validate_email, validate_instructors, validate_name, \
+    validate_registrations, validate_students
+
+
+def test_batch_collects_every_error_of_every_row():
+    valid, errors = validate_students([('S1', 'Alice', '20', 'alice@mail.com'),
+                                       (' ', 'B', -3, 'not an email'),
+                                       ('S3', 'Carl', 'old', 'carl@mail'),
+                                       ('S4', 'Dana', 22)])
+    assert valid == [('S1', 'Alice', 20, 'alice@mail.com')]
+    assert errors == {
+        1: [('student_id', "Student ID cannot be empty."), ('name', "Name must be more than one character."),
+            ('age', "Age must be non-negative."), ('email', "Invalid email format.")],
+        2: [('age', "Age must be a whole number."), ('email', "Invalid email format.")],
+        3: [(None, "Expected 4 fields, found 3.")],
+    }
+
+
+def test_batch_cleans_valid_rows():
+    assert validate_instructors([(' I1 ', ' Ann ', ' 40 ', ' ann@mail.com ')]) == \
+        ([('I1', 'Ann', 40, 'ann@mail.com')], {})
+    assert validate_courses([('C1', 'Math', ' '), ('C2', 'Art', 'I1'), ('C3', '', None)]) == \
+        ([('C1', 'Math', None), ('C2', 'Art', 'I1')], {2: [('course_name', "Course name cannot be empty.")]})
+    assert validate_registrations([('S1', 'C1'), ('S1', '')]) == \
+        ([('S1', 'C1')], {1: [('course_id', "Course ID cannot be empty.")]})
+    assert validate_students([]) == ([], {})
+
+
+def test_single_value_wrappers_keep_their_messages():
+    assert validate_name('Alice') == 'Alice'
+    with pytest.raises(ValueError, match="Name must be more than one character."):
+        validate_name('A')
+
+
+def test_validate_email_checks_the_value_as_given():
+    assert validate_email('bob@mail.com') == 'bob@mail.com'
+    with pytest.raises(ValueError):
+        validate_email(' bob@mail.com ')
+
+
+def test_validate_age_does_not_truncate():
+    assert validate_age(20) == 20
+    with pytest.raises(ValueError):
+        validate_age(-0.5)
+    with pytest.raises(ValueError):
+        validate_age(-1)
+
+
+def test_validate_name_trims_only_for_the_check():
+    assert validate_name(' Al ') == ' Al '
+    with pytest.raises(ValueError):
+        validate_name(' A ')
+
+
+def test_batch_refuses_fractional_ages():
+    valid, errors = validate_students([('S1', 'Alice', -0.5, 'a@mail.com'), ('S2', 'Bob', 20.0, 'b@mail.com'),
+                                       ('S3', 'Carl', '21', ' c@mail.com ')])
+    assert valid == [('S2', 'Bob', 20, 'b@mail.com'), ('S3', 'Carl', 21, 'c@mail.com')]
+    assert errors == {0: [('age', "Age must be a whole number.")]}
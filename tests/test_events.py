@@ -0,0 +1,68 @@
+import pytest
+
+import database
+from events import DataEvent, EventBus, event_bus
+
+
+@pytest.fixture
+def received():
+    events = []
+    token = event_bus.subscribe(events.extend)
+    yield events
+    event_bus.unsubscribe(token)
+
+
+def test_events_are_delivered_after_commit(db, received):
+    database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+    assert received == [DataEvent('students', 'added', ('S1',))]
+
+    received.clear()
+    with database.transaction():
+        database.db_add_students([('S2', 'Bob', 21, 'bob@mail.com'), ('S1', 'Alice', 20, 'alice@mail.com')])
+        database.db_update_student('S2', 'Bobby', 21, 'bob@mail.com')
+        database.db_add_student('S3', 'Carl', 22, 'carl@mail.com')
+        assert received == []
+    assert received == [DataEvent('students', 'added', ('S2', 'S3')), DataEvent('students', 'updated', ('S2',))]
+
+
+def test_rolled_back_writes_publish_nothing(db, received):
+    with pytest.raises(ValueError):
+        with database.transaction():
+            database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+            raise ValueError('form rejected')
+
+    with database.transaction():
+        database.db_add_student('S2', 'Bob', 21, 'bob@mail.com')
+        try:
+            with database.transaction():
+                database.db_add_student('S3', 'Carl', 22, 'carl@mail.com')
+                raise ValueError('inner block rejected')
+        except ValueError:
+            pass
+    assert received == [DataEvent('students', 'added', ('S2',))]
+
+
+def test_subscribers_filter_and_failures_are_isolated(capsys):
+    bus = EventBus()
+    courses = []
+
+    def broken(events):
+        raise RuntimeError('subscriber failed')
+
+    bus.subscribe(broken)
+    token = bus.subscribe(courses.extend, tables=('courses',), actions=('deleted',))
+    bus.publish('courses', 'added', ['C1'])
+    bus.publish('courses', 'deleted', ['C2'])
+    bus.publish('students', 'deleted', ['S1'])
+    bus.publish('courses', 'deleted', [])
+    bus.flush()
+    assert courses == [DataEvent('courses', 'deleted', ('C2',))]
+    assert 'subscriber failed' in capsys.readouterr().out
+
+    bus.unsubscribe(token)
+    bus.publish('courses', 'deleted', ['C3'])
+    mark = bus.mark()
+    bus.publish('courses', 'deleted', ['C4'])
+    bus.discard(mark)
+    bus.flush()
+    assert courses == [DataEvent('courses', 'deleted', ('C2',))]
@@ -0,0 +1,63 @@
+import csv
+import threading
+
+import database
+
+
+def _add_school():
+    database.db_add_instructors([('I1', 'Ann', 40, 'ann@mail.com')])
+    database.db_add_students([(f'S{i}', f'Student {i}', 20, f's{i}@mail.com') for i in range(3)])
+    database.db_add_courses([('C1', 'Math', 'I1'), ('C2', 'Art', None)])
+    database.db_register_students_to_courses([('S2', 'C1'), ('S0', 'C1')])
+
+
+def _read(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_export_writes_every_section(db, tmp_path):
+    path = str(tmp_path / 'school.csv')
+    _add_school()
+    steps = []
+
+    assert database.db_export_csv(path, progress=lambda done, total: steps.append((done, total)), batch_size=2)
+    assert _read(path) == [
+        ['Students'], ['Student ID', 'Name', 'Email', 'Age'],
+        ['S0', 'Student 0', 's0@mail.com', '20'], ['S1', 'Student 1', 's1@mail.com', '20'],
+        ['S2', 'Student 2', 's2@mail.com', '20'], [],
+        ['Instructors'], ['Instructor ID', 'Name', 'Email', 'Age'], ['I1', 'Ann', 'ann@mail.com', '40'], [],
+        ['Courses'], ['Course ID', 'Course Name', 'Instructor ID', 'Instructor Name', 'Registered Students'],
+        ['C1', 'Math', 'I1', 'Ann', '2'], ['C2', 'Art', '', '', '0'], [],
+        ['Course Rosters'], ['Course ID', 'Student ID', 'Student Name', 'Email'],
+        ['C1', 'S0', 'Student 0', 's0@mail.com'], ['C1', 'S2', 'Student 2', 's2@mail.com'], [],
+    ]
+    assert steps[-1] == (8, 8) and len(steps) == 5
+
+
+def test_cancelled_export_keeps_the_previous_file(db, tmp_path):
+    path = str(tmp_path / 'school.csv')
+    _add_school()
+    database.db_export_csv(path)
+    before = _read(path)
+    database.db_add_student('S9', 'Student 9', 20, 's9@mail.com')
+
+    batches = []
+    assert not database.db_export_csv(path, cancelled=lambda: len(batches) > 1,
+                                      progress=lambda done, total: batches.append(done), batch_size=1)
+    assert _read(path) == before
+
+
+def test_export_in_background_reports_completion(db, tmp_path):
+    _add_school()
+    done = threading.Event()
+    errors = []
+
+    def on_done(error):
+        errors.append(error)
+        done.set()
+
+    database.db_export_csv_in_background(str(tmp_path / 'school.csv'), on_done=on_done).join(5)
+    assert done.is_set() and errors == [None]
+    database.db_export_csv_in_background(str(tmp_path / 'no such dir' / 'school.csv'), on_done=on_done).join(5)
+    assert isinstance(errors[-1], OSError)
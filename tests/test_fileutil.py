@@ -0,0 +1,61 @@
+import os
+import threading
+
+import pytest
+
+from fileutil import atomic_open, file_lock
+
+
+def test_atomic_open_keeps_the_old_file_on_error(tmp_path):
+    path = str(tmp_path / 'data.txt')
+    with atomic_open(path, 'w') as f:
+        f.write('first')
+    with pytest.raises(RuntimeError):
+        with atomic_open(path, 'w') as f:
+            f.write('second')
+            raise RuntimeError('save interrupted')
+    with open(path) as f:
+        assert f.read() == 'first'
+    assert os.listdir(tmp_path) == ['data.txt']
+
+
+def test_concurrent_atomic_writes_do_not_clobber_each_other(tmp_path):
+    path = str(tmp_path / 'data.txt')
+    errors = []
+
+    def write(text):
+        try:
+            for _ in range(50):
+                with atomic_open(path, 'w') as f:
+                    f.write(text * 1000)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(text,)) for text in 'ab']
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    with open(path) as f:
+        assert f.read() in ('a' * 1000, 'b' * 1000)
+    assert [name for name in os.listdir(tmp_path) if name.endswith('.tmp')] == []
+
+
+def test_file_lock_is_exclusive_and_reentrant(tmp_path):
+    path = str(tmp_path / 'data.txt')
+    taken = threading.Event()
+
+    def take():
+        with file_lock(path):
+            taken.set()
+
+    with file_lock(path):
+        with file_lock(path):
+            pass
+        thread = threading.Thread(target=take)
+        thread.start()
+        thread.join(0.2)
+        assert not taken.is_set()
+    thread.join(5)
+    assert taken.is_set()
@@ -0,0 +1,64 @@
+import sqlite3
+
+import pytest
+
+import database
+
+
+@pytest.fixture
+def school(db):
+    database.db_add_instructors([('I1', 'Ann', 40, 'ann@mail.com'), ('I2', 'Ben', 50, 'ben@mail.com')])
+    database.db_add_students([('S1', 'Alice', 20, 'alice@mail.com'), ('S2', 'Bob', 21, 'bob@mail.com'),
+                              ('S3', 'Carl', 22, 'carl@mail.com')])
+    database.db_add_courses([('C1', 'Math', 'I1'), ('C2', 'Art', 'I2'), ('C3', 'Music', '')])
+    database.db_register_students_to_courses([('S1', 'C1'), ('S2', 'C1'), ('S2', 'C2'), ('S3', 'C2')])
+
+
+def _registrations():
+    with database.get_connection() as conn:
+        return conn.execute('SELECT student_id, course_id FROM registrations ORDER BY 1, 2').fetchall()
+
+
+def test_missing_references_are_refused(school):
+    assert database.fetch_courses()[2] == ('C3', 'Music', None)
+    with pytest.raises(sqlite3.IntegrityError):
+        database.db_register_students_to_courses([('S1', 'NO SUCH COURSE')])
+    with pytest.raises(sqlite3.IntegrityError):
+        database.db_add_course('C4', 'Physics', 'NO SUCH INSTRUCTOR')
+    assert len(_registrations()) == 4
+
+
+def test_bulk_deletes_cascade(school):
+    assert database.delete_students(['S1', 'S3', 'NO SUCH STUDENT']) == 2
+    assert _registrations() == [('S2', 'C1'), ('S2', 'C2')]
+    assert database.delete_courses(['C1']) == 1
+    assert _registrations() == [('S2', 'C2')]
+    assert database.delete_instructors(['I2']) == 1
+    assert database.fetch_courses() == [('C2', 'Art', None), ('C3', 'Music', None)]
+    assert database.delete_students([]) == 0
+
+
+def test_upgrade_cleans_up_orphans(db_path, monkeypatch):
+    migrations = database._MIGRATIONS
+    monkeypatch.setattr(database, '_MIGRATIONS', migrations[:4])
+    database.create_database()
+    conn = sqlite3.connect(db_path)
+    conn.executescript('''
+        INSERT INTO instructors VALUES ('I1', 'Ann', 40, 'ann@mail.com');
+        INSERT INTO students VALUES ('S1', 'Alice', 20, 'alice@mail.com');
+        INSERT INTO courses VALUES ('C1', 'Math', 'I1'), ('C2', 'Art', ''), ('C3', 'Music', 'GONE');
+        INSERT INTO registrations VALUES ('S1', 'C1'), ('S1', 'GONE'), ('GONE', 'C1');
+    ''')
+    conn.close()
+
+    monkeypatch.setattr(database, '_MIGRATIONS', migrations)
+    database.create_database()
+    assert database.fetch_courses() == [('C1', 'Math', 'I1'), ('C2', 'Art', None), ('C3', 'Music', None)]
+    assert _registrations() == [('S1', 'C1')]
+    with database.get_connection() as conn:
+        assert conn.execute('PRAGMA foreign_key_check').fetchall() == []
+        # Orphaned registrations are kept aside and logged as deleted
+        assert sorted(conn.execute('SELECT * FROM quarantined_registrations').fetchall()) == [('GONE', 'C1'), ('S1', 'GONE')]
+    deleted = [key for _, table, operation, key in database.changes_since(0)
+               if table == 'registrations' and operation == 'delete']
+    assert sorted(deleted) == [('GONE', 'C1'), ('S1', 'GONE')]
@@ -0,0 +1,91 @@
+import csv
+
+import pytest
+
+import database
+import importer
+from importer import import_csv
+
+
+def _write_csv(path, rows):
+    with open(path, 'w', newline='') as f:
+        csv.writer(f).writerows(rows)
+
+
+def _read_csv(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+@pytest.mark.parametrize('workers', [0, 1])
+def test_import_rejects_invalid_rows(db, tmp_path, workers):
+    path = str(tmp_path / 'students.csv')
+    _write_csv(path, [['Student ID', 'Name', 'Age', 'Email', 'Notes'],
+                      ['S1', 'Alice', '20', 'alice@mail.com', ''],
+                      ['S2', 'Bob', 'twenty', 'bob@mail.com', ''],
+                      ['S3', 'Carl', '22', 'carl@mail.com', 'late'],
+                      ['S4', 'Dana'],
+                      [' S5 ', ' Eve ', '23', 'eve@mail.com', '']])
+    rows = []
+
+    counts = import_csv(path, 'students', chunk_size=2, workers=workers, progress=rows.append)
+    assert counts == {'inserted': 3, 'updated': 0, 'unchanged': 0, 'rejected': 2}
+    assert rows == [2, 4, 5]
+    assert database.fetch_students() == [('S1', 'Alice', 20, 'alice@mail.com'), ('S3', 'Carl', 22, 'carl@mail.com'),
+                                         ('S5', 'Eve', 23, 'eve@mail.com')]
+    rejected = _read_csv(str(tmp_path / 'students_rejected.csv'))
+    assert rejected[0] == ['Student ID', 'Name', 'Age', 'Email', 'Notes', 'row', 'reason']
+    assert [row[:-1] for row in rejected[1:]] == [['S2', 'Bob', 'twenty', 'bob@mail.com', '', '3'],
+                                                  ['S4', 'Dana', '5']]
+    assert 'whole number' in rejected[1][-1]
+
+    # Importing the same file again updates nothing
+    counts = import_csv(path, 'students', workers=0)
+    assert counts == {'inserted': 0, 'updated': 0, 'unchanged': 3, 'rejected': 2}
+
+
+def test_rows_with_missing_references_are_rejected(db, tmp_path):
+    database.db_add_students([('S1', 'Alice', 20, 'alice@mail.com'), ('S2', 'Bob', 21, 'bob@mail.com')])
+    database.db_add_course('C1', 'Math', None)
+    path = str(tmp_path / 'registrations.csv')
+    _write_csv(path, [['student_id', 'course_id'], ['S1', 'C1'], ['S9', 'C1'], ['S2', 'C1'], ['S2', 'C9']])
+
+    counts = import_csv(path, 'registrations', rejected_path=str(tmp_path / 'refused.csv'), workers=0)
+    assert counts == {'inserted': 2, 'updated': 0, 'unchanged': 0, 'rejected': 2}
+    assert sorted(database.iter_registrations()) == [('S1', 'C1'), ('S2', 'C1')]
+    assert [row[:3] for row in _read_csv(str(tmp_path / 'refused.csv'))[1:]] == [['S9', 'C1', '3'],
+                                                                                 ['S2', 'C9', '5']]
+
+
+def test_file_without_the_required_columns_is_refused(db, tmp_path):
+    path = str(tmp_path / 'courses.csv')
+    _write_csv(path, [['course_id', 'course_name'], ['C1', 'Math']])
+    with pytest.raises(ValueError):
+        import_csv(path, 'courses', workers=0)
+    with pytest.raises(ValueError):
+        import_csv(path, 'teachers', workers=0)
+
+
+def test_courses_with_a_missing_instructor_are_rejected(db, tmp_path):
+    database.db_add_instructor('I1', 'Ann', 40, 'ann@mail.com')
+    path = str(tmp_path / 'courses.csv')
+    _write_csv(path, [['course_id', 'course_name', 'instructor_id'], ['C1', 'Math', 'I1'], ['C2', 'Art', 'I9'],
+                      ['C3', 'Music', '']])
+
+    counts = import_csv(path, 'courses', workers=0)
+    assert counts == {'inserted': 2, 'updated': 0, 'unchanged': 0, 'rejected': 1}
+    rejected = _read_csv(str(tmp_path / 'courses_rejected.csv'))
+    assert rejected[1] == ['C2', 'Art', 'I9', '3', 'There is no instructor with ID I9.']
+
+
+def test_chunks_the_database_refuses_are_split(db, monkeypatch):
+    database.db_add_students([('S1', 'Alice', 20, 'alice@mail.com'), ('S2', 'Bob', 21, 'bob@mail.com')])
+    database.db_add_course('C1', 'Math', None)
+    # As if the student was deleted between the lookup and the write
+    monkeypatch.setattr(importer, 'fetch_existing_ids', lambda table, ids: set(ids))
+    counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+
+    refused = importer._write_chunk('registrations', [('S1', 'C1'), ('S9', 'C1'), ('S2', 'C1')], 'update', counts)
+    assert [index for index, _ in refused] == [1]
+    assert 'FOREIGN KEY' in refused[0][1]
+    assert counts['inserted'] == 2
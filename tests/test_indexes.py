@@ -0,0 +1,51 @@
+import sqlite3
+
+import database
+
+
+def _plan(path, query, params):
+    conn = sqlite3.connect(path)
+    try:
+        return ' '.join(row[-1] for row in conn.execute('EXPLAIN QUERY PLAN ' + query, params))
+    finally:
+        conn.close()
+
+
+def test_name_lookups_use_the_indexes(db):
+    database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+    database.db_add_instructor('I1', 'Ann', 40, 'ann@mail.com')
+
+    assert database.fetch_student_id_by_name('Alice') == 'S1'
+    assert database.fetch_student_id_by_name('Nobody') is None
+    assert database.fetch_instructor_id_by_name('Ann') == 'I1'
+    assert 'INDEX idx_students_name' in _plan(db, 'SELECT student_id FROM students WHERE name = ?', ('Alice',))
+    assert 'INDEX idx_instructors_name' in _plan(db, 'SELECT instructor_id FROM instructors WHERE name = ?', ('Ann',))
+
+
+def test_register_and_assign_by_name(db):
+    database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+    database.db_add_instructor('I1', 'Ann', 40, 'ann@mail.com')
+    database.db_add_course('C1', 'Math', None)
+
+    database.db_register_student_to_course('Alice', 'C1')
+    database.db_assign_course_to_instructor('Ann', 'C1')
+    assert database.fetch_registered_students('C1') == [('S1', 'Alice', 'alice@mail.com', 20)]
+    assert database.fetch_courses() == [('C1', 'Math', 'I1')]
+
+
+def test_existing_database_is_upgraded(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE students (student_id TEXT PRIMARY KEY, name TEXT NOT NULL, age INTEGER, '
+                 'email TEXT NOT NULL)')
+    conn.close()
+
+    database.create_database()
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == len(database._MIGRATIONS)
+    finally:
+        conn.close()
+    assert 'INDEX' in _plan(db_path, 'SELECT student_id FROM students WHERE name = ?', ('Alice',))
+    assert 'INDEX' in _plan(db_path, 'SELECT instructor_id FROM instructors WHERE name = ?', ('Ann',))
+    assert 'INDEX' in _plan(db_path, 'SELECT student_id FROM registrations WHERE course_id = ?', ('C1',))
+    assert 'INDEX' in _plan(db_path, 'SELECT course_id FROM courses WHERE instructor_id = ?', ('I1',))
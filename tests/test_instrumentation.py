@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+import database
+from instrumentation import profiler, query_shape
+
+
+@pytest.fixture
+def profiled(db):
+    profiler.reset()
+    profiler.enable(slow_ms=1000)
+    yield
+    profiler.disable()
+    profiler.reset()
+
+
+def test_query_shape_normalizes_values():
+    assert query_shape("SELECT *  FROM students\n WHERE name = 'O''Neil' AND age > 20") == \
+        'SELECT * FROM students WHERE name = ? AND age > ?'
+    assert query_shape('SELECT 1 FROM t WHERE (a, b) IN (VALUES (?, ?), (?, ?), (?, ?))') == \
+        query_shape('SELECT 2 FROM t WHERE (a, b) IN (VALUES (?, ?), (?, ?))')
+    assert query_shape('DELETE FROM t WHERE id IN (?, ?, ?)') == 'DELETE FROM t WHERE id IN (?+)'
+
+
+def test_statements_are_recorded_per_shape(profiled):
+    database.db_add_students([(f'S{i}', f'Student {i}', 20, f's{i}@mail.com') for i in range(30)])
+    for i in range(3):
+        database.fetch_student_id_by_name(f'Student {i}')
+    assert len(list(database.iter_students(batch_size=7))) == 30
+
+    stats = profiler.stats()
+    lookup = stats['SELECT student_id FROM students WHERE name = ? LIMIT ?']
+    assert lookup['count'] == 3 and lookup['rows'] == 3
+    assert lookup['p50_ms'] <= lookup['p95_ms'] <= lookup['p99_ms'] <= lookup['max_ms']
+    assert sum(lookup['callers'].values()) == 3
+    assert stats['SELECT student_id, name, age, email FROM students']['rows'] == 30
+    assert profiler.slow_queries() == []
+
+
+def test_slow_statements_are_explained(profiled, tmp_path, capsys):
+    database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+    profiler.enable(slow_ms=0)
+    database.fetch_students()
+    database.fetch_student_id_by_name('Alice')
+    profiler.disable()
+
+    slow = {entry['sql']: entry for entry in profiler.slow_queries()}
+    scan = slow['SELECT * FROM students']
+    assert scan['rows'] == 1 and scan['full_scans'] == scan['plan'] != []
+    lookup = slow['SELECT student_id FROM students WHERE name = ? LIMIT 1']
+    assert lookup['plan'] and lookup['full_scans'] == []
+    assert 'FULL SCAN' in capsys.readouterr().out
+
+    path = str(tmp_path / 'stats.json')
+    profiler.dump(path)
+    with open(path) as f:
+        assert len(json.load(f)['slow_queries']) == len(slow)
+
+
+def test_disabled_profiler_records_nothing(db):
+    profiler.reset()
+    database.fetch_students()
+    assert profiler.stats() == {}
+
+
+def test_callers_are_named_outside_the_data_layer(profiled):
+    database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+    database.fetch_student_id_by_name('Alice')
+    callers = profiler.stats()['SELECT student_id FROM students WHERE name = ? LIMIT ?']['callers']
+    assert [caller.split(':')[:2] for caller in callers] == \
+        [['test_instrumentation.py', 'test_callers_are_named_outside_the_data_layer']]
+
+
+def test_slow_batches_are_explained_with_their_first_row(profiled):
+    database.db_add_students([(f'S{i}', f'Student {i}', 20, f's{i}@mail.com') for i in range(3)])
+    profiler.enable(slow_ms=0)
+    with database.get_connection() as conn:
+        conn.cursor().executemany('UPDATE students SET age = ? WHERE student_id = ?',
+                                  ((21, f'S{i}') for i in range(3)))
+        conn.commit()
+    profiler.disable()
+
+    batch = {entry['sql']: entry for entry in profiler.slow_queries()}['UPDATE students SET age = ? WHERE student_id = ?']
+    assert batch['rows'] == 3 and batch['plan'] and batch['full_scans'] == []
+    assert {row[2] for row in database.fetch_students()} == {21}
@@ -0,0 +1,25 @@
+import database
+
+
+def test_iterators_match_the_fetch_functions(db):
+    database.db_add_instructors([('I1', 'Ann', 40, 'ann@mail.com')])
+    database.db_add_students([(f'S{i}', f'Student {i}', 20, f's{i}@mail.com') for i in range(25)])
+    database.db_add_courses([('C1', 'Math', 'I1')])
+    database.db_register_students_to_courses([(f'S{i}', 'C1') for i in range(0, 25, 5)])
+
+    assert list(database.iter_students(batch_size=4)) == database.fetch_students()
+    assert list(database.iter_instructors(batch_size=4)) == database.fetch_instructors()
+    assert list(database.iter_courses(batch_size=4)) == database.fetch_courses()
+    assert sorted(database.iter_registered_students('C1', batch_size=2)) == \
+        sorted(database.fetch_registered_students('C1'))
+
+
+def test_abandoned_iterator_returns_its_connection(db):
+    database.db_add_students([(f'S{i}', f'Student {i}', 20, f's{i}@mail.com') for i in range(10)])
+    idle = database._pool._idle.qsize()
+
+    rows = database.iter_students(batch_size=3)
+    assert next(rows)[0] == 'S0'
+    assert database._pool._idle.qsize() == idle - 1
+    rows.close()
+    assert database._pool._idle.qsize() == idle
@@ -0,0 +1,35 @@
+import sqlite3
+
+import pytest
+
+import database
+
+
+def _schema(path):
+    conn = sqlite3.connect(path)
+    try:
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+        objects = conn.execute('SELECT type, name, sql FROM sqlite_master ORDER BY type, name').fetchall()
+    finally:
+        conn.close()
+    return version, objects
+
+
+def test_failed_migration_leaves_schema_unchanged(db_path, monkeypatch):
+    migrations = database._MIGRATIONS
+    monkeypatch.setattr(database, '_MIGRATIONS', migrations[:-1])
+    database.create_database()
+    database.db_add_instructor('I1', 'Ann', 40, 'ann@mail.com')
+    before = _schema(db_path)
+
+    # The last migration fails after its first statements have run
+    broken = migrations[-1][:3] + ['SELECT no_such_column FROM students']
+    monkeypatch.setattr(database, '_MIGRATIONS', migrations[:-1] + [broken])
+    with pytest.raises(sqlite3.OperationalError):
+        database.create_database()
+    assert _schema(db_path) == before
+
+    monkeypatch.setattr(database, '_MIGRATIONS', migrations)
+    database.create_database()
+    assert _schema(db_path)[0] == len(migrations)
+    assert database.fetch_instructors() == [('I1', 'Ann', 40, 'ann@mail.com')]
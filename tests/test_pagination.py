@@ -0,0 +1,65 @@
+import sqlite3
+
+import pytest
+
+import database
+
+
+def _all_pages(fetch, limit, **kwargs):
+    rows = []
+    page = fetch(limit=limit, **kwargs)
+    while page:
+        rows += page
+        page = fetch(after=page[-1], limit=limit, **kwargs)
+    return rows
+
+
+def test_pages_by_key_and_counts(db):
+    database.db_add_instructors([(f'I{i}', f'Teacher {i}', 40, f't{i}@mail.com') for i in range(7)])
+
+    assert database.fetch_instructors_page(limit=3) == sorted(database.fetch_instructors())[:3]
+    assert _all_pages(database.fetch_instructors_page, 3) == sorted(database.fetch_instructors())
+    assert (database.count_students(), database.count_instructors(), database.count_courses()) == (0, 7, 0)
+
+
+def test_pages_by_name_break_ties_on_the_key(db):
+    database.db_add_students([('S3', 'Bob', 20, 'b3@mail.com'), ('S1', 'Bob', 21, 'b1@mail.com'),
+                              ('S2', 'Alice', 22, 'a@mail.com'), ('S4', 'Bob', 23, 'b4@mail.com')])
+
+    rows = _all_pages(database.fetch_students_page, 1, order_by='name')
+    assert [row[0] for row in rows] == ['S2', 'S1', 'S3', 'S4']
+
+
+def test_name_pages_are_served_from_an_index(db):
+    conn = sqlite3.connect(db)
+    try:
+        plan = ' '.join(row[-1] for row in conn.execute(
+            'EXPLAIN QUERY PLAN SELECT student_id, name, age, email FROM students '
+            'WHERE (name, student_id) > (?, ?) ORDER BY name, student_id LIMIT ?', ('Bob', 'S1', 10)))
+    finally:
+        conn.close()
+    assert 'USING' in plan and 'TEMP B-TREE' not in plan
+
+
+def test_unknown_order_column_is_refused(db):
+    with pytest.raises(ValueError):
+        database.fetch_courses_page(order_by='course_id; DROP TABLE courses')
+
+
+def test_courses_page_by_nullable_instructor(db):
+    database.db_add_instructor('I1', 'Ann', 40, 'ann@mail.com')
+    database.db_add_instructor('I2', 'Ben', 50, 'ben@mail.com')
+    database.db_add_courses([('C1', 'Math', 'I2'), ('C2', 'Art', None), ('C3', 'Music', 'I1'),
+                             ('C4', 'Physics', None), ('C5', 'History', 'I1')])
+
+    for limit in (1, 2, 3, 10):
+        rows = _all_pages(database.fetch_courses_page, limit, order_by='instructor_id')
+        assert [row[0] for row in rows] == ['C2', 'C4', 'C3', 'C5', 'C1']
+
+
+def test_students_pages_cover_every_row(db):
+    database.db_add_students([(f'S{i:02}', f'Student {i % 3}', 20, f's{i}@mail.com') for i in range(10)])
+
+    rows = _all_pages(database.fetch_students_page, 3, order_by='name')
+    assert len(rows) == 10
+    assert rows == sorted(rows, key=lambda row: (row[1], row[0]))
@@ -0,0 +1,27 @@
+import pytest
+
+import database
+
+
+def _pragmas():
+    with database.get_connection() as conn:
+        return {pragma: conn.execute(f'PRAGMA {pragma}').fetchone()[0]
+                for pragma in ('journal_mode', 'synchronous', 'cache_size', 'busy_timeout')}
+
+
+@pytest.mark.parametrize('profile, synchronous', [('durable', 2), ('balanced', 1), ('bulk-load', 0)])
+def test_connections_apply_the_profile(db, profile, synchronous):
+    try:
+        database.configure_pool(profile=profile)
+        settings = database.PERFORMANCE_PROFILES[profile]
+        assert _pragmas() == {'journal_mode': 'wal', 'synchronous': synchronous,
+                              'cache_size': settings['cache_size'], 'busy_timeout': settings['busy_timeout']}
+    finally:
+        database.configure_pool(profile=database.DEFAULT_PROFILE)
+
+
+def test_unknown_profile_is_refused(db):
+    with pytest.raises(ValueError):
+        database.configure_pool(profile='fastest')
+    database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+    assert database.fetch_students() == [('S1', 'Alice', 20, 'alice@mail.com')]
@@ -0,0 +1,44 @@
+import pytest
+
+import database
+import reporting
+
+
+@pytest.fixture
+def school(db):
+    reporting.clear_cache()
+    database.db_add_instructors([('I1', 'Ann', 40, 'ann@mail.com'), ('I2', 'Ben', 50, 'ben@mail.com')])
+    database.db_add_students([(f'S{i}', f'Student {i}', 20, f's{i}@mail.com') for i in range(5)])
+    database.db_add_courses([('C1', 'Math', 'I1'), ('C2', 'Art', 'I1'), ('C3', 'Music', None)])
+    database.db_register_students_to_courses([('S0', 'C1'), ('S1', 'C1'), ('S2', 'C1'), ('S0', 'C2')])
+    yield
+    reporting.clear_cache()
+
+
+def test_reports(school):
+    assert reporting.enrollment_by_course() == [('C1', 'Math', 3), ('C2', 'Art', 1), ('C3', 'Music', 0)]
+    assert reporting.course_load_by_instructor() == [('I1', 'Ann', 2, 4), ('I2', 'Ben', 0, 0)]
+    assert reporting.students_without_registrations() == [('S3', 'Student 3', 's3@mail.com'),
+                                                          ('S4', 'Student 4', 's4@mail.com')]
+    assert reporting.course_fill_distribution(bucket_size=2) == [(0, 1, 2), (2, 3, 1)]
+
+
+def test_cached_report_follows_table_versions(school):
+    first = reporting.students_without_registrations()
+    assert reporting.students_without_registrations() is first
+
+    database.db_add_instructor('I3', 'Cid', 45, 'cid@mail.com')
+    assert reporting.students_without_registrations() is first
+
+    database.db_register_students_to_courses([('S3', 'C3')])
+    assert reporting.students_without_registrations() == [('S4', 'Student 4', 's4@mail.com')]
+
+
+def test_reports_inside_a_transaction_are_not_cached(school):
+    assert reporting.enrollment_by_course()[2] == ('C3', 'Music', 0)
+    with pytest.raises(ValueError):
+        with database.transaction():
+            database.db_register_students_to_courses([('S4', 'C3')])
+            assert reporting.enrollment_by_course()[2] == ('C3', 'Music', 1)
+            raise ValueError('registration rejected')
+    assert reporting.enrollment_by_course()[2] == ('C3', 'Music', 0)
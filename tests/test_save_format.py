@@ -0,0 +1,47 @@
+import json
+
+from school_management_classes import Course, Instructor, Student, school_data_from_dictionary, \
+    school_data_to_dictionary
+
+
+def _school():
+    alice = Student('Alice', 20, 'alice@mail.com', 'S1', [])
+    bob = Student('Bob', 21, 'bob@mail.com', 'S2', [])
+    ann = Instructor('Ann', 40, 'ann@mail.com', 'I1', [])
+    math = Course('C1', 'Math', ann, [alice, bob])
+    art = Course('C2', 'Art', None, [bob])
+    alice.registered_courses = [math]
+    bob.registered_courses = [math, art]
+    ann.assigned_courses = [math]
+    return [alice, bob], [ann], [math, art]
+
+
+def test_saved_school_refers_by_id_and_loads_back():
+    data = json.loads(json.dumps(school_data_to_dictionary(*_school())))
+    assert data['format_version'] == 2
+    assert data['courses'][0] == {'course_id': 'C1', 'course_name': 'Math', 'instructor_id': 'I1',
+                                  'enrolled_students': ['S1', 'S2']}
+    assert data['students'][1]['registered_courses'] == ['C1', 'C2']
+
+    students, instructors, courses = school_data_from_dictionary(data)
+    assert courses['C1'].instructor is instructors['I1']
+    assert courses['C1'].enrolled_students == [students['S1'], students['S2']]
+    assert students['S2'].registered_courses == [courses['C1'], courses['C2']]
+    assert instructors['I1'].assigned_courses == [courses['C1']]
+    assert courses['C2'].instructor is None
+
+
+def test_old_embedded_format_is_read():
+    alice = {'name': 'Alice', 'age': 20, 'email': 'alice@mail.com', 'student_id': 'S1'}
+    ann = {'name': 'Ann', 'age': 40, 'email': 'ann@mail.com', 'instructor_id': 'I1'}
+    data = {
+        'students': {'Alice': alice},
+        'instructors': {'Ann': ann},
+        'courses': {'C1': {'course_id': 'C1', 'course_name': 'Math', 'instructor': ann, 'enrolled_students': [alice]}},
+    }
+
+    students, instructors, courses = school_data_from_dictionary(data)
+    assert list(students) == ['S1'] and list(instructors) == ['I1']
+    assert courses['C1'].instructor is instructors['I1']
+    assert students['S1'].registered_courses == [courses['C1']]
+    assert instructors['I1'].assigned_courses == [courses['C1']]
@@ -0,0 +1,53 @@
+import database
+
+
+def _add_people(db):
+    database.db_add_instructor('I1', 'Prof. Ali', 50, 'ali@gmail.com')
+    database.db_add_student('S1', 'Alice Smith', 20, 'alice@mail.com')
+    database.db_add_student('S2', 'Bob Stone', 21, 'bob@mail.com')
+    database.db_add_course('C1', 'Algebra', 'I1')
+
+
+def test_every_word_must_match_a_prefix(db):
+    _add_people(db)
+
+    assert database.search('ali gm') == [('instructor', 'I1', 'Prof. Ali', 'ali@gmail.com')]
+    assert {row[1] for row in database.search('al')} == {'I1', 'S1', 'C1'}
+    assert database.search('al', kinds=('course',)) == [('course', 'C1', 'Algebra', None)]
+    assert database.search('"') == []
+    assert database.search('   ') == []
+
+
+def test_index_follows_updates_and_deletes(db):
+    _add_people(db)
+    database.db_update_student('S2', 'Robert Stone', 21, 'robert@mail.com')
+    database.delete_course('C1')
+
+    assert database.search('rob') == [('student', 'S2', 'Robert Stone', 'robert@mail.com')]
+    assert database.search('bob') == []
+    assert database.search('algebra') == []
+
+
+def test_rebuild_restores_the_index(db):
+    _add_people(db)
+    with database.get_connection() as conn:
+        conn.execute('DELETE FROM search_index')
+        conn.commit()
+    assert database.search('alice') == []
+
+    database.rebuild_search_index()
+    assert database.search('alice') == [('student', 'S1', 'Alice Smith', 'alice@mail.com')]
+
+
+def test_opening_the_database_rebuilds_a_stale_index(db):
+    _add_people(db)
+    with database.get_connection() as conn:
+        # As if VACUUM had renumbered the row: the entry count still matches, the rowid does not
+        conn.execute("UPDATE search_index SET rowid = rowid + 400 WHERE key = 'S1'")
+        conn.commit()
+    database.delete_student('S1')
+    assert database.search('alice') == [('student', 'S1', 'Alice Smith', 'alice@mail.com')]
+
+    database.create_database()
+    assert database.search('alice') == []
+    assert {row[1] for row in database.search('al')} == {'I1', 'C1'}
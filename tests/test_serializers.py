@@ -0,0 +1,49 @@
+import pytest
+
+import serializers
+from school_management_classes import load_from_json, save_to_json
+
+DATA = {'format_version': 2, 'students': [{'student_id': 'S1', 'name': 'Zoë', 'age': 20, 'email': 'z@mail.com',
+                                           'registered_courses': ['C1']}],
+        'courses': [{'course_id': 'C1', 'course_name': 'Math', 'instructor_id': None, 'enrolled_students': ['S1']}]}
+
+
+@pytest.mark.parametrize('name', sorted(serializers.SERIALIZERS))
+def test_every_backend_round_trips(tmp_path, name):
+    serializer = serializers.SERIALIZERS[name]
+    assert serializer.loads(serializer.dumps(DATA)) == DATA
+
+    path = str(tmp_path / ('school' + serializer.extensions[0]))
+    serializers.save(DATA, path)
+    assert serializers.get_serializer(path=path) is serializer
+    assert serializers.load(path) == DATA
+
+
+def test_backend_choice(tmp_path):
+    assert serializers.get_serializer(path='school.txt').name == 'json'
+    assert serializers.get_serializer(path='SCHOOL.BIN').name == 'marshal'
+    assert serializers.get_serializer('json-compact', path='school.json').name == 'json-compact'
+    with pytest.raises(ValueError):
+        serializers.get_serializer('yaml')
+
+    path = str(tmp_path / 'school.json')
+    save_to_json(DATA, path)
+    with open(path) as f:
+        assert f.read().startswith('{\n    "format_version": 2')
+    assert load_from_json(path) == DATA
+
+    save_to_json(DATA, path, format='marshal')
+    assert load_from_json(path, format='marshal') == DATA
+
+
+def test_backends_must_implement_dumps_and_loads():
+    class Partial(serializers.Serializer):
+        name = 'partial'
+
+        def dumps(self, data):
+            return b''
+
+    with pytest.raises(TypeError):
+        serializers.Serializer()
+    with pytest.raises(TypeError):
+        Partial()
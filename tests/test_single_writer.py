@@ -0,0 +1,85 @@
+import sqlite3
+import threading
+
+import pytest
+
+import database
+
+
+def test_concurrent_writers_all_commit(db):
+    database.enable_single_writer(batch_size=10)
+    errors = []
+
+    def add(start):
+        try:
+            for i in range(start, start + 50):
+                database.db_add_student(f'S{i}', f'Student {i}', 20, f's{i}@mail.com')
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=add, args=(start,)) for start in range(0, 400, 50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert database.count_students() == 400
+
+
+def test_failed_write_does_not_undo_its_batch(db):
+    database.enable_single_writer()
+    futures = [database.submit_write(database.db_add_student, 'S1', 'Alice', 20, 'alice@mail.com'),
+               database.submit_write(database.db_add_student, 'S1', 'Alice', 20, 'alice@mail.com'),
+               database.submit_write(database.db_add_student, 'S2', 'Bob', 21, 'bob@mail.com')]
+
+    assert futures[0].result() is None
+    with pytest.raises(sqlite3.IntegrityError):
+        futures[1].result()
+    assert futures[2].result() is None
+    assert [row[0] for row in database.fetch_students()] == ['S1', 'S2']
+
+
+def test_disabling_finishes_queued_writes(db):
+    database.enable_single_writer()
+    futures = [database.submit_write(database.db_add_student, f'S{i}', f'Student {i}', 20, f's{i}@mail.com')
+               for i in range(20)]
+    database.disable_single_writer()
+    assert all(future.done() for future in futures)
+    assert database.count_students() == 20
+
+
+def test_submit_write_runs_group_on_writer_thread(db):
+    database.enable_single_writer()
+    threads = []
+
+    def add():
+        threads.append(threading.current_thread().name)
+        database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+        database.db_add_course('C1', 'Math', None)
+        database.db_register_students_to_courses([('S1', 'C1')])
+
+    database.submit_write(add).result()
+    assert threads == ['database-writer']
+    assert database.fetch_registered_students('C1') == [('S1', 'Alice', 'alice@mail.com', 20)]
+
+
+@pytest.mark.parametrize('single_writer', [False, True])
+def test_submit_write_rolls_back_the_whole_group(db, single_writer):
+    if single_writer:
+        database.enable_single_writer()
+
+    def add():
+        database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+        database.db_register_students_to_courses([('S1', 'NO SUCH COURSE')])
+
+    with pytest.raises(Exception):
+        database.submit_write(add).result()
+    assert database.fetch_students() == []
+
+
+def test_write_inside_transaction_on_other_thread_raises(db):
+    database.enable_single_writer()
+    with pytest.raises(RuntimeError):
+        with database.transaction():
+            database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+    assert database.fetch_students() == []
@@ -0,0 +1,198 @@
+import os
+
+import pytest
+
+import database
+import snapshot
+
+
+def _add_school():
+    database.db_add_instructors([('I1', 'Ann', 40, 'ann@mail.com')])
+    database.db_add_students([(f'S{i}', f'Student {i}', 20, f's{i}@mail.com') for i in range(30)])
+    database.db_add_courses([('C1', 'Math', 'I1'), ('C2', 'Art', None)])
+    database.db_register_students_to_courses([(f'S{i}', 'C1') for i in range(10)])
+
+
+def _contents():
+    return (database.fetch_instructors(), sorted(database.fetch_students()), database.fetch_courses(),
+            sorted(database.iter_registrations()))
+
+
+@pytest.mark.parametrize('pretty', [False, True])
+def test_snapshot_round_trip(db, tmp_path, pretty):
+    path = str(tmp_path / 'school.jsonl')
+    _add_school()
+    expected = _contents()
+    assert snapshot.write_snapshot(path, pretty=pretty, batch_size=7) == \
+        {'instructors': 1, 'students': 30, 'courses': 2, 'registrations': 10}
+    types = [record['type'] for record in snapshot.iter_snapshot(path)]
+    assert types == ['instructor'] + ['student'] * 30 + ['course'] * 2 + ['registration'] * 10
+
+    database.configure_pool(db_path=str(tmp_path / 'copy.db'))
+    database.create_database()
+    counts = snapshot.read_snapshot(path, chunk_size=4)
+    assert counts['students']['inserted'] == 30
+    assert _contents() == expected
+
+    # Reading the same file again changes nothing
+    counts = snapshot.read_snapshot(path)
+    assert (counts['registrations']['inserted'], counts['registrations']['unchanged']) == (0, 10)
+    assert _contents() == expected
+
+
+def test_reader_refuses_other_files(db, tmp_path):
+    path = tmp_path / 'other.jsonl'
+    path.write_text('{"type": "student", "student_id": "S1"}\n')
+    with pytest.raises(ValueError):
+        snapshot.read_snapshot(str(path))
+
+    path.write_text('{"type": "header", "format": "school-snapshot", "version": 99}\n')
+    with pytest.raises(ValueError):
+        list(snapshot.iter_snapshot(str(path)))
+
+    path.write_text('{"type": "header", "format": "school-snapshot", "version": 1}\n{\n    "type": "student",\n')
+    with pytest.raises(ValueError):
+        list(snapshot.iter_snapshot(str(path)))
+
+
+def _load_copy(path, tmp_path):
+    # Load the snapshot and its delta into an empty database of their own
+    database.configure_pool(db_path=str(tmp_path / 'copy.db'))
+    database.create_database()
+    snapshot.read_snapshot(path)
+    return _contents()
+
+
+def _change_school():
+    database.db_add_student('S100', 'New Student', 19, 'new@mail.com')
+    database.db_update_student('S1', 'Renamed Student', 20, 's1@mail.com')
+    database.delete_students(['S2', 'S20'])
+    database.db_register_students_to_courses([('S100', 'C2')])
+    database.delete_registrations([('S3', 'C1')])
+
+
+def test_delta_holds_only_the_changes(db, tmp_path):
+    path = str(tmp_path / 'school.jsonl')
+    _add_school()
+    snapshot.write_snapshot(path)
+    assert snapshot.write_delta(path) == 0
+
+    _change_school()
+    # Two changed students, one new registration, two deleted registrations and two deleted students
+    assert snapshot.write_delta(path) == 7
+    assert snapshot.write_delta(path) == 0
+    expected = _contents()
+    assert _load_copy(path, tmp_path) == expected
+
+
+def test_interrupted_delta_block_is_ignored(db, tmp_path):
+    path = str(tmp_path / 'school.jsonl')
+    _add_school()
+    snapshot.write_snapshot(path)
+    database.db_add_student('S100', 'New Student', 19, 'new@mail.com')
+    snapshot.write_delta(path)
+    with open(path + snapshot.DELTA_SUFFIX, 'a') as f:
+        f.write('{"type": "student", "student_id": "S999", "name": "Half Written", "age": 1')
+
+    database.db_add_student('S101', 'Newer Student', 19, 'newer@mail.com')
+    assert snapshot.write_delta(path) == 1
+    expected = _contents()
+    assert _load_copy(path, tmp_path) == expected
+
+
+def test_compaction_folds_the_delta_into_the_snapshot(db, tmp_path):
+    path = str(tmp_path / 'school.jsonl')
+    _add_school()
+    assert snapshot.save_snapshot(path, pretty=True) == 'full'
+    _change_school()
+    assert snapshot.save_snapshot(path) == 'delta'
+
+    snapshot.compact_snapshot(path)
+    assert not os.path.exists(path + snapshot.DELTA_SUFFIX)
+    assert snapshot.read_header(path)['pretty'] is True
+    expected = _contents()
+    assert _load_copy(path, tmp_path) == expected
+
+
+def _add_students(start, count):
+    database.db_add_students([(f'S{i}', f'Student {i}', 20, f's{i}@mail.com') for i in range(start, start + count)])
+
+
+def test_compaction_keeps_change_log_by_default(db, tmp_path):
+    path = str(tmp_path / 'school.jsonl')
+    other = str(tmp_path / 'other.jsonl')
+    _add_students(0, 5)
+    snapshot.write_snapshot(path)
+    snapshot.write_snapshot(other)
+    _add_students(5, 5)
+    assert snapshot.write_delta(path) == 5
+
+    snapshot.compact_snapshot(path)
+    assert len(database.changes_since(0)) == 10
+    # Another snapshot of the same database can still be saved incrementally
+    assert snapshot.write_delta(other) == 5
+    assert len(_student_ids(other, tmp_path)) == 10
+
+
+def test_compaction_prunes_change_log(db, tmp_path):
+    path = str(tmp_path / 'school.jsonl')
+    _add_students(0, 5)
+    snapshot.write_snapshot(path)
+    _add_students(5, 5)
+    assert snapshot.write_delta(path) == 5
+
+    snapshot.compact_snapshot(path, prune=True)
+    assert database.changes_since(0) == []
+    assert snapshot.read_header(path)['seq'] == database.latest_change_seq()
+
+    # Saving goes on incrementally after the pruned entries
+    _add_students(10, 1)
+    assert snapshot.write_delta(path) == 1
+    snapshot.compact_snapshot(path, prune=True)
+    ids = {record['student_id'] for record in snapshot.iter_snapshot(path) if record['type'] == 'student'}
+    assert len(ids) == 11
+
+
+def _student_ids(path, tmp_path):
+    return {row[0] for row in _load_copy(path, tmp_path)[1]}
+
+
+def test_snapshot_of_another_database_is_rewritten(db, tmp_path):
+    path = str(tmp_path / 'school.jsonl')
+    _add_students(0, 20)
+    snapshot.write_snapshot(path)
+
+    # A fresh database with a shorter change log takes over the same snapshot file
+    database.configure_pool(db_path=str(tmp_path / 'other.db'))
+    database.create_database()
+    _add_students(100, 2)
+    assert snapshot.save_snapshot(path) == 'full'
+    assert snapshot.read_header(path)['database'] == database.database_id()
+    assert _student_ids(path, tmp_path) == {'S100', 'S101'}
+
+
+def test_snapshot_ahead_of_restored_backup_is_rewritten(db, tmp_path):
+    path = str(tmp_path / 'school.jsonl')
+    backup_path = str(tmp_path / 'backup.db')
+    _add_students(0, 2)
+    database.db_backup(backup_path)
+    _add_students(2, 20)
+    snapshot.write_snapshot(path)
+
+    # Same ID, as if the backup had been copied back without a new one, but an older change log
+    identity = database.database_id()
+    database.configure_pool(db_path=backup_path)
+    with database.get_connection() as conn:
+        conn.execute("UPDATE database_info SET value = ? WHERE name = 'id'", (identity,))
+        conn.commit()
+    _add_students(50, 1)
+    assert snapshot.save_snapshot(path) == 'full'
+    assert _student_ids(path, tmp_path) == {'S0', 'S1', 'S50'}
+
+
+def test_backup_gets_a_new_database_id(db, tmp_path):
+    backup_path = str(tmp_path / 'backup.db')
+    identity = database.database_id()
+    database.db_backup(backup_path)
+    database.configure_pool(db_path=backup_path)
+    assert database.database_id() != identity
@@ -0,0 +1,35 @@
+import pytest
+
+import database
+
+
+def test_transaction_commits_everything_at_the_end(db):
+    with database.transaction():
+        database.db_add_instructor('I1', 'Ann', 40, 'ann@mail.com')
+        database.db_add_course('C1', 'Math', 'I1')
+        database.db_add_students([('S1', 'Alice', 20, 'alice@mail.com')])
+        database.db_register_students_to_courses([('S1', 'C1')])
+    assert database.fetch_registered_students('C1') == [('S1', 'Alice', 'alice@mail.com', 20)]
+
+
+def test_error_rolls_the_whole_block_back(db):
+    with pytest.raises(ValueError):
+        with database.transaction():
+            database.db_add_instructor('I1', 'Ann', 40, 'ann@mail.com')
+            database.db_add_students([('S1', 'Alice', 20, 'alice@mail.com')])
+            raise ValueError('form rejected')
+    assert database.fetch_instructors() == []
+    assert database.fetch_students() == []
+
+
+def test_nested_block_is_a_savepoint(db):
+    with database.transaction():
+        database.db_add_student('S1', 'Alice', 20, 'alice@mail.com')
+        try:
+            with database.transaction():
+                database.db_add_student('S2', 'Bob', 21, 'bob@mail.com')
+                raise ValueError('inner block rejected')
+        except ValueError:
+            pass
+        database.db_add_student('S3', 'Carl', 22, 'carl@mail.com')
+    assert [row[0] for row in database.fetch_students()] == ['S1', 'S3']
@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+import database
+from events import DataEvent, event_bus
+
+
+@pytest.fixture
+def students(db):
+    database.db_add_students([('S1', 'Alice', 20, 'alice@mail.com'), ('S2', 'Bob', 21, 'bob@mail.com')])
+
+
+def test_update_policy_merges_and_counts(students):
+    events = []
+    token = event_bus.subscribe(events.extend)
+    seq = database.latest_change_seq()
+    try:
+        counts = database.upsert_students([('S1', 'Alice', 20, 'alice@mail.com'), ('S2', 'Bobby', 21, 'bob@mail.com'),
+                                           ('S3', 'Carl', 22, 'carl@mail.com')], chunk_size=2)
+    finally:
+        event_bus.unsubscribe(token)
+    assert counts == {'inserted': 1, 'updated': 1, 'unchanged': 1}
+    assert database.fetch_students() == [('S1', 'Alice', 20, 'alice@mail.com'), ('S2', 'Bobby', 21, 'bob@mail.com'),
+                                         ('S3', 'Carl', 22, 'carl@mail.com')]
+    assert events == [DataEvent('students', 'added', ('S3',)), DataEvent('students', 'updated', ('S2',))]
+    # The unchanged row is not rewritten, so it leaves no trace in the change log
+    assert [change[1:] for change in database.changes_since(seq)] == [('students', 'update', 'S2'),
+                                                                      ('students', 'insert', 'S3')]
+
+
+def test_keep_policy_leaves_existing_rows(students):
+    counts = database.upsert_students([('S2', 'Bobby', 21, 'bob@mail.com'), ('S3', 'Carl', 22, 'carl@mail.com')],
+                                      policy='keep')
+    assert counts == {'inserted': 1, 'updated': 0, 'unchanged': 1}
+    assert database.fetch_students()[1] == ('S2', 'Bob', 21, 'bob@mail.com')
+
+
+def test_error_policy_rejects_the_whole_batch(students):
+    with pytest.raises(sqlite3.IntegrityError):
+        database.upsert_students([('S3', 'Carl', 22, 'carl@mail.com'), ('S1', 'Alice', 20, 'alice@mail.com')],
+                                 policy='error')
+    assert database.count_students() == 2
+    with pytest.raises(ValueError):
+        database.upsert_students([], policy='replace')
+
+
+def test_upsert_courses_and_registrations(students):
+    database.upsert_instructors([('I1', 'Ann', 40, 'ann@mail.com')])
+    assert database.upsert_courses([('C1', 'Math', 'I1'), ('C2', 'Art', '')]) == \
+        {'inserted': 2, 'updated': 0, 'unchanged': 0}
+    assert database.upsert_courses([('C2', 'Art', 'I1')]) == {'inserted': 0, 'updated': 1, 'unchanged': 0}
+    assert database.upsert_registrations([('S1', 'C1'), ('S2', 'C1')]) == \
+        {'inserted': 2, 'updated': 0, 'unchanged': 0}
+    assert database.upsert_registrations([('S1', 'C1')]) == {'inserted': 0, 'updated': 0, 'unchanged': 1}
+    assert database.fetch_courses() == [('C1', 'Math', 'I1'), ('C2', 'Art', 'I1')]
+
+
+def test_keys_repeated_in_a_chunk_take_the_last_record(students):
+    events = []
+    token = event_bus.subscribe(events.extend)
+    try:
+        counts = database.upsert_students([('S3', 'Carl', 22, 'carl@mail.com'), ('S2', 'Bobby', 21, 'bob@mail.com'),
+                                           ('S3', 'Carla', 23, 'carla@mail.com'), ('S2', 'Rob', 21, 'bob@mail.com')])
+    finally:
+        event_bus.unsubscribe(token)
+    assert counts == {'inserted': 1, 'updated': 1, 'unchanged': 0}
+    assert database.fetch_students()[1:] == [('S2', 'Rob', 21, 'bob@mail.com'), ('S3', 'Carla', 23, 'carla@mail.com')]
+    assert events == [DataEvent('students', 'added', ('S3',)), DataEvent('students', 'updated', ('S2',))]
+
+    with pytest.raises(sqlite3.IntegrityError):
+        database.upsert_students([('S4', 'Dana', 24, 'dana@mail.com'), ('S4', 'Dana', 24, 'dana@mail.com')],
+                                 policy='error')
@@ -1,14 +1,17 @@
 import tkinter as tk
 from tkinter import ttk,filedialog
 import json
-from school_management_classes import Person, Student, Instructor, Course , load_from_json, save_to_json
+from school_management_classes import Person, Student, Instructor, Course , load_from_json, save_to_json, school_data_to_dictionary, school_data_from_dictionary, rows_to_students, rows_to_instructors, rows_to_courses, link_registrations
 from tkinter import simpledialog
 from tkinter import messagebox
 from data_validation import validate_age,validate_course_id,validate_course_name,validate_email,validate_instructor_id,validate_name,validate_student_id
-import csv
 import sqlite3
-import shutil
-from database import db_add_student, db_add_instructor, db_add_course, db_update_student, db_update_instructor, db_update_course, delete_student, delete_instructor, delete_course, db_assign_course_to_instructor, db_register_student_to_course
+import queue
+import threading
+from serializers import SERIALIZERS
+from autosave import AutoSaver
+from snapshot import save_snapshot
+from database import db_add_student, db_add_instructor, db_add_course, db_update_student, db_update_instructor, db_update_course, delete_student, delete_instructor, delete_course, db_assign_course_to_instructor, db_register_student_to_course, db_register_students_to_courses, upsert_students, upsert_instructors, upsert_courses, upsert_registrations, submit_write, db_backup_in_background, db_export_csv_in_background, iter_students, iter_instructors, iter_courses, iter_registrations
 
 #sample data for demonstration 
 instructor_dict = {"Prof.Iman":Instructor("Prof.Iman", "25", "iman@hotmail.com", "1001", []),
@@ -19,6 +22,52 @@ instructor_dict = {"Prof.Iman":Instructor("Prof.Iman", "25", "iman@hotmail.com",
 course_dict= {"EECE 435L": Course("EECE 435L", "Software Engineering Lab",None,[])}
 student_dict={"Yasmeen":Student("Yasmeen",21,"ytl00@mail.aub.edu",202202478,[])}
 
+
+def seed_sample_data():
+    """
+    Stores the sample records in the database, so that they can be registered and assigned in the forms
+    like any other record. Records that already exist in the database are left as they are.
+
+    :return: None
+    """
+    def seed():
+        upsert_instructors(((i.instructor_id, i.name, int(i.age), i.get_email()) for i in instructor_dict.values()),
+                           policy='keep')
+        upsert_students(((str(s.student_id), s.name, int(s.age), s.get_email()) for s in student_dict.values()),
+                        policy='keep')
+        upsert_courses(((c.course_id, c.course_name, c.instructor.instructor_id if c.instructor else None)
+                        for c in course_dict.values()), policy='keep')
+
+    submit_write(seed).result()
+
+def load_database_records():
+    """
+    Replaces the contents of `student_dict`, `instructor_dict` and `course_dict` with the records stored in the
+    database, so the forms and tables show what earlier sessions saved. The rows become objects through
+    `rows_to_students()`, `rows_to_instructors()` and `rows_to_courses()`, which skip validation since the
+    database has already checked them, and the registrations are linked by `link_registrations()`.
+
+    :return: None
+    """
+    instructors = rows_to_instructors(iter_instructors())
+    students = rows_to_students(iter_students())
+    courses = rows_to_courses(iter_courses(), instructors)
+    link_registrations(iter_registrations(), students, courses)
+
+    # Students and instructors are keyed by name, courses by ID
+    student_dict.clear()
+    instructor_dict.clear()
+    course_dict.clear()
+    student_dict.update((student.name, student) for student in students.values())
+    instructor_dict.update((instructor.name, instructor) for instructor in instructors.values())
+    course_dict.update(courses)
+
+# File types offered when saving and loading data; the extension selects the file format
+SAVE_FILE_TYPES = [(s.description, ' '.join('*' + ext for ext in s.extensions)) for s in SERIALIZERS.values()]
+
+# Database changes are autosaved to this snapshot in the background (see the `autosave` module)
+SNAPSHOT_FILE = "school_data.jsonl"
+
 # Main application window
 root = tk.Tk()
 root.title("School Management System")
@@ -61,13 +110,19 @@ def add_student():
         messagebox.showerror("Error", str(e))
         return
 
-    student_dict[name]= student
     try:
-        db_add_student(student_id, name, age, email)
-        messagebox.showinfo("Success", "Student added successfully!")
+        # Add the student and their course registrations in a single commit
+        def add():
+            db_add_student(student_id, name, age, email)
+            db_register_students_to_courses((student_id, course.course_id) for course in selected_courses)
+
+        submit_write(add).result()
     except Exception as e:
         messagebox.showerror("Error", str(e))
         return
+    # Only keep the student once the database has it too
+    student_dict[name]= student
+    messagebox.showinfo("Success", "Student added successfully!")
     # Clear all fields
     name_entry.delete(0, tk.END)
     age_entry.delete(0, tk.END)
@@ -107,13 +162,20 @@ def add_instructor():
     except Exception as e:
         messagebox.showerror("Error", str(e))
         return
-    instructor_dict[name]=instructor
     try:
-        db_add_instructor(instructor_id, name, age, email)
-        messagebox.showinfo("Success", "Instructor added successfully!")
+        # Add the instructor and assign their courses in a single commit
+        def add():
+            db_add_instructor(instructor_id, name, age, email)
+            for course in assigned_courses:
+                db_update_course(course.course_id, course.course_name, instructor_id)
+
+        submit_write(add).result()
     except Exception as e:
         messagebox.showerror("Error", str(e))
         return
+    # Only keep the instructor once the database has it too
+    instructor_dict[name]=instructor
+    messagebox.showinfo("Success", "Instructor added successfully!")
     instructor_name_entry.delete(0, tk.END)
     instructor_age_entry.delete(0, tk.END)
     instructor_email_entry.delete(0, tk.END)
@@ -153,13 +215,19 @@ def add_course():
         messagebox.showerror("Error", str(e))
         return
 
-    course_dict[course_id]=course
     try:
-        db_add_course(course_id, course_name, selected_instructor)
-        messagebox.showinfo("Success", "Course added successfully!")
+        # Add the course and register its enrolled students in a single commit
+        def add():
+            db_add_course(course_id, course_name, selected_instructor.instructor_id if selected_instructor else None)
+            db_register_students_to_courses((student.student_id, course_id) for student in enrolled_students)
+
+        submit_write(add).result()
     except Exception as e:
         messagebox.showerror("Error", str(e))
         return
+    # Only keep the course once the database has it too
+    course_dict[course_id]=course
+    messagebox.showinfo("Success", "Course added successfully!")
     course_id_entry.delete(0, tk.END)
     course_name_entry.delete(0, tk.END)
     instructor_combobox.set('')
@@ -1050,36 +1118,22 @@ def save_data():
     """
     Saves the current data (students, instructors, and courses) to a JSON file.
 
-    This function converts the data from the internal dictionaries (`student_dict`, `instructor_dict`, `course_dict`) 
-    into a serializable format by calling each object's `change_to_dictionary()` method. It then prompts the user 
-    to select a file location and saves the data as a JSON file. If the process is successful, a success message 
-    is shown; otherwise, an error message is displayed.
+    The data from the internal dictionaries (`student_dict`, `instructor_dict`, `course_dict`) is written in
+    the normalized format of `school_data_to_dictionary()`: every student, instructor and course is stored
+    once, and registrations, course assignments and enrollments are stored as lists of IDs. The user is
+    prompted to select a file location. If the process is successful, a success message is shown;
+    otherwise, an error message is displayed.
 
     :raises Exception: If the process of saving the data to a JSON file fails.
 
     :return: None
     """
-    file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")])
+    file_path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=SAVE_FILE_TYPES)
     if not file_path:
         return
 
     try:
-        # Convert data into serializable form using change_to_dictionary
-        data = {
-            "students": {name: student.change_to_dictionary() for name, student in student_dict.items()},
-            "instructors": {name: instructor.change_to_dictionary() for name, instructor in instructor_dict.items()},
-            "courses": {
-                course_id: {
-                    'course_id': course.course_id,
-                    'course_name': course.course_name,
-                    'instructor': course.instructor.change_to_dictionary() if course.instructor else None,  # Check if instructor exists
-                    'enrolled_students': [student.change_to_dictionary() for student in course.enrolled_students] if course.enrolled_students else []
-                }
-                for course_id, course in course_dict.items()
-            }
-        }
-
-        # Save to JSON file
+        data = school_data_to_dictionary(student_dict.values(), instructor_dict.values(), course_dict.values())
         save_to_json(data, file_path)
         messagebox.showinfo("Success", "Data saved successfully!")
     except Exception as e:
@@ -1090,59 +1144,42 @@ def load_data():
     """
     Loads data (students, instructors, and courses) from a JSON file into the application.
 
-    This function prompts the user to select a JSON file containing saved data. It clears 
-    the current data in `student_dict`, `instructor_dict`, and `course_dict`, and reconstructs 
-    `Student`, `Instructor`, and `Course` objects from the loaded data. The data is then 
-    displayed in the Treeview widgets, and a success message is shown upon successful loading.
+    This function prompts the user to select a JSON file containing saved data, in either the normalized
+    format or the older format that embeds full records in each course. The `Student`, `Instructor`, and
+    `Course` objects are rebuilt by `school_data_from_dictionary()`, which resolves the saved IDs through
+    ID-keyed indexes, and replace the contents of `student_dict`, `instructor_dict`, and `course_dict`.
+    The loaded records are merged into the database in bulk, and the data is then displayed in the
+    Treeview widgets. A success message is shown upon successful loading.
 
     :raises Exception: If loading the JSON file or reconstructing the data fails, an error message is displayed.
 
     :return: None
     """
-    file_path = filedialog.askopenfilename(defaultextension=".json", filetypes=[("JSON Files", "*.json")])
+    file_path = filedialog.askopenfilename(defaultextension=".json", filetypes=SAVE_FILE_TYPES)
     if not file_path:
         return
 
     try:
-        # Load JSON data
-        data = load_from_json(file_path)
+        students, instructors, courses = school_data_from_dictionary(load_from_json(file_path))
 
-        # Clear current data
+        # Merge the loaded records into the database in bulk, in a single commit; records that already
+        # exist take the file's values
+        def merge():
+            upsert_students((s.student_id, s.name, s.age, s.get_email()) for s in students.values())
+            upsert_instructors((i.instructor_id, i.name, i.age, i.get_email()) for i in instructors.values())
+            upsert_courses((c.course_id, c.course_name, c.instructor.instructor_id if c.instructor else None)
+                           for c in courses.values())
+            upsert_registrations((s.student_id, c.course_id) for c in courses.values() for s in c.enrolled_students)
+
+        submit_write(merge).result()
+
+        # Replace the current data once the database has it; students and instructors are keyed by name, courses by ID
         student_dict.clear()
         instructor_dict.clear()
         course_dict.clear()
-
-        # Reconstruct objects from loaded data
-        for name, student_data in data.get("students", {}).items():
-            student = Student(
-                student_data['name'], 
-                student_data['age'], 
-                student_data['email'], 
-                student_data['student_id'], 
-                []  # We'll populate courses later
-            )
-            student_dict[name] = student
-
-        for name, instructor_data in data.get("instructors", {}).items():
-            instructor = Instructor(
-                instructor_data['name'], 
-                instructor_data['age'], 
-                instructor_data['email'], 
-                instructor_data['instructor_id'], 
-                []  # We'll populate assigned courses later
-            )
-            instructor_dict[name] = instructor
-
-        for course_id, course_data in data.get("courses", {}).items():
-            instructor = instructor_dict.get(course_data['instructor']['instructor_id']) if course_data['instructor'] else None
-            enrolled_students = [student_dict[s['student_id']] for s in course_data['enrolled_students'] if s['student_id'] in student_dict]
-            course = Course(
-                course_data['course_id'], 
-                course_data['course_name'], 
-                instructor, 
-                enrolled_students
-            )
-            course_dict[course_id] = course
+        student_dict.update((student.name, student) for student in students.values())
+        instructor_dict.update((instructor.name, instructor) for instructor in instructors.values())
+        course_dict.update(courses)
 
         refresh_treeviews()
         messagebox.showinfo("Success", "Data loaded successfully!")
@@ -1151,12 +1188,13 @@ def load_data():
 
 def export_to_csv():
     """
-    Exports the current data (students, instructors, and courses) to a CSV file.
+    Exports the students, instructors, courses and course rosters in the database to a CSV file.
 
-    This function prompts the user to select a location to save the CSV file. It exports the 
-    details of students, instructors, and courses from `student_dict`, `instructor_dict`, and 
-    `course_dict` into the CSV file with appropriate headers. Each student's registered courses, 
-    instructor's assigned courses, and the course's enrolled students are included.
+    This function prompts the user to select a location to save the CSV file. The rows are streamed
+    from the database on a background thread (see `database.db_export_csv`), so the window stays
+    responsive however large the data is. A progress window shows how far the export has got and
+    lets the user cancel it. Each course's enrolled students are listed in the 'Course Rosters'
+    section, one row per registration.
 
     A success message is displayed when the export completes successfully. If an error occurs 
     during the export, an error message is displayed.
@@ -1170,59 +1208,125 @@ def export_to_csv():
 
     if not file_path:
         return  # If the user cancels the save dialog, do nothing
-    
-    try:
-        # Open the file for writing
-        with open(file_path, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-
-            # Write header row for students
-            writer.writerow(['Student Name', 'Age', 'Email', 'Student ID', 'Registered Courses'])
-            for student in student_dict.values():
-                courses = ', '.join([course.course_id for course in student.registered_courses])
-                writer.writerow([student.name, student.age, student.get_email(), student.student_id, courses])
-
-            # Write header row for instructors
-            writer.writerow(['Instructor Name', 'Age', 'Email', 'Instructor ID', 'Assigned Courses'])
-            for instructor in instructor_dict.values():
-                assigned_courses = ', '.join([course.course_id for course in instructor.assigned_courses])
-                writer.writerow([instructor.name, instructor.age, instructor.get_email(), instructor.instructor_id, assigned_courses])
-
-            # Write header row for courses
-            writer.writerow(['Course ID', 'Course Name', 'Instructor', 'Enrolled Students'])
-            for course in course_dict.values():
-                instructor_name = course.instructor.name if course.instructor else "No instructor"
-                enrolled_students = ', '.join([student.name for student in course.enrolled_students])
-                writer.writerow([course.course_id, course.course_name, instructor_name, enrolled_students])
-
-        messagebox.showinfo("Success", "Records successfully exported to CSV")
-    
-    except Exception as e:
-        messagebox.showerror("Error", f"Failed to export records to CSV: {e}")
+
+    cancelled = threading.Event()
+
+    def start(report_progress, report_done):
+        def on_progress(done, total):
+            report_progress(100 * done / total if total else 100)
+
+        db_export_csv_in_background(file_path, progress=on_progress, cancelled=cancelled.is_set, on_done=report_done)
+
+    def on_done(error):
+        if error is not None:
+            messagebox.showerror("Error", f"Failed to export records to CSV: {error}")
+        elif not cancelled.is_set():
+            messagebox.showinfo("Success", "Records successfully exported to CSV")
+
+    run_with_progress_window("Exporting to CSV", "Exporting records...", start, on_done, cancel=cancelled.set)
 
 def backup_database():
     """
     Creates a backup of the SQLite database and saves it to a user-specified location.
 
     This function prompts the user to choose a location and filename for saving the database backup.
-    It then copies the existing SQLite database file (`school_management.db`) to the specified location. 
-    A success message is shown upon successful backup creation. If an error occurs during the process, 
-    an error message is displayed.
+    The backup is taken with the SQLite online backup API on a background thread, so the window stays
+    responsive and other writes can continue. A small window shows a progress bar while the pages are
+    copied. A success message is shown upon successful backup creation. If an error occurs during the
+    process, an error message is displayed.
 
-    :raises Exception: If the process of copying the database file fails.
+    :raises Exception: If the backup of the database fails.
 
     :return: None
     """
     # Ask the user where to save the backup file
     file_path = filedialog.asksaveasfilename(defaultextension=".db", filetypes=[("Database Files", "*.db")])
 
-    if file_path:
-        try:
-            # Copy the database file to the user-specified location
-            shutil.copyfile('school_management.db', file_path)
+    if not file_path:
+        return
+
+    def start(report_progress, report_done):
+        def on_progress(status, remaining, total):
+            report_progress(100 * (total - remaining) / total if total else 100)
+
+        db_backup_in_background(file_path, progress=on_progress, on_done=report_done)
+
+    def on_done(error):
+        if error is None:
             messagebox.showinfo("Success", "Database backup created successfully!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to create database backup: {e}")
+        else:
+            messagebox.showerror("Error", f"Failed to create database backup: {error}")
+
+    run_with_progress_window("Backing up database", "Backing up database...", start, on_done)
+
+def run_with_progress_window(title, text, start, on_done, cancel=None):
+    """
+    Runs a database task on a background thread while a small window shows its progress.
+
+    The task's thread reports through a queue that the Tkinter thread polls, so only the Tkinter thread
+    touches the widgets. The window closes once the task has stopped.
+
+    :param title: The title of the progress window.
+    :param text: The message shown above the progress bar.
+    :param start: Starts the task, called as `start(report_progress, report_done)`. The task's thread calls
+        `report_progress(percent)` as it goes and `report_done(error)` once it has stopped, with `error`
+        None on success or the exception that stopped it.
+    :param on_done: Called on the Tkinter thread after the window has closed, as `on_done(error)`.
+    :param cancel: Called when the user asks to cancel the task; adds a Cancel button. None if the task
+        cannot be cancelled, in which case closing the window does nothing until the task has stopped.
+
+    :return: None
+    """
+    progress_window = tk.Toplevel(root)
+    progress_window.title(title)
+    tk.Label(progress_window, text=text).pack(padx=10, pady=5)
+    progress_bar = ttk.Progressbar(progress_window, length=250, maximum=100)
+    progress_bar.pack(padx=10, pady=10)
+    if cancel:
+        tk.Button(progress_window, text="Cancel", command=cancel).pack(padx=10, pady=5)
+        progress_window.protocol("WM_DELETE_WINDOW", cancel)
+    else:
+        progress_window.protocol("WM_DELETE_WINDOW", lambda: None)
+
+    updates = queue.Queue()
+
+    def poll_updates():
+        while not updates.empty():
+            kind, value = updates.get_nowait()
+            # The window may still be gone if the application is closing, but the task has to finish
+            exists = progress_window.winfo_exists()
+            if kind == 'progress':
+                if exists:
+                    progress_bar['value'] = value
+            else:
+                if exists:
+                    progress_window.destroy()
+                on_done(value)
+                return
+        root.after(100, poll_updates)
+
+    start(lambda percent: updates.put(('progress', percent)), lambda error: updates.put(('done', error)))
+    poll_updates()
+
+def on_close():
+    """
+    Saves any database changes that have not been autosaved yet, then closes the main window.
+
+    :return: None
+    """
+    autosaver.stop()
+    root.destroy()
+
+
+# The forms offer the sample records, so the database needs them for registrations and assignments
+seed_sample_data()
+
+# Start from everything in the database, sample records included
+load_database_records()
+update_courses_listbox()
+update_instructor_courses_listbox()
+update_enrolled_students_listbox()
+update_instructor_combobox()
 
 #UI Setup
 setup_course_registration_ui()
@@ -1232,5 +1336,10 @@ setup_treeviews()
 setup_search()
 setup_save_data()
 
+# Autosave database changes on a background thread a moment after they stop coming in
+autosaver = AutoSaver(lambda: save_snapshot(SNAPSHOT_FILE))
+autosaver.start()
+root.protocol("WM_DELETE_WINDOW", on_close)
+
 # Start the Tkinter event loop
 root.mainloop()